@@ -1,4 +1,8 @@
-from app.agents.workflow import support_workflow, create_support_workflow
+from app.agents.workflow import (
+    support_workflow,
+    async_support_workflow,
+    create_support_workflow,
+)
 from app.agents.tools import ALL_TOOLS
 
-__all__ = ["support_workflow", "create_support_workflow", "ALL_TOOLS"]
+__all__ = ["support_workflow", "async_support_workflow", "create_support_workflow", "ALL_TOOLS"]
@@ -1,190 +1,662 @@
+import asyncio
+import httpx
 import instructor
-from openai import OpenAI
-from typing import Dict, Any
+import openai
+from openai import OpenAI, AsyncOpenAI
+from pydantic import BaseModel
+from typing import Callable, Dict, Any, List, Optional, Tuple, Type
 import time
 from app.core.config import settings
+from app.core import metrics
 from app.schemas.agent_output import (
     TriageOutput,
     ResearchOutput,
     PolicyCheckOutput,
     ResponseOutput,
     EscalationDecision,
+    FastPathOutput,
 )
 from app.agents.tools import (
-    search_knowledge_base,
+    search_knowledge_base_batch,
     get_order_details,
     check_refund_eligibility,
-    process_refund,
 )
+from app.agents.escalation_rules import escalation_engine, RuleOutcome
+from app.agents.llm_cache import llm_cache
+from app.agents.fast_path import fast_path_stats
+from app.services.intent_classifier import intent_classifier, ClassifierPrediction
+from app.services.ticket_events import TextStreamPublisher
+from app.agents.context_packing import (
+    count_tokens,
+    pack_articles,
+    compact_order,
+    compact_refund_check,
+    truncate_to_tokens,
+)
+
 
-# Initialize instructor-patched OpenAI client for structured outputs
-client = instructor.patch(OpenAI(api_key=settings.OPENAI_API_KEY))
+def _http_limits() -> httpx.Limits:
+    """Connection pool limits shared by the sync and async OpenAI clients."""
+    return httpx.Limits(
+        max_connections=settings.OPENAI_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.OPENAI_KEEPALIVE_EXPIRY,
+    )
 
 
-def triage_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+def _http_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.OPENAI_TIMEOUT, connect=settings.OPENAI_CONNECT_TIMEOUT)
+
+
+# Initialize instructor-patched OpenAI clients for structured outputs. The SDK's own
+# retries are disabled so complete()/acomplete() can count them.
+client = instructor.patch(
+    OpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        max_retries=0,
+        http_client=httpx.Client(limits=_http_limits(), timeout=_http_timeout()),
+    )
+)
+aclient = instructor.patch(
+    AsyncOpenAI(
+        api_key=settings.OPENAI_API_KEY,
+        base_url=settings.OPENAI_BASE_URL,
+        max_retries=0,
+        http_client=httpx.AsyncClient(limits=_http_limits(), timeout=_http_timeout()),
+    )
+)
+
+# Transient API failures worth retrying (APIConnectionError includes timeouts)
+RETRYABLE_ERRORS = (openai.APIConnectionError, openai.RateLimitError, openai.InternalServerError)
+
+
+class EmptyStreamError(Exception):
+    """Raised when a streamed completion ends without producing any output."""
+
+
+STREAM_RETRYABLE_ERRORS = RETRYABLE_ERRORS + (EmptyStreamError,)
+
+
+def _retry_delay(attempt: int) -> float:
+    return settings.OPENAI_RETRY_BACKOFF_SECONDS * (2**attempt)
+
+
+def _call_stats(
+    response: Optional[BaseModel],
+    llm_time: float,
+    retries: int,
+    cached: bool = False,
+    first_token_time: Optional[float] = None,
+) -> Dict[str, Any]:
+    """LLM wall time, token usage and retries of one completion, for the trace."""
+    # instructor keeps the raw ChatCompletion (and its usage) on the parsed model
+    usage = getattr(getattr(response, "_raw_response", None), "usage", None)
+    return {
+        "llm_time_ms": int(llm_time * 1000),
+        "prompt_tokens": usage.prompt_tokens if usage else 0,
+        "completion_tokens": usage.completion_tokens if usage else 0,
+        # Only known for streamed completions
+        "time_to_first_token_ms": (
+            int(first_token_time * 1000) if first_token_time is not None else None
+        ),
+        "retry_count": retries,
+        "cached": cached,
+        "llm_called": response is not None,
+    }
+
+
+def no_llm_call() -> Dict[str, Any]:
+    """Call stats for an agent that decided without the LLM."""
+    return _call_stats(None, 0, 0)
+
+
+def complete(
+    agent_name: str, response_model: Type[BaseModel], prompt: str, max_tokens: int
+) -> Tuple[BaseModel, Dict[str, Any]]:
     """
-    Triage Agent: Classifies intent and assigns priority.
+    Run a structured completion on the shared sync client, memoized by llm_cache.
+
+    Transient API errors are retried with exponential backoff. Returns the output and
+    its call stats.
     """
+    cache_key = None
+    if llm_cache and llm_cache.enabled_for(agent_name):
+        cache_key = llm_cache.key(settings.OPENAI_MODEL, prompt, response_model, max_tokens)
+        cached = llm_cache.get(agent_name, cache_key, response_model)
+        if cached is not None:
+            return cached, _call_stats(None, 0, 0, cached=True)
+
+    start_time = time.time()
+    for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+        try:
+            response = client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                response_model=response_model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+            )
+            break
+        except RETRYABLE_ERRORS:
+            if attempt == settings.OPENAI_MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(attempt))
+    llm_time = time.time() - start_time
+
+    if cache_key:
+        llm_cache.set(cache_key, response, llm_time * 1000)
+    return response, _call_stats(response, llm_time, attempt)
+
+
+async def acomplete(
+    agent_name: str, response_model: Type[BaseModel], prompt: str, max_tokens: int
+) -> Tuple[BaseModel, Dict[str, Any]]:
+    """Async variant of complete()."""
+    cache_key = None
+    if llm_cache and llm_cache.enabled_for(agent_name):
+        cache_key = llm_cache.key(settings.OPENAI_MODEL, prompt, response_model, max_tokens)
+        cached = llm_cache.get(agent_name, cache_key, response_model)
+        if cached is not None:
+            return cached, _call_stats(None, 0, 0, cached=True)
+
     start_time = time.time()
+    for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+        try:
+            response = await aclient.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                response_model=response_model,
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+            )
+            break
+        except RETRYABLE_ERRORS:
+            if attempt == settings.OPENAI_MAX_RETRIES:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+    llm_time = time.time() - start_time
+
+    if cache_key:
+        llm_cache.set(cache_key, response, llm_time * 1000)
+    return response, _call_stats(response, llm_time, attempt)
+
+
+def _streamed_call_stats(
+    prompt: str,
+    response: BaseModel,
+    llm_time: float,
+    retries: int,
+    first_token_time: Optional[float],
+) -> Dict[str, Any]:
+    stats = _call_stats(response, llm_time, retries, first_token_time=first_token_time)
+    # Streamed chunks carry no usage, count the tokens locally
+    stats["prompt_tokens"] = count_tokens(prompt)
+    stats["completion_tokens"] = count_tokens(response.model_dump_json())
+    return stats
+
+
+def stream_complete(
+    agent_name: str,
+    response_model: Type[BaseModel],
+    prompt: str,
+    max_tokens: int,
+    on_partial: Callable[[BaseModel], None],
+) -> Tuple[BaseModel, Dict[str, Any]]:
+    """
+    Variant of complete() that streams the structured output.
+
+    on_partial is called with each partially parsed output (instructor's Partial) as
+    tokens arrive, and once with the whole output on an llm_cache hit. Records the
+    time to first token.
+    """
+    cache_key = None
+    if llm_cache and llm_cache.enabled_for(agent_name):
+        cache_key = llm_cache.key(settings.OPENAI_MODEL, prompt, response_model, max_tokens)
+        cached = llm_cache.get(agent_name, cache_key, response_model)
+        if cached is not None:
+            on_partial(cached)
+            return cached, _call_stats(None, 0, 0, cached=True)
+
+    start_time = time.time()
+    for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+        first_token_time = None
+        partial = None
+        try:
+            stream = client.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                response_model=instructor.Partial[response_model],
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            for partial in stream:
+                if first_token_time is None:
+                    first_token_time = time.time() - start_time
+                on_partial(partial)
+            if partial is None:
+                raise EmptyStreamError(f"{agent_name}: the completion stream was empty")
+            break
+        except STREAM_RETRYABLE_ERRORS:
+            if attempt == settings.OPENAI_MAX_RETRIES:
+                raise
+            time.sleep(_retry_delay(attempt))
+    llm_time = time.time() - start_time
+
+    # Validate the last partial against the full model (raises if the stream was cut)
+    response = response_model.model_validate(partial.model_dump(exclude_none=True))
+    if cache_key:
+        llm_cache.set(cache_key, response, llm_time * 1000)
+    return response, _streamed_call_stats(prompt, response, llm_time, attempt, first_token_time)
+
+
+async def astream_complete(
+    agent_name: str,
+    response_model: Type[BaseModel],
+    prompt: str,
+    max_tokens: int,
+    on_partial: Callable[[BaseModel], None],
+) -> Tuple[BaseModel, Dict[str, Any]]:
+    """Async variant of stream_complete()."""
+    cache_key = None
+    if llm_cache and llm_cache.enabled_for(agent_name):
+        cache_key = llm_cache.key(settings.OPENAI_MODEL, prompt, response_model, max_tokens)
+        cached = llm_cache.get(agent_name, cache_key, response_model)
+        if cached is not None:
+            on_partial(cached)
+            return cached, _call_stats(None, 0, 0, cached=True)
+
+    start_time = time.time()
+    for attempt in range(settings.OPENAI_MAX_RETRIES + 1):
+        first_token_time = None
+        partial = None
+        try:
+            stream = await aclient.chat.completions.create(
+                model=settings.OPENAI_MODEL,
+                response_model=instructor.Partial[response_model],
+                messages=[{"role": "user", "content": prompt}],
+                max_tokens=max_tokens,
+                stream=True,
+            )
+            async for partial in stream:
+                if first_token_time is None:
+                    first_token_time = time.time() - start_time
+                on_partial(partial)
+            if partial is None:
+                raise EmptyStreamError(f"{agent_name}: the completion stream was empty")
+            break
+        except STREAM_RETRYABLE_ERRORS:
+            if attempt == settings.OPENAI_MAX_RETRIES:
+                raise
+            await asyncio.sleep(_retry_delay(attempt))
+    llm_time = time.time() - start_time
+
+    response = response_model.model_validate(partial.model_dump(exclude_none=True))
+    if cache_key:
+        llm_cache.set(cache_key, response, llm_time * 1000)
+    return response, _streamed_call_stats(prompt, response, llm_time, attempt, first_token_time)
+
+
+def timed_invoke(tool, args: Dict[str, Any], tool_results: Dict[str, Any]) -> Any:
+    """Invoke a tool, recording its duration under its name in tool_results."""
+    start_time = time.time()
+    try:
+        return tool.invoke(args)
+    finally:
+        tool_results[tool.name] = {"duration_ms": round((time.time() - start_time) * 1000, 2)}
+
+
+def instrument(
+    trace: Dict[str, Any], call: Dict[str, Any], tool_results: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """Add call stats and tool timings to a trace and record them in the metrics."""
+    trace.update(
+        {
+            "llm_time_ms": call["llm_time_ms"],
+            "prompt_tokens": call["prompt_tokens"],
+            "completion_tokens": call["completion_tokens"],
+            "tokens_used": call["prompt_tokens"] + call["completion_tokens"],
+            "time_to_first_token_ms": call["time_to_first_token_ms"],
+            "retry_count": call["retry_count"],
+            "tool_results": tool_results or None,
+        }
+    )
+    llm = "cached" if call["cached"] else "called" if call["llm_called"] else "none"
+    metrics.record_agent_trace(trace, llm=llm)
+    return trace
+
+
+def agent_confidences(state: Dict[str, Any]) -> List[float]:
+    """Collect confidence scores from the agents that have run."""
+    confidences = []
+    for key in ("triage", "research", "policy_check", "response"):
+        output = state.get(key)
+        if output:
+            confidences.append(output.confidence)
+    return confidences
+
+
+def average_confidence(state: Dict[str, Any]) -> float:
+    """Average confidence across the agents that have run."""
+    confidences = agent_confidences(state)
+    return sum(confidences) / len(confidences) if confidences else 0.0
+
+
+def skipped_trace(agent_name: str, reason: str, input_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Trace entry for an agent skipped by conditional routing."""
+    return {
+        "agent_name": agent_name,
+        "input_data": {**input_data, "skipped": True},
+        "output_data": {"skipped": True, "reason": reason},
+        "reasoning": f"Skipped: {reason}",
+        "confidence": None,
+        "tools_used": [],
+        "execution_time_ms": 0,
+    }
+
+
+# Each agent is split into prompt building, the LLM call and result handling so the
+# sync nodes (used by `invoke`) and async nodes (used by `ainvoke`) share everything
+# except the client call.
 
-    prompt = f"""
-    You are a customer support triage agent. Analyze the following support ticket and classify it.
+
+def _triage_prompt(state: Dict[str, Any]) -> str:
+    message = truncate_to_tokens(state["message"], settings.CONTEXT_BUDGET_MESSAGE_TOKENS)
+    return f"""
+    You are a customer support triage agent. Analyze the following support ticket and
+    classify it.
 
     Customer: {state['customer_name']} ({state['customer_email']})
     Subject: {state['subject']}
-    Message: {state['message']}
+    Message: {message}
     Order ID: {state.get('order_id', 'Not provided')}
 
     Classify this ticket's intent, priority, and determine if order lookup is needed.
-    Be specific with intent (e.g., 'refund_request', 'shipping_inquiry', 'product_question', 'account_issue').
+    Be specific with intent (e.g., 'refund_request', 'shipping_inquiry', 'product_question',
+    'account_issue').
     """
 
-    response = client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        response_model=TriageOutput,
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=500,
+
+def _classifier_prediction(state: Dict[str, Any]) -> Optional[ClassifierPrediction]:
+    """Local intent/priority prediction, or None when the classifier is off or untrained."""
+    if not (settings.INTENT_CLASSIFIER_ENABLED and intent_classifier.is_trained):
+        return None
+    try:
+        return intent_classifier.predict(state["subject"], state["message"])
+    except Exception as e:
+        print(f"✗ Intent classifier failed: {e}")
+        return None
+
+
+def _local_triage(state: Dict[str, Any], prediction: ClassifierPrediction) -> TriageOutput:
+    return TriageOutput(
+        intent=prediction.intent,
+        priority=prediction.priority,
+        confidence=prediction.confidence,
+        reasoning=(
+            f"Local classifier: intent '{prediction.intent}' "
+            f"({prediction.intent_confidence:.2f}), priority '{prediction.priority}' "
+            f"({prediction.priority_confidence:.2f})"
+        ),
+        requires_order_lookup=bool(state.get("order_id")),
     )
 
+
+def _triage_result(
+    state: Dict[str, Any],
+    response: TriageOutput,
+    prediction: Optional[ClassifierPrediction],
+    decided_by: str,
+    call: Dict[str, Any],
+    token_counts: Dict[str, int],
+    start_time: float,
+) -> Dict[str, Any]:
     execution_time = int((time.time() - start_time) * 1000)
 
     # Store triage output and trace
-    state["triage"] = response
-    state["_traces"] = state.get("_traces", [])
-    state["_traces"].append(
-        {
-            "agent_name": "triage",
-            "step_number": len(state["_traces"]) + 1,
-            "input_data": {
-                "subject": state["subject"],
-                "message": state["message"][:200],
-            },
-            "output_data": response.model_dump(),
-            "reasoning": response.reasoning,
-            "confidence": response.confidence,
-            "execution_time_ms": execution_time,
-        }
-    )
-
-    return state
+    trace = {
+        "agent_name": "triage",
+        "input_data": {
+            "subject": state["subject"],
+            "message": state["message"][:200],
+            "decided_by": decided_by,
+            "classifier": prediction.model_dump() if prediction else None,
+            "token_counts": token_counts,
+        },
+        "output_data": response.model_dump(),
+        "reasoning": response.reasoning,
+        "confidence": response.confidence,
+        "execution_time_ms": execution_time,
+    }
+
+    return {"triage": response, "_traces": [instrument(trace, call)]}
 
 
-def research_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+def triage_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Research Agent: Searches knowledge base for relevant information.
+    Triage Agent: Classifies intent and assigns priority.
+
+    A confident local classifier answers without the LLM; otherwise the LLM decides and
+    the classifier's prediction is scored against it.
     """
     start_time = time.time()
 
-    triage = state.get("triage")
-    if not triage:
-        return state
+    prediction = _classifier_prediction(state)
+    if intent_classifier.should_answer(prediction):
+        intent_classifier.record_local()
+        return _triage_result(
+            state,
+            _local_triage(state, prediction),
+            prediction,
+            "classifier",
+            no_llm_call(),
+            {"prompt_tokens": 0},
+            start_time,
+        )
+
+    prompt = _triage_prompt(state)
+    response, call = complete("triage", TriageOutput, prompt, max_tokens=500)
+    intent_classifier.record_llm(prediction, response.intent, response.priority.value)
+    token_counts = {"prompt_tokens": count_tokens(prompt)}
+    return _triage_result(state, response, prediction, "llm", call, token_counts, start_time)
+
+
+async def atriage_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Async variant of triage_agent. The classifier's embedding runs in a worker thread."""
+    start_time = time.time()
 
-    # Search knowledge base
-    search_queries = [
-        state["subject"],
-        triage.intent.replace("_", " "),
-        f"{triage.intent} policy",
-    ]
+    prediction = await asyncio.to_thread(_classifier_prediction, state)
+    if intent_classifier.should_answer(prediction):
+        intent_classifier.record_local()
+        return _triage_result(
+            state,
+            _local_triage(state, prediction),
+            prediction,
+            "classifier",
+            no_llm_call(),
+            {"prompt_tokens": 0},
+            start_time,
+        )
+
+    prompt = _triage_prompt(state)
+    response, call = await acomplete("triage", TriageOutput, prompt, max_tokens=500)
+    intent_classifier.record_llm(prediction, response.intent, response.priority.value)
+    token_counts = {"prompt_tokens": count_tokens(prompt)}
+    return _triage_result(state, response, prediction, "llm", call, token_counts, start_time)
+
+
+def _research_articles(
+    state: Dict[str, Any], triage: TriageOutput
+) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, int], Dict[str, Any]]:
+    """
+    Search the knowledge base and pack the hits into the research token budget.
+
+    Returns (queries used, packed articles, packing stats, tool timings).
+    """
+    if settings.KB_HYBRID_SEARCH:
+        # Hybrid retrieval matches both the subject wording and the intent terms, so one
+        # combined query replaces the separate subject and intent queries
+        search_queries = [f"{state['subject']} {triage.intent.replace('_', ' ')}"]
+        n_results = 3
+    else:
+        # Limit to 2 queries, embedded and searched in one batch
+        search_queries = [state["subject"], triage.intent.replace("_", " ")]
+        n_results = 2
+
+    tool_results = {}
+    results = timed_invoke(
+        search_knowledge_base_batch,
+        {"queries": search_queries, "n_results": n_results},
+        tool_results,
+    )
+    all_articles = [article for articles in results for article in articles]
 
-    all_articles = []
-    for query in search_queries[:2]:  # Limit to 2 queries
-        articles = search_knowledge_base.invoke({"query": query, "n_results": 2})
-        all_articles.extend(articles)
+    # Most relevant chunks first, overlapping chunks deduplicated, cut to the budget
+    packed, packing = pack_articles(all_articles, settings.CONTEXT_BUDGET_RESEARCH_TOKENS)
+    return search_queries, packed, packing, tool_results
 
-    # Deduplicate by source
-    seen_sources = set()
-    unique_articles = []
-    for article in all_articles:
-        if article["source"] not in seen_sources:
-            seen_sources.add(article["source"])
-            unique_articles.append(article)
 
-    # Summarize findings
-    prompt = f"""
-    You are a research agent. Based on the ticket intent '{triage.intent}' and these knowledge base articles,
-    provide a summary of relevant information.
+def _research_prompt(triage: TriageOutput, articles: List[Dict[str, Any]]) -> str:
+    return f"""
+    You are a research agent. Based on the ticket intent '{triage.intent}' and these knowledge
+    base articles, provide a summary of relevant information.
 
     Articles:
-    {chr(10).join([f"- {a['source']}: {a['content'][:200]}..." for a in unique_articles[:3]])}
+    {chr(10).join([f"- {a['source']}: {a['content']}" for a in articles])}
 
     Provide a concise summary and confidence score.
     """
 
-    response = client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        response_model=ResearchOutput,
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=500,
-    )
 
-    # Add article details
+def _research_result(
+    triage: TriageOutput,
+    response: ResearchOutput,
+    queries: List[str],
+    articles: List[Dict[str, Any]],
+    call: Dict[str, Any],
+    token_counts: Dict[str, int],
+    tool_results: Dict[str, Any],
+    start_time: float,
+) -> Dict[str, Any]:
+    # Add article details: exactly the packed text the agent saw
     response.relevant_articles = [
-        {"source": a["source"], "content": a["content"][:300]} for a in unique_articles[:3]
+        {"source": article["source"], "content": article["content"]} for article in articles
     ]
-    response.search_queries_used = search_queries[:2]
+    response.search_queries_used = queries
 
     execution_time = int((time.time() - start_time) * 1000)
 
-    state["research"] = response
-    state["_traces"].append(
-        {
-            "agent_name": "research",
-            "step_number": len(state["_traces"]) + 1,
-            "input_data": {"intent": triage.intent, "queries": search_queries[:2]},
-            "output_data": response.model_dump(),
-            "reasoning": response.summary,
-            "confidence": response.confidence,
-            "tools_used": ["search_knowledge_base"],
-            "execution_time_ms": execution_time,
-        }
-    )
+    trace = {
+        "agent_name": "research",
+        "input_data": {
+            "intent": triage.intent,
+            "queries": queries,
+            "token_counts": token_counts,
+        },
+        "output_data": response.model_dump(),
+        "reasoning": response.summary,
+        "confidence": response.confidence,
+        "tools_used": ["search_knowledge_base_batch"],
+        "execution_time_ms": execution_time,
+    }
 
-    return state
+    return {"research": response, "_traces": [instrument(trace, call, tool_results)]}
 
 
-def policy_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+def research_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Policy/Refund Agent: Checks eligibility and can process actions.
+    Research Agent: Searches knowledge base for relevant information.
     """
     start_time = time.time()
 
     triage = state.get("triage")
     if not triage:
-        return state
+        return {}
+
+    queries, articles, packing, tool_results = _research_articles(state, triage)
+    prompt = _research_prompt(triage, articles)
+    response, call = complete("research", ResearchOutput, prompt, max_tokens=500)
+    token_counts = {**packing, "prompt_tokens": count_tokens(prompt)}
+    return _research_result(
+        triage, response, queries, articles, call, token_counts, tool_results, start_time
+    )
+
+
+async def aresearch_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Async variant of research_agent. The embedding search runs in a worker thread."""
+    start_time = time.time()
+
+    triage = state.get("triage")
+    if not triage:
+        return {}
+
+    queries, articles, packing, tool_results = await asyncio.to_thread(
+        _research_articles, state, triage
+    )
+    prompt = _research_prompt(triage, articles)
+    response, call = await acomplete("research", ResearchOutput, prompt, max_tokens=500)
+    token_counts = {**packing, "prompt_tokens": count_tokens(prompt)}
+    return _research_result(
+        triage, response, queries, articles, call, token_counts, tool_results, start_time
+    )
 
-    # Check if we need to look up order details
+
+def _policy_lookups(
+    state: Dict[str, Any], triage: TriageOutput
+) -> Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]], List[str], Dict[str, Any]]:
+    """
+    Look up order details and refund eligibility when triage asked for it.
+
+    Returns (order details, refund check, actions taken, tool timings).
+    """
     order_details = None
     refund_check = None
     actions_taken = []
+    tool_results = {}
 
     if state.get("order_id") and triage.requires_order_lookup:
         # Get order details
-        order_details = get_order_details.invoke({"order_id": state["order_id"]})
+        order_details = timed_invoke(
+            get_order_details, {"order_id": state["order_id"]}, tool_results
+        )
         actions_taken.append("get_order_details")
 
         # If refund-related, check eligibility
         if "refund" in triage.intent.lower():
-            refund_check = check_refund_eligibility.invoke({"order_id": state["order_id"]})
+            refund_check = timed_invoke(
+                check_refund_eligibility, {"order_id": state["order_id"]}, tool_results
+            )
             actions_taken.append("check_refund_eligibility")
 
-    # Determine eligibility
-    prompt = f"""
+    return order_details, refund_check, actions_taken, tool_results
+
+
+def _policy_prompt(
+    triage: TriageOutput,
+    order_details: Optional[Dict[str, Any]],
+    refund_check: Optional[Dict[str, Any]],
+) -> str:
+    budget = settings.CONTEXT_BUDGET_POLICY_TOKENS
+    return f"""
     You are a policy enforcement agent. Determine if the customer's request is eligible.
 
     Intent: {triage.intent}
-    Order Details: {order_details if order_details else "No order provided"}
-    Refund Check: {refund_check if refund_check else "N/A"}
+    Order Details: {truncate_to_tokens(compact_order(order_details), budget)}
+    Refund Check: {compact_refund_check(refund_check)}
 
     Provide eligibility decision and clear reasoning.
     """
 
-    response = client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        response_model=PolicyCheckOutput,
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=500,
-    )
 
+def _policy_result(
+    triage: TriageOutput,
+    response: PolicyCheckOutput,
+    order_details: Optional[Dict[str, Any]],
+    refund_check: Optional[Dict[str, Any]],
+    actions_taken: List[str],
+    call: Dict[str, Any],
+    token_counts: Dict[str, int],
+    tool_results: Dict[str, Any],
+    start_time: float,
+) -> Dict[str, Any]:
     response.order_details = order_details
     response.actions_taken = actions_taken
 
@@ -193,42 +665,97 @@ def policy_agent(state: Dict[str, Any]) -> Dict[str, Any]:
 
     execution_time = int((time.time() - start_time) * 1000)
 
-    state["policy_check"] = response
-    state["_traces"].append(
-        {
-            "agent_name": "policy",
-            "step_number": len(state["_traces"]) + 1,
-            "input_data": {"intent": triage.intent, "has_order": bool(order_details)},
-            "output_data": response.model_dump(),
-            "reasoning": response.reason,
-            "confidence": response.confidence,
-            "tools_used": actions_taken,
-            "execution_time_ms": execution_time,
-        }
-    )
+    trace = {
+        "agent_name": "policy",
+        "input_data": {
+            "intent": triage.intent,
+            "has_order": bool(order_details),
+            "token_counts": token_counts,
+        },
+        "output_data": response.model_dump(),
+        "reasoning": response.reason,
+        "confidence": response.confidence,
+        "tools_used": actions_taken,
+        "execution_time_ms": execution_time,
+    }
 
-    return state
+    return {"policy_check": response, "_traces": [instrument(trace, call, tool_results)]}
 
 
-def response_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+def policy_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Response Agent: Drafts the final response to the customer.
+    Policy/Refund Agent: Checks eligibility and can process actions.
     """
     start_time = time.time()
 
+    triage = state.get("triage")
+    if not triage:
+        return {}
+
+    order_details, refund_check, actions_taken, tool_results = _policy_lookups(state, triage)
+    prompt = _policy_prompt(triage, order_details, refund_check)
+    response, call = complete("policy", PolicyCheckOutput, prompt, max_tokens=500)
+    return _policy_result(
+        triage,
+        response,
+        order_details,
+        refund_check,
+        actions_taken,
+        call,
+        {"prompt_tokens": count_tokens(prompt)},
+        tool_results,
+        start_time,
+    )
+
+
+async def apolicy_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Async variant of policy_agent."""
+    start_time = time.time()
+
+    triage = state.get("triage")
+    if not triage:
+        return {}
+
+    order_details, refund_check, actions_taken, tool_results = await asyncio.to_thread(
+        _policy_lookups, state, triage
+    )
+    prompt = _policy_prompt(triage, order_details, refund_check)
+    response, call = await acomplete("policy", PolicyCheckOutput, prompt, max_tokens=500)
+    return _policy_result(
+        triage,
+        response,
+        order_details,
+        refund_check,
+        actions_taken,
+        call,
+        {"prompt_tokens": count_tokens(prompt)},
+        tool_results,
+        start_time,
+    )
+
+
+def _response_prompt(state: Dict[str, Any]) -> str:
     triage = state.get("triage")
     research = state.get("research")
     policy = state.get("policy_check")
+    message = truncate_to_tokens(state["message"], settings.CONTEXT_BUDGET_MESSAGE_TOKENS)
+    findings = (
+        truncate_to_tokens(research.summary, settings.CONTEXT_BUDGET_RESPONSE_TOKENS)
+        if research
+        else "No research available"
+    )
 
-    prompt = f"""
-    You are a customer support response agent. Draft a professional, empathetic response to the customer.
+    return f"""
+    You are a customer support response agent. Draft a professional, empathetic response to
+    the customer.
 
     Customer: {state['customer_name']}
+    Message: {message}
     Intent: {triage.intent if triage else 'unknown'}
     Priority: {triage.priority if triage else 'medium'}
 
     Research Findings:
-    {research.summary if research else 'No research available'}
+    {findings}
 
     Policy Check:
     {policy.reason if policy else 'No policy check performed'}
@@ -244,70 +771,99 @@ def response_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     Determine if human review is needed (complex cases, angry customers, edge cases).
     """
 
-    response = client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        response_model=ResponseOutput,
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=800,
-    )
 
-    execution_time = int((time.time() - start_time) * 1000)
+def _response_result(
+    state: Dict[str, Any],
+    response: ResponseOutput,
+    call: Dict[str, Any],
+    token_counts: Dict[str, int],
+    start_time: float,
+) -> Dict[str, Any]:
+    triage = state.get("triage")
+    research = state.get("research")
+    policy = state.get("policy_check")
 
-    state["response"] = response
-    state["final_response"] = response.response_text
-    state["_traces"].append(
-        {
-            "agent_name": "response",
-            "step_number": len(state["_traces"]) + 1,
-            "input_data": {
-                "intent": triage.intent if triage else None,
-                "research_available": bool(research),
-                "policy_decision": policy.is_eligible if policy else None,
-            },
-            "output_data": response.model_dump(),
-            "reasoning": f"Tone: {response.tone}, Requires review: {response.requires_human_review}",
-            "confidence": response.confidence,
-            "execution_time_ms": execution_time,
-        }
-    )
+    execution_time = int((time.time() - start_time) * 1000)
 
-    return state
+    trace = {
+        "agent_name": "response",
+        "input_data": {
+            "intent": triage.intent if triage else None,
+            "research_available": bool(research),
+            "policy_decision": policy.is_eligible if policy else None,
+            "token_counts": token_counts,
+        },
+        "output_data": response.model_dump(),
+        "reasoning": f"Tone: {response.tone}, Requires review: {response.requires_human_review}",
+        "confidence": response.confidence,
+        "execution_time_ms": execution_time,
+    }
+
+    return {
+        "response": response,
+        "final_response": response.response_text,
+        "_traces": [instrument(trace, call)],
+    }
 
 
-def escalation_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+def response_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Escalation Agent: Decides if human review is needed.
+    Response Agent: Drafts the final response to the customer.
+
+    With RESPONSE_STREAMING_ENABLED the draft is published to the ticket's event stream
+    as it is generated.
     """
     start_time = time.time()
-
+    prompt = _response_prompt(state)
+    if settings.RESPONSE_STREAMING_ENABLED:
+        on_partial = TextStreamPublisher(state.get("ticket_id"), "response_text")
+        response, call = stream_complete(
+            "response", ResponseOutput, prompt, max_tokens=800, on_partial=on_partial
+        )
+    else:
+        response, call = complete("response", ResponseOutput, prompt, max_tokens=800)
+    token_counts = {"prompt_tokens": count_tokens(prompt)}
+    return _response_result(state, response, call, token_counts, start_time)
+
+
+async def aresponse_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Async variant of response_agent."""
+    start_time = time.time()
+    prompt = _response_prompt(state)
+    if settings.RESPONSE_STREAMING_ENABLED:
+        on_partial = TextStreamPublisher(state.get("ticket_id"), "response_text")
+        response, call = await astream_complete(
+            "response", ResponseOutput, prompt, max_tokens=800, on_partial=on_partial
+        )
+    else:
+        response, call = await acomplete("response", ResponseOutput, prompt, max_tokens=800)
+    token_counts = {"prompt_tokens": count_tokens(prompt)}
+    return _response_result(state, response, call, token_counts, start_time)
+
+
+def _escalation_outcome(state: Dict[str, Any]) -> Tuple[float, Optional[RuleOutcome]]:
+    """Average confidence and, if enabled, the rules engine outcome."""
+    avg_confidence = average_confidence(state)
+    outcome = None
+    if settings.ESCALATION_RULES_ENABLED:
+        outcome = escalation_engine.evaluate(state, avg_confidence)
+    return avg_confidence, outcome
+
+
+def _escalation_prompt(state: Dict[str, Any], avg_confidence: float, threshold: float) -> str:
     triage = state.get("triage")
-    research = state.get("research")
-    policy = state.get("policy_check")
     response = state.get("response")
 
-    # Gather all confidence scores
-    confidences = []
-    if triage:
-        confidences.append(triage.confidence)
-    if research:
-        confidences.append(research.confidence)
-    if policy:
-        confidences.append(policy.confidence)
-    if response:
-        confidences.append(response.confidence)
-
-    avg_confidence = sum(confidences) / len(confidences) if confidences else 0.0
-
-    prompt = f"""
+    return f"""
     You are an escalation decision agent. Decide if this ticket needs human review.
 
     Average Confidence: {avg_confidence:.2f}
-    Threshold: {settings.CONFIDENCE_THRESHOLD}
+    Threshold: {threshold}
     Response Requires Review: {response.requires_human_review if response else False}
     Priority: {triage.priority if triage else 'unknown'}
 
     Consider:
-    - Low confidence scores (< {settings.CONFIDENCE_THRESHOLD})
+    - Low confidence scores (< {threshold})
     - High priority or urgent tickets
     - Complex situations requiring judgment
     - Response agent flagged for review
@@ -315,34 +871,326 @@ def escalation_agent(state: Dict[str, Any]) -> Dict[str, Any]:
     Provide escalation decision with clear reasons.
     """
 
-    decision = client.chat.completions.create(
-        model=settings.OPENAI_MODEL,
-        response_model=EscalationDecision,
-        messages=[{"role": "user", "content": prompt}],
-        max_tokens=300,
+
+def _escalation_result(
+    decision: EscalationDecision,
+    decided_by: str,
+    avg_confidence: float,
+    outcome: Optional[RuleOutcome],
+    call: Dict[str, Any],
+    token_counts: Dict[str, int],
+    start_time: float,
+) -> Dict[str, Any]:
+    decision.overall_confidence = avg_confidence
+
+    execution_time = int((time.time() - start_time) * 1000)
+
+    trace = {
+        "agent_name": "escalation",
+        "input_data": {
+            "avg_confidence": avg_confidence,
+            "threshold": outcome.threshold if outcome else settings.CONFIDENCE_THRESHOLD,
+            "decided_by": decided_by,
+            "matched_rules": outcome.matched_rules if outcome else [],
+            "token_counts": token_counts,
+        },
+        "output_data": decision.model_dump(),
+        "reasoning": ", ".join(decision.reasons),
+        "confidence": avg_confidence,
+        "execution_time_ms": execution_time,
+    }
+
+    return {
+        "escalation": decision,
+        "requires_human": decision.should_escalate,
+        "overall_confidence": avg_confidence,
+        "_traces": [instrument(trace, call)],
+    }
+
+
+def escalation_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Escalation Agent: Decides if human review is needed.
+
+    The rules engine decides locally; the LLM is only asked when the rules mark the
+    case as ambiguous (or ESCALATION_RULES_ENABLED is off).
+    """
+    start_time = time.time()
+
+    avg_confidence, outcome = _escalation_outcome(state)
+    if outcome and outcome.decision:
+        return _escalation_result(
+            outcome.decision,
+            "rules",
+            avg_confidence,
+            outcome,
+            no_llm_call(),
+            {"prompt_tokens": 0},
+            start_time,
+        )
+
+    threshold = outcome.threshold if outcome else settings.CONFIDENCE_THRESHOLD
+    prompt = _escalation_prompt(state, avg_confidence, threshold)
+    decision, call = complete("escalation", EscalationDecision, prompt, max_tokens=300)
+    token_counts = {"prompt_tokens": count_tokens(prompt)}
+    return _escalation_result(
+        decision, "llm", avg_confidence, outcome, call, token_counts, start_time
     )
 
+
+async def aescalation_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Async variant of escalation_agent."""
+    start_time = time.time()
+
+    avg_confidence, outcome = _escalation_outcome(state)
+    if outcome and outcome.decision:
+        return _escalation_result(
+            outcome.decision,
+            "rules",
+            avg_confidence,
+            outcome,
+            no_llm_call(),
+            {"prompt_tokens": 0},
+            start_time,
+        )
+
+    threshold = outcome.threshold if outcome else settings.CONFIDENCE_THRESHOLD
+    prompt = _escalation_prompt(state, avg_confidence, threshold)
+    decision, call = await acomplete("escalation", EscalationDecision, prompt, max_tokens=300)
+    token_counts = {"prompt_tokens": count_tokens(prompt)}
+    return _escalation_result(
+        decision, "llm", avg_confidence, outcome, call, token_counts, start_time
+    )
+
+
+def _fast_path_articles(
+    state: Dict[str, Any]
+) -> Tuple[List[str], List[Dict[str, Any]], Dict[str, int], Dict[str, Any]]:
+    """
+    Search the knowledge base for the ticket subject, before any LLM call.
+
+    Returns (queries used, packed articles, packing stats, tool timings).
+    """
+    search_queries = [state["subject"]]
+    tool_results = {}
+    results = timed_invoke(
+        search_knowledge_base_batch, {"queries": search_queries, "n_results": 3}, tool_results
+    )
+    articles = [article for hits in results for article in hits]
+    packed, packing = pack_articles(articles, settings.CONTEXT_BUDGET_RESEARCH_TOKENS)
+    return search_queries, packed, packing, tool_results
+
+
+def _fast_path_prompt(state: Dict[str, Any], articles: List[Dict[str, Any]]) -> str:
+    message = truncate_to_tokens(state["message"], settings.CONTEXT_BUDGET_MESSAGE_TOKENS)
+    return f"""
+    You are a customer support agent handling a simple informational ticket end to end.
+
+    Customer: {state['customer_name']} ({state['customer_email']})
+    Subject: {state['subject']}
+    Message: {message}
+
+    Knowledge base articles:
+    {chr(10).join([f"- {a['source']}: {a['content']}" for a in articles]) or "None found"}
+
+    In one answer:
+    1. Classify the ticket's intent and priority (e.g., 'shipping_inquiry', 'product_question',
+       'account_issue'); set requires_order_lookup if answering needs the customer's order
+    2. Summarize the relevant knowledge base information and how well it answers the ticket
+    3. Draft a professional, empathetic response that answers from the articles
+    4. Decide if human review is needed (low confidence, complex or sensitive cases)
+
+    Be honest with confidence scores: anything uncertain is re-processed by specialist agents.
+    """
+
+
+def fast_path_fallback_reason(state: Dict[str, Any]) -> Optional[str]:
+    """Why a fast-path answer is not good enough to skip the full graph, or None."""
+    triage = state.get("triage")
+    if not triage:
+        return "no triage"
+    if triage.requires_order_lookup:
+        return "order lookup needed"
+    confidences = agent_confidences(state)
+    if not confidences or min(confidences) < settings.FAST_PATH_MIN_CONFIDENCE:
+        return "low confidence"
+    return None
+
+
+def fast_path_accepted(state: Dict[str, Any]) -> bool:
+    """Whether a fast-path answer is confident enough to skip the full graph."""
+    return fast_path_fallback_reason(state) is None
+
+
+def _fast_path_result(
+    state: Dict[str, Any],
+    output: FastPathOutput,
+    queries: List[str],
+    articles: List[Dict[str, Any]],
+    call: Dict[str, Any],
+    token_counts: Dict[str, int],
+    tool_results: Dict[str, Any],
+    start_time: float,
+) -> Dict[str, Any]:
+    research = ResearchOutput(
+        relevant_articles=[{"source": a["source"], "content": a["content"]} for a in articles],
+        search_queries_used=queries,
+        confidence=output.research_confidence,
+        summary=output.research_summary,
+    )
+    outputs = {"triage": output.triage, "research": research, "response": output.response}
+    fallback_reason = fast_path_fallback_reason(outputs)
+    fast_path_stats.record_answer(fallback_reason)
+    if fallback_reason:
+        return _fast_path_fallback(
+            state, output, queries, fallback_reason, call, token_counts, tool_results, start_time
+        )
+
+    # The escalation rules still apply; the model's own decision only covers ambiguous cases
+    avg_confidence, outcome = _escalation_outcome({**state, **outputs})
+    if outcome and outcome.decision:
+        decision, decided_by = outcome.decision, "rules"
+    else:
+        decision, decided_by = output.escalation, "llm"
     decision.overall_confidence = avg_confidence
 
     execution_time = int((time.time() - start_time) * 1000)
 
-    state["escalation"] = decision
-    state["requires_human"] = decision.should_escalate
-    state["overall_confidence"] = avg_confidence
+    trace = {
+        "agent_name": "fast_path",
+        "input_data": {
+            "subject": state["subject"],
+            "message": state["message"][:200],
+            "queries": queries,
+            "decided_by": decided_by,
+            "matched_rules": outcome.matched_rules if outcome else [],
+            "token_counts": token_counts,
+        },
+        "output_data": {**output.model_dump(), "escalation": decision.model_dump()},
+        "reasoning": output.triage.reasoning,
+        "confidence": avg_confidence,
+        "tools_used": ["search_knowledge_base_batch"],
+        "execution_time_ms": execution_time,
+    }
+
+    return {
+        **outputs,
+        "escalation": decision,
+        "final_response": output.response.response_text,
+        "requires_human": decision.should_escalate,
+        "overall_confidence": avg_confidence,
+        "_traces": [instrument(trace, call, tool_results)],
+    }
+
+
+def _fast_path_fallback(
+    state: Dict[str, Any],
+    output: FastPathOutput,
+    queries: List[str],
+    reason: str,
+    call: Dict[str, Any],
+    token_counts: Dict[str, int],
+    tool_results: Dict[str, Any],
+    start_time: float,
+) -> Dict[str, Any]:
+    """
+    Only the superseded trace of a rejected fast-path answer; its outputs are dropped so
+    the full graph starts from a clean state.
+    """
+    execution_time = int((time.time() - start_time) * 1000)
+
+    trace = {
+        "agent_name": "fast_path",
+        "input_data": {
+            "subject": state["subject"],
+            "message": state["message"][:200],
+            "queries": queries,
+            "token_counts": token_counts,
+        },
+        "output_data": {**output.model_dump(), "superseded": True, "fallback_reason": reason},
+        "reasoning": f"Superseded by the full agent graph: {reason}",
+        "confidence": min(
+            output.triage.confidence, output.research_confidence, output.response.confidence
+        ),
+        "tools_used": ["search_knowledge_base_batch"],
+        "execution_time_ms": execution_time,
+    }
+    return {"_traces": [instrument(trace, call, tool_results)]}
+
+
+def fast_path_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Fast Path Agent: Triage, research summary, response and escalation in one LLM call.
+
+    Used for tickets the cheap classifier deems simple; the workflow falls back to the
+    full agent graph when the result is not confident enough.
+    """
+    start_time = time.time()
+
+    queries, articles, packing, tool_results = _fast_path_articles(state)
+    prompt = _fast_path_prompt(state, articles)
+    output, call = complete("fast_path", FastPathOutput, prompt, max_tokens=1200)
+    token_counts = {**packing, "prompt_tokens": count_tokens(prompt)}
+    return _fast_path_result(
+        state, output, queries, articles, call, token_counts, tool_results, start_time
+    )
+
+
+async def afast_path_agent(state: Dict[str, Any]) -> Dict[str, Any]:
+    """Async variant of fast_path_agent."""
+    start_time = time.time()
 
-    state["_traces"].append(
+    queries, articles, packing, tool_results = await asyncio.to_thread(_fast_path_articles, state)
+    prompt = _fast_path_prompt(state, articles)
+    output, call = await acomplete("fast_path", FastPathOutput, prompt, max_tokens=1200)
+    token_counts = {**packing, "prompt_tokens": count_tokens(prompt)}
+    return _fast_path_result(
+        state, output, queries, articles, call, token_counts, tool_results, start_time
+    )
+
+
+def policy_skip(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Policy short-circuit: no order to look up, so there is nothing to check.
+    """
+    triage = state.get("triage")
+    reason = "No order lookup required" if state.get("order_id") else "No order provided"
+    trace = skipped_trace(
+        "policy",
+        reason,
         {
-            "agent_name": "escalation",
-            "step_number": len(state["_traces"]) + 1,
-            "input_data": {
-                "avg_confidence": avg_confidence,
-                "threshold": settings.CONFIDENCE_THRESHOLD,
-            },
-            "output_data": decision.model_dump(),
-            "reasoning": ", ".join(decision.reasons),
-            "confidence": avg_confidence,
-            "execution_time_ms": execution_time,
-        }
+            "intent": triage.intent if triage else None,
+            "has_order": bool(state.get("order_id")),
+        },
     )
+    return {"_traces": [instrument(trace, no_llm_call())]}
+
 
-    return state
+def escalation_skip(state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Escalation short-circuit: confident, low-priority ticket resolves without review.
+    """
+    avg_confidence = average_confidence(state)
+    decision = EscalationDecision(
+        should_escalate=False,
+        reasons=[
+            "Low priority ticket",
+            f"All agent confidences >= {settings.ESCALATION_SKIP_CONFIDENCE}",
+            "Response not flagged for review",
+        ],
+        overall_confidence=avg_confidence,
+    )
+    trace = skipped_trace(
+        "escalation",
+        "High-confidence low-priority ticket auto-resolved",
+        {"avg_confidence": avg_confidence, "threshold": settings.ESCALATION_SKIP_CONFIDENCE},
+    )
+    trace["output_data"]["decision"] = decision.model_dump()
+    trace["confidence"] = avg_confidence
+
+    return {
+        "escalation": decision,
+        "requires_human": False,
+        "overall_confidence": avg_confidence,
+        "_traces": [instrument(trace, no_llm_call())],
+    }
@@ -0,0 +1,205 @@
+import json
+import math
+import re
+import threading
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.core.config import settings
+from app.services.knowledge_base import CHUNK_OVERLAP
+
+# Packed articles shorter than this are not worth a truncated slot
+MIN_TRUNCATED_TOKENS = 24
+# Chunks of one source sharing this share of their word shingles are near-duplicates
+DUPLICATE_SHINGLE_OVERLAP = 0.8
+
+COMPACT_ORDER_FIELDS = {
+    "order_id",
+    "customer_email",
+    "order_date",
+    "total",
+    "status",
+    "items",
+    "refund_eligible",
+    "refund_window_days",
+}
+
+_encoding = None
+_encoding_lock = threading.Lock()
+_encoding_loaded = False
+
+
+def _get_encoding():
+    """tiktoken encoding for the configured model, or None to use the heuristic."""
+    global _encoding, _encoding_loaded
+    if not _encoding_loaded:
+        with _encoding_lock:
+            if not _encoding_loaded:
+                try:
+                    import tiktoken
+
+                    try:
+                        _encoding = tiktoken.encoding_for_model(settings.OPENAI_MODEL)
+                    except KeyError:
+                        _encoding = tiktoken.get_encoding("cl100k_base")
+                except Exception as e:
+                    # Not installed, or the BPE file can't be fetched (offline)
+                    print(f"✗ tiktoken unavailable, estimating tokens from length: {e}")
+                    _encoding = None
+                _encoding_loaded = True
+    return _encoding
+
+
+def count_tokens(text: str) -> int:
+    """Token count of text for the configured model (about 4 characters/token as fallback)."""
+    if not text:
+        return 0
+    encoding = _get_encoding()
+    if encoding is None:
+        return math.ceil(len(text) / 4)
+    return len(encoding.encode(text))
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """Cut text to at most max_tokens, at a word boundary where possible."""
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is None:
+        if len(text) <= max_tokens * 4:
+            return text
+        cut = text[: max_tokens * 4]
+    else:
+        tokens = encoding.encode(text)
+        if len(tokens) <= max_tokens:
+            return text
+        cut = encoding.decode(tokens[:max_tokens])
+
+    boundary = cut.rfind(" ")
+    if boundary > len(cut) // 2:
+        cut = cut[:boundary]
+    return cut.rstrip() + "..."
+
+
+def _shingles(text: str) -> set:
+    words = re.findall(r"\w+", text.lower())
+    return {tuple(words[i : i + 3]) for i in range(max(len(words) - 2, 1))}
+
+
+def _strip_overlap(previous: str, chunk: str, max_overlap: int) -> str:
+    """Drop the prefix of chunk that repeats the end of previous (splitter chunk overlap)."""
+    for size in range(min(max_overlap, len(previous), len(chunk)), 15, -1):
+        if previous.endswith(chunk[:size]):
+            return chunk[size:].lstrip()
+    return chunk
+
+
+def dedupe_articles(articles: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    Drop near-duplicate chunks and trim text that overlapping chunks repeat.
+
+    Articles are expected in relevance order; the more relevant copy is kept.
+    """
+    kept: List[Dict[str, Any]] = []
+    kept_shingles: List[Tuple[str, set]] = []
+    for article in articles:
+        content = article["content"]
+        for other in kept:
+            if other["source"] == article["source"]:
+                content = _strip_overlap(other["content"], content, CHUNK_OVERLAP * 2)
+        if not content:
+            continue
+
+        shingles = _shingles(content)
+        duplicate = any(
+            source == article["source"]
+            and len(shingles & other) >= DUPLICATE_SHINGLE_OVERLAP * len(shingles)
+            for source, other in kept_shingles
+        )
+        if duplicate:
+            continue
+
+        kept.append({**article, "content": content})
+        kept_shingles.append((article["source"], shingles))
+    return kept
+
+
+def pack_articles(
+    articles: List[Dict[str, Any]], budget_tokens: int
+) -> Tuple[List[Dict[str, Any]], Dict[str, int]]:
+    """
+    Fill a token budget with knowledge base articles, most relevant first.
+
+    Articles are deduplicated, then added whole while they fit; the first one that does
+    not fit is truncated into the remaining budget. Returns the packed articles (with a
+    "tokens" count each) and packing stats for the trace.
+    """
+    ranked = sorted(articles, key=lambda a: a.get("relevance_score", 0), reverse=True)
+    unique = dedupe_articles(ranked)
+
+    packed = []
+    used = 0
+    for article in unique:
+        remaining = budget_tokens - used
+        tokens = count_tokens(article["content"])
+        if tokens > remaining:
+            if remaining < MIN_TRUNCATED_TOKENS:
+                break
+            content = truncate_to_tokens(article["content"], remaining)
+            packed.append({**article, "content": content, "tokens": count_tokens(content)})
+            used += packed[-1]["tokens"]
+            break
+        packed.append({**article, "tokens": tokens})
+        used += tokens
+
+    stats = {
+        "context_tokens": used,
+        "context_budget": budget_tokens,
+        "candidates": len(articles),
+        "duplicates_dropped": len(articles) - len(unique),
+        "packed": len(packed),
+    }
+    return packed, stats
+
+
+def _compact(value: Any) -> str:
+    return json.dumps(value, separators=(",", ":"), default=str)
+
+
+def compact_order(order: Optional[Dict[str, Any]]) -> str:
+    """One-line order summary for prompts, without the customer's contact details."""
+    if not order:
+        return "No order provided"
+    if "error" in order:
+        return f"{order.get('order_id', 'unknown')}: {order['error']}"
+
+    items = "; ".join(
+        f"{item.get('name')} x{item.get('quantity', 1)} ${item.get('price')}"
+        for item in order.get("items", [])
+    )
+    parts = [
+        order.get("order_id"),
+        f"status={order.get('status')}",
+        f"ordered={str(order.get('order_date', ''))[:10]}",
+        f"total=${order.get('total')}",
+        f"items=[{items}]",
+    ]
+    if "refund_eligible" in order:
+        parts.append(f"refund_eligible={'yes' if order['refund_eligible'] else 'no'}")
+    if "refund_window_days" in order:
+        parts.append(f"refund_window={order['refund_window_days']}d")
+    extra = {key: value for key, value in order.items() if key not in COMPACT_ORDER_FIELDS}
+    if extra:
+        parts.append(_compact(extra))
+    return " | ".join(str(part) for part in parts)
+
+
+def compact_refund_check(refund_check: Optional[Dict[str, Any]]) -> str:
+    """Refund eligibility for prompts; the embedded order copy is dropped."""
+    if not refund_check:
+        return "N/A"
+    parts = [f"eligible={'yes' if refund_check.get('eligible') else 'no'}"]
+    if refund_check.get("reason"):
+        parts.append(f"reason={refund_check['reason']}")
+    if refund_check.get("refund_amount") is not None:
+        parts.append(f"amount=${refund_check['refund_amount']}")
+    return " | ".join(parts)
@@ -0,0 +1,190 @@
+import json
+import threading
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+from pydantic import BaseModel, Field
+
+from app.core.config import settings
+from app.models.ticket import TicketPriority
+from app.schemas.agent_output import EscalationDecision
+
+
+class EscalationRules(BaseModel):
+    """Declarative escalation rules. Loaded from ESCALATION_RULES_PATH (JSON) if set."""
+
+    default_threshold: float = Field(
+        default_factory=lambda: settings.CONFIDENCE_THRESHOLD,
+        description="Minimum average confidence to resolve without a human",
+    )
+    intent_thresholds: Dict[str, float] = Field(
+        default_factory=lambda: {"refund_request": 0.8},
+        description="Stricter thresholds for specific intents",
+    )
+    priority_thresholds: Dict[TicketPriority, float] = Field(
+        default_factory=lambda: {TicketPriority.HIGH: 0.8},
+        description="Stricter thresholds for specific priorities",
+    )
+    always_escalate_priorities: List[TicketPriority] = Field(
+        default_factory=lambda: [TicketPriority.URGENT]
+    )
+    always_escalate_intents: List[str] = Field(
+        default_factory=list, description="Intents that always need a human"
+    )
+    escalate_on_review_flag: bool = Field(
+        default=True, description="Escalate when the response agent requests review"
+    )
+    max_auto_refund_amount: float = Field(
+        default=200.0, description="Refunds above this amount need a human"
+    )
+    ambiguity_margin: float = Field(
+        default=0.05, description="Confidence this close to the threshold falls back to the LLM"
+    )
+    specialists: Dict[str, str] = Field(
+        default_factory=lambda: {
+            "refund": "billing",
+            "shipping": "logistics",
+            "account": "account_security",
+            "product": "product_specialist",
+        },
+        description="Intent keyword -> recommended specialist",
+    )
+
+
+class RuleOutcome(BaseModel):
+    """Result of evaluating the rules against a workflow state."""
+
+    decision: Optional[EscalationDecision] = None  # None means ambiguous: ask the LLM
+    matched_rules: List[str] = Field(default_factory=list)
+    threshold: float
+    avg_confidence: float
+
+
+class EscalationRuleEngine:
+    """Decides escalation locally and reports how often it had to defer to the LLM."""
+
+    def __init__(self, rules: EscalationRules):
+        self.rules = rules
+        self._lock = threading.Lock()
+        self._rule_decisions = 0
+        self._llm_fallbacks = 0
+        self._escalations = 0
+
+    def threshold_for(self, intent: Optional[str], priority: Optional[TicketPriority]) -> float:
+        """Effective confidence threshold: the strictest applicable rule wins."""
+        thresholds = [self.rules.default_threshold]
+        if intent in self.rules.intent_thresholds:
+            thresholds.append(self.rules.intent_thresholds[intent])
+        if priority in self.rules.priority_thresholds:
+            thresholds.append(self.rules.priority_thresholds[priority])
+        return max(thresholds)
+
+    def recommend_specialist(self, intent: Optional[str]) -> Optional[str]:
+        for keyword, specialist in self.rules.specialists.items():
+            if intent and keyword in intent.lower():
+                return specialist
+        return None
+
+    def evaluate(
+        self, state: Dict[str, Any], avg_confidence: float, record: bool = True
+    ) -> RuleOutcome:
+        """
+        Apply the rules to a workflow state. Pass record=False when the decision may not
+        be used, and record() it once it is.
+        """
+        triage = state.get("triage")
+        policy = state.get("policy_check")
+        response = state.get("response")
+
+        intent = triage.intent if triage else None
+        priority = triage.priority if triage else None
+        threshold = self.threshold_for(intent, priority)
+
+        # Hard rules: any match escalates regardless of confidence
+        reasons = []
+        if not triage or not response:
+            reasons.append("Missing triage or response output")
+        if priority in self.rules.always_escalate_priorities:
+            reasons.append(f"Priority {priority.value} always requires a human")
+        if intent in self.rules.always_escalate_intents:
+            reasons.append(f"Intent {intent} always requires a human")
+        if self.rules.escalate_on_review_flag and response and response.requires_human_review:
+            reasons.append("Response agent flagged for human review")
+        if policy and (policy.refund_amount or 0) > self.rules.max_auto_refund_amount:
+            reasons.append(
+                f"Refund amount {policy.refund_amount:.2f} exceeds auto-approval limit "
+                f"{self.rules.max_auto_refund_amount:.2f}"
+            )
+        if policy and policy.order_details and policy.order_details.get("error"):
+            reasons.append(f"Order lookup failed: {policy.order_details['error']}")
+
+        outcome = RuleOutcome(
+            matched_rules=list(reasons), threshold=threshold, avg_confidence=avg_confidence
+        )
+
+        if reasons:
+            outcome.decision = EscalationDecision(
+                should_escalate=True,
+                reasons=reasons,
+                overall_confidence=avg_confidence,
+                recommended_specialist=self.recommend_specialist(intent),
+            )
+        elif abs(avg_confidence - threshold) < self.rules.ambiguity_margin:
+            outcome.matched_rules.append(
+                f"Confidence {avg_confidence:.2f} within {self.rules.ambiguity_margin} "
+                f"of threshold {threshold}"
+            )
+        elif avg_confidence < threshold:
+            outcome.matched_rules.append("Low confidence")
+            outcome.decision = EscalationDecision(
+                should_escalate=True,
+                reasons=[f"Average confidence {avg_confidence:.2f} below threshold {threshold}"],
+                overall_confidence=avg_confidence,
+                recommended_specialist=self.recommend_specialist(intent),
+            )
+        else:
+            outcome.decision = EscalationDecision(
+                should_escalate=False,
+                reasons=[f"Average confidence {avg_confidence:.2f} meets threshold {threshold}"],
+                overall_confidence=avg_confidence,
+            )
+
+        if record:
+            self.record(outcome)
+        return outcome
+
+    def record(self, outcome: RuleOutcome):
+        """Count an outcome in the decision statistics."""
+        with self._lock:
+            if outcome.decision:
+                self._rule_decisions += 1
+                if outcome.decision.should_escalate:
+                    self._escalations += 1
+            else:
+                self._llm_fallbacks += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Decision counters, including the LLM fallback rate."""
+        with self._lock:
+            total = self._rule_decisions + self._llm_fallbacks
+            return {
+                "evaluations": total,
+                "rule_decisions": self._rule_decisions,
+                "llm_fallbacks": self._llm_fallbacks,
+                "rule_escalations": self._escalations,
+                "fallback_rate_percent": round(self._llm_fallbacks / total * 100, 2)
+                if total
+                else 0.0,
+            }
+
+
+def load_escalation_rules(path: Optional[str] = None) -> EscalationRules:
+    """Load rules from a JSON file, or use the defaults."""
+    path = path or settings.ESCALATION_RULES_PATH
+    if path and Path(path).exists():
+        with open(path, "r", encoding="utf-8") as f:
+            return EscalationRules(**json.load(f))
+    return EscalationRules()
+
+
+# Global instance
+escalation_engine = EscalationRuleEngine(load_escalation_rules())
@@ -0,0 +1,104 @@
+import re
+import threading
+from collections import Counter
+from typing import Dict, Any, List, Tuple
+
+from app.core.config import settings
+
+# Wording that signals a ticket needs order lookups, policy judgement or a careful reply
+COMPLEX_PATTERNS = [
+    r"\brefund",
+    r"\bchargeback",
+    r"\bcancel",
+    r"\breturn(ed|ing)?\b",
+    r"\bdamaged?\b",
+    r"\bbroken\b",
+    r"\bdefect",
+    r"\bwrong (item|order|size|address)",
+    r"\bnever (arrived|received)",
+    r"\bmissing\b",
+    r"\bcharged (twice|double)",
+    r"\bfraud",
+    r"\bhacked\b",
+    r"\bunauthori[sz]ed\b",
+    r"\blawyer\b",
+    r"\blegal\b",
+    r"\bcomplain",
+    r"\bmanager\b",
+    r"\bescalat",
+    r"\bunacceptable\b",
+    r"\burgent",
+    r"\basap\b",
+    r"\bimmediately\b",
+]
+COMPLEX_RE = re.compile("|".join(COMPLEX_PATTERNS), re.IGNORECASE)
+
+
+def classify_ticket(state: Dict[str, Any]) -> Tuple[bool, List[str]]:
+    """
+    Cheap pre-LLM check whether a ticket is a simple informational question.
+
+    Returns (simple, reasons it is not). Anything tied to an order, long, or worded like
+    a complaint, refund or urgent request takes the full agent graph.
+    """
+    reasons = []
+    if state.get("order_id"):
+        reasons.append("order_id provided")
+
+    message = state.get("message") or ""
+    if len(message) > settings.FAST_PATH_MAX_MESSAGE_CHARS:
+        reasons.append(f"message longer than {settings.FAST_PATH_MAX_MESSAGE_CHARS} chars")
+
+    match = COMPLEX_RE.search(f"{state.get('subject', '')} {message}")
+    if match:
+        reasons.append(f"complex wording: '{match.group(0).lower()}'")
+
+    if message.count("!") >= 3 or (len(message) > 40 and message.isupper()):
+        reasons.append("agitated tone")
+
+    return not reasons, reasons
+
+
+class FastPathStats:
+    """Counts how tickets are routed and how often fast-path answers are accepted."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routed_fast_path = 0
+        self._routed_full_graph = 0
+        self._accepted = 0
+        self._fallbacks: Counter = Counter()
+
+    def record_route(self, simple: bool):
+        with self._lock:
+            if simple:
+                self._routed_fast_path += 1
+            else:
+                self._routed_full_graph += 1
+
+    def record_answer(self, fallback_reason: str = None):
+        """Count a fast-path answer: accepted, or falling back to the full graph for a reason."""
+        with self._lock:
+            if fallback_reason:
+                self._fallbacks[fallback_reason] += 1
+            else:
+                self._accepted += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """Routing counters and the fast-path hit and fallback rates."""
+        with self._lock:
+            fallbacks = sum(self._fallbacks.values())
+            answered = self._accepted + fallbacks
+            return {
+                "routed_fast_path": self._routed_fast_path,
+                "routed_full_graph": self._routed_full_graph,
+                "accepted": self._accepted,
+                "fallbacks": fallbacks,
+                "fallback_reasons": dict(self._fallbacks),
+                "hit_rate_percent": round(self._accepted / answered * 100, 2) if answered else 0,
+                "fallback_rate_percent": round(fallbacks / answered * 100, 2) if answered else 0,
+            }
+
+
+# Global instance
+fast_path_stats = FastPathStats()
@@ -0,0 +1,207 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict, defaultdict
+from typing import Dict, Any, Optional, Tuple, Type
+from pydantic import BaseModel
+
+from app.core.config import settings
+
+
+class LLMCacheBackend(ABC):
+    """Storage for memoized structured completions. Entries expire after ttl_seconds."""
+
+    @abstractmethod
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    def set(self, key: str, value: Dict[str, Any]):
+        ...
+
+    @abstractmethod
+    def clear(self):
+        ...
+
+    @abstractmethod
+    def size(self) -> int:
+        ...
+
+
+class MemoryLLMCacheBackend(LLMCacheBackend):
+    """In-process LRU cache."""
+
+    def __init__(self, max_entries: int, ttl_seconds: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        # key -> (created_at, value)
+        self._entries: OrderedDict[str, Tuple[float, Dict[str, Any]]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            created_at, value = entry
+            if _expired(created_at, self.ttl_seconds):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._entries[key] = (time.time(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def size(self) -> int:
+        return len(self._entries)
+
+
+class SQLiteLLMCacheBackend(LLMCacheBackend):
+    """On-disk cache that survives restarts, replays and repeated test runs."""
+
+    def __init__(self, path: str, ttl_seconds: float):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS llm_cache "
+            "(key TEXT PRIMARY KEY, value TEXT NOT NULL, created_at REAL NOT NULL)"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT value, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and _expired(row[1], self.ttl_seconds):
+                self._conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+        return json.loads(row[0]) if row else None
+
+    def set(self, key: str, value: Dict[str, Any]):
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, created_at) VALUES (?, ?, ?)",
+                (key, json.dumps(value), time.time()),
+            )
+            self._conn.commit()
+
+    def clear(self):
+        with self._lock:
+            self._conn.execute("DELETE FROM llm_cache")
+            self._conn.commit()
+
+    def size(self) -> int:
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+
+
+def _expired(created_at: float, ttl_seconds: float) -> bool:
+    return bool(ttl_seconds) and time.time() - created_at > ttl_seconds
+
+
+class LLMCallCache:
+    """
+    Exact-match memoization of structured completions.
+
+    Keyed by (model, prompt hash, response_model schema hash, max_tokens), so a change to
+    the prompt or the output schema never returns a stale result.
+    """
+
+    def __init__(self, backend: LLMCacheBackend, bypass_agents: Optional[list[str]] = None):
+        self.backend = backend
+        self.bypass_agents = set(bypass_agents or [])
+        self._schema_hashes: Dict[type, str] = {}
+        self._lock = threading.Lock()
+        self._hits: Dict[str, int] = defaultdict(int)
+        self._misses: Dict[str, int] = defaultdict(int)
+        self._saved_latency_ms: Dict[str, float] = defaultdict(float)
+
+    def enabled_for(self, agent_name: str) -> bool:
+        return agent_name not in self.bypass_agents
+
+    def _schema_hash(self, response_model: Type[BaseModel]) -> str:
+        if response_model not in self._schema_hashes:
+            schema = json.dumps(response_model.model_json_schema(), sort_keys=True)
+            self._schema_hashes[response_model] = hashlib.sha256(schema.encode()).hexdigest()
+        return self._schema_hashes[response_model]
+
+    def key(self, model: str, prompt: str, response_model: Type[BaseModel], max_tokens: int) -> str:
+        prompt_hash = hashlib.sha256(prompt.encode()).hexdigest()
+        raw = f"{model}|{prompt_hash}|{self._schema_hash(response_model)}|{max_tokens}"
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    def get(
+        self, agent_name: str, key: str, response_model: Type[BaseModel]
+    ) -> Optional[BaseModel]:
+        value = self.backend.get(key)
+        with self._lock:
+            if value is None:
+                self._misses[agent_name] += 1
+                return None
+            self._hits[agent_name] += 1
+            self._saved_latency_ms[agent_name] += value.get("latency_ms", 0)
+        return response_model.model_validate(value["output"])
+
+    def set(self, key: str, output: BaseModel, latency_ms: float):
+        self.backend.set(key, {"output": output.model_dump(mode="json"), "latency_ms": latency_ms})
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            agents = sorted(set(self._hits) | set(self._misses))
+            per_agent = {
+                agent: {
+                    "hits": self._hits[agent],
+                    "misses": self._misses[agent],
+                    "saved_latency_ms": round(self._saved_latency_ms[agent], 2),
+                }
+                for agent in agents
+            }
+            hits = sum(self._hits.values())
+            lookups = hits + sum(self._misses.values())
+        return {
+            "backend": type(self.backend).__name__,
+            "entries": self.backend.size(),
+            "hits": hits,
+            "misses": lookups - hits,
+            "hit_rate_percent": round(hits / lookups * 100, 2) if lookups else 0.0,
+            "saved_latency_ms": round(sum(a["saved_latency_ms"] for a in per_agent.values()), 2),
+            "bypassed_agents": sorted(self.bypass_agents),
+            "agents": per_agent,
+        }
+
+
+def create_llm_cache() -> Optional[LLMCallCache]:
+    """Build the cache configured by LLM_CACHE_BACKEND ("none", "memory" or "sqlite")."""
+    backend_name = settings.LLM_CACHE_BACKEND.lower()
+    if backend_name == "memory":
+        backend = MemoryLLMCacheBackend(
+            settings.LLM_CACHE_MAX_ENTRIES, settings.LLM_CACHE_TTL_SECONDS
+        )
+    elif backend_name == "sqlite":
+        backend = SQLiteLLMCacheBackend(settings.LLM_CACHE_PATH, settings.LLM_CACHE_TTL_SECONDS)
+    elif backend_name == "none":
+        return None
+    else:
+        raise ValueError(f"Unknown LLM_CACHE_BACKEND: {settings.LLM_CACHE_BACKEND}")
+    return LLMCallCache(backend, bypass_agents=settings.LLM_CACHE_BYPASS_AGENTS)
+
+
+# Global instance
+llm_cache = create_llm_cache()
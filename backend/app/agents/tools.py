@@ -19,6 +19,23 @@ def search_knowledge_base(query: str, n_results: int = 3) -> List[Dict[str, Any]
     return kb.search(query, n_results=n_results)
 
 
+@tool
+def search_knowledge_base_batch(
+    queries: List[str], n_results: int = 3
+) -> List[List[Dict[str, Any]]]:
+    """
+    Search the knowledge base for several queries at once.
+
+    Args:
+        queries: The search queries
+        n_results: Number of results to return per query (default: 3)
+
+    Returns:
+        One list of relevant knowledge base articles per query
+    """
+    return kb.search_many(queries, n_results=n_results)
+
+
 @tool
 def get_order_details(order_id: str) -> Dict[str, Any]:
     """
@@ -68,6 +85,7 @@ def process_refund(order_id: str, amount: float = None) -> Dict[str, Any]:
 # Export all tools as a list
 ALL_TOOLS = [
     search_knowledge_base,
+    search_knowledge_base_batch,
     get_order_details,
     check_refund_eligibility,
     process_refund,
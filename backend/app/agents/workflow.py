@@ -1,12 +1,50 @@
-from typing import TypedDict, Annotated
+import functools
+import inspect
+from typing import Any, Callable, Dict, TypedDict, Annotated, Optional
 from langgraph.graph import StateGraph, END
+from app.core.config import settings
+from app.models.ticket import TicketPriority
 from app.agents.agent_nodes import (
     triage_agent,
     research_agent,
     policy_agent,
     response_agent,
     escalation_agent,
+    fast_path_agent,
+    atriage_agent,
+    aresearch_agent,
+    apolicy_agent,
+    aresponse_agent,
+    aescalation_agent,
+    afast_path_agent,
+    policy_skip,
+    escalation_skip,
+    agent_confidences,
+    fast_path_accepted,
 )
+from app.agents.fast_path import classify_ticket, fast_path_stats
+from app.services.ticket_events import publish_traces
+
+# Pipeline order used to merge traces deterministically when branches run in parallel
+AGENT_ORDER = ["cache", "fast_path", "triage", "research", "policy", "response", "escalation"]
+
+
+def merge_traces(existing: list[dict], new: list[dict]) -> list[dict]:
+    """
+    Reducer for `_traces`: append new traces, order them by pipeline stage and renumber steps.
+
+    Parallel branches finish in arbitrary order, so traces are sorted by their position in
+    AGENT_ORDER (stable for repeated or unknown agents) rather than by arrival.
+    """
+    merged = sorted(
+        list(existing or []) + list(new or []),
+        key=lambda t: (
+            AGENT_ORDER.index(t["agent_name"])
+            if t["agent_name"] in AGENT_ORDER
+            else len(AGENT_ORDER)
+        ),
+    )
+    return [{**trace, "step_number": idx + 1} for idx, trace in enumerate(merged)]
 
 
 class SupportAgentState(TypedDict):
@@ -32,11 +70,99 @@ class SupportAgentState(TypedDict):
     requires_human: bool
     overall_confidence: float
 
-    # Internal traces
-    _traces: list[dict]
+    # Internal traces (merged across parallel branches)
+    _traces: Annotated[list[dict], merge_traces]
+
+
+def failed_agent(error: BaseException) -> Optional[str]:
+    """Name of the agent whose node raised `error`, if it came out of a workflow node."""
+    return getattr(error, "failed_agent", None)
+
+
+def _tag_failure(error: Exception, agent_name: str):
+    # Failed runs leave no trace; the tag lets the failure be counted against the agent
+    if failed_agent(error) is None:
+        error.failed_agent = agent_name
+
+
+def with_progress(
+    node: Callable[[Dict[str, Any]], Any], agent_name: str
+) -> Callable[[Dict[str, Any]], Any]:
+    """Wrap an agent node to publish its traces to the ticket's event stream."""
+    if inspect.iscoroutinefunction(node):
+
+        @functools.wraps(node)
+        async def run_async(state: Dict[str, Any]) -> Dict[str, Any]:
+            try:
+                update = await node(state)
+            except Exception as e:
+                _tag_failure(e, agent_name)
+                raise
+            publish_traces(state.get("ticket_id"), update.get("_traces", []))
+            return update
+
+        return run_async
+
+    @functools.wraps(node)
+    def run(state: Dict[str, Any]) -> Dict[str, Any]:
+        try:
+            update = node(state)
+        except Exception as e:
+            _tag_failure(e, agent_name)
+            raise
+        publish_traces(state.get("ticket_id"), update.get("_traces", []))
+        return update
+
+    return run
+
+
+def route_entry(state: SupportAgentState) -> str:
+    """Send tickets the cheap classifier deems simple to the single-call fast path."""
+    simple, _ = classify_ticket(state)
+    fast_path_stats.record_route(simple)
+    return "fast_path_node" if simple else "triage_node"
 
 
-def create_support_workflow():
+def route_fast_path(state: SupportAgentState) -> str:
+    """
+    Accept the fast-path answer, or re-run the ticket through the full graph. A rejected
+    answer leaves only its superseded trace in the state.
+    """
+    return END if fast_path_accepted(state) else "triage_node"
+
+
+def route_policy(state: SupportAgentState) -> str:
+    """Only run the policy agent when triage asked for an order lookup and we have an order."""
+    triage = state.get("triage")
+    if triage and triage.requires_order_lookup and state.get("order_id"):
+        return "policy_node"
+    return "policy_skip_node"
+
+
+def route_escalation(state: SupportAgentState) -> str:
+    """Skip the escalation LLM call for confident, low-priority tickets nobody flagged."""
+    triage = state.get("triage")
+    response = state.get("response")
+    confidences = agent_confidences(state)
+
+    if (
+        triage
+        and triage.priority == TicketPriority.LOW
+        and response
+        and not response.requires_human_review
+        and confidences
+        and min(confidences) >= settings.ESCALATION_SKIP_CONFIDENCE
+    ):
+        return "escalation_skip_node"
+    return "escalation_node"
+
+
+def create_support_workflow(
+    parallel: Optional[bool] = None,
+    conditional: Optional[bool] = None,
+    fast_path: Optional[bool] = None,
+    use_async: bool = False,
+):
     """
     Create the LangGraph workflow for support ticket processing.
 
@@ -46,29 +172,94 @@ def create_support_workflow():
     3. Policy Agent - Check eligibility and enforce policies
     4. Response Agent - Draft customer response
     5. Escalation Agent - Decide if human review needed
+
+    Research and policy only depend on triage, so by default (PARALLEL_AGENTS) they run
+    concurrently and join before the response agent. Pass parallel=False for the
+    original linear topology.
+
+    With conditional routing (CONDITIONAL_ROUTING) the policy agent is replaced by a
+    deterministic skip when there is no order to look up, and the escalation agent is
+    skipped for confident low-priority tickets. Skips are recorded in the traces.
+
+    With the fast path (FAST_PATH_ENABLED), tickets a cheap keyword classifier deems
+    simple are answered by one combined LLM call instead; if that call is not confident
+    or needs an order lookup, the ticket falls back to the full graph from triage.
+
+    With use_async=True the agent nodes use the async OpenAI client and the compiled
+    graph must be run with `ainvoke`.
     """
+    if parallel is None:
+        parallel = settings.PARALLEL_AGENTS
+    if conditional is None:
+        conditional = settings.CONDITIONAL_ROUTING
+    if fast_path is None:
+        fast_path = settings.FAST_PATH_ENABLED
 
     # Create the graph
     workflow = StateGraph(SupportAgentState)
 
     # Add nodes (use different names to avoid conflict with state attributes)
-    workflow.add_node("triage_node", triage_agent)
-    workflow.add_node("research_node", research_agent)
-    workflow.add_node("policy_node", policy_agent)
-    workflow.add_node("response_node", response_agent)
-    workflow.add_node("escalation_node", escalation_agent)
-
-    # Define the workflow edges (linear for MVP, can be made conditional later)
-    workflow.set_entry_point("triage_node")
-    workflow.add_edge("triage_node", "research_node")
-    workflow.add_edge("research_node", "policy_node")
-    workflow.add_edge("policy_node", "response_node")
-    workflow.add_edge("response_node", "escalation_node")
+    # Every node publishes its trace to GET /api/tickets/{id}/stream when it finishes
+    def add_node(name: str, node: Callable[[Dict[str, Any]], Any]):
+        workflow.add_node(name, with_progress(node, name.removesuffix("_node")))
+
+    add_node("triage_node", atriage_agent if use_async else triage_agent)
+    add_node("research_node", aresearch_agent if use_async else research_agent)
+    add_node("policy_node", apolicy_agent if use_async else policy_agent)
+    add_node("response_node", aresponse_agent if use_async else response_agent)
+    add_node("escalation_node", aescalation_agent if use_async else escalation_agent)
+    if conditional:
+        add_node("policy_skip_node", policy_skip)
+        add_node("escalation_skip_node", escalation_skip)
+
+    policy_nodes = ["policy_node", "policy_skip_node"] if conditional else ["policy_node"]
+
+    def add_policy_edges(source: str):
+        if conditional:
+            workflow.add_conditional_edges(
+                source, route_policy, {node: node for node in policy_nodes}
+            )
+        else:
+            workflow.add_edge(source, "policy_node")
+
+    if fast_path:
+        add_node("fast_path_node", afast_path_agent if use_async else fast_path_agent)
+        workflow.set_conditional_entry_point(
+            route_entry, {"fast_path_node": "fast_path_node", "triage_node": "triage_node"}
+        )
+        workflow.add_conditional_edges(
+            "fast_path_node", route_fast_path, {END: END, "triage_node": "triage_node"}
+        )
+    else:
+        workflow.set_entry_point("triage_node")
+    if parallel:
+        # Fan out after triage, wait for both branches before drafting the response.
+        # Only one of the policy nodes runs, so each gets its own join with research.
+        workflow.add_edge("triage_node", "research_node")
+        add_policy_edges("triage_node")
+        for policy_node in policy_nodes:
+            workflow.add_edge(["research_node", policy_node], "response_node")
+    else:
+        workflow.add_edge("triage_node", "research_node")
+        add_policy_edges("research_node")
+        for policy_node in policy_nodes:
+            workflow.add_edge(policy_node, "response_node")
+
+    if conditional:
+        workflow.add_conditional_edges(
+            "response_node",
+            route_escalation,
+            {"escalation_node": "escalation_node", "escalation_skip_node": "escalation_skip_node"},
+        )
+        workflow.add_edge("escalation_skip_node", END)
+    else:
+        workflow.add_edge("response_node", "escalation_node")
     workflow.add_edge("escalation_node", END)
 
     # Compile the graph
     return workflow.compile()
 
 
-# Create the compiled workflow
+# Create the compiled workflows
 support_workflow = create_support_workflow()
+async_support_workflow = create_support_workflow(use_async=True)
@@ -1,79 +1,129 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import Dict, Any
+import time
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.ext.asyncio import AsyncSession
+from typing import Dict, Any, Literal, Optional, Tuple
 
-from app.core.database import get_db
-from app.models import Ticket, TicketStatus, TicketPriority, AgentTrace
+from app.core.config import settings
+from app.core.database import get_async_db
+from app.services.stats_counters import (
+    WINDOWS,
+    agent_metrics_query,
+    agent_analytics,
+    counters_query,
+    timeseries_query,
+    summarize,
+)
+from app.services.worker_pool import ticket_worker_pool
+from app.services.trace_writer import trace_writer
+from app.agents.escalation_rules import escalation_engine
+from app.agents.fast_path import fast_path_stats
+from app.services.response_cache import response_cache
+from app.agents.llm_cache import llm_cache
+from app.services.intent_classifier import intent_classifier
 
 router = APIRouter(prefix="/api/stats", tags=["statistics"])
 
 
+# (expires at, response) of the last /api/stats read
+_stats_cache: Tuple[float, Optional[Dict[str, Any]]] = (0.0, None)
+
+
 @router.get("", response_model=Dict[str, Any])
-async def get_statistics(db: Session = Depends(get_db)):
+async def get_statistics(db: AsyncSession = Depends(get_async_db)):
     """
     Get overall system statistics.
+
+    Read from the incrementally maintained counters (one indexed query, independent of
+    the number of tickets) and cached for STATS_CACHE_TTL_SECONDS.
     """
-    # Total tickets
-    total_tickets = db.query(Ticket).count()
-
-    # Tickets by status
-    status_counts = (
-        db.query(Ticket.status, func.count(Ticket.id))
-        .group_by(Ticket.status)
-        .all()
-    )
-    status_breakdown = {status.value: count for status, count in status_counts}
-
-    # Tickets by priority
-    priority_counts = (
-        db.query(Ticket.priority, func.count(Ticket.id))
-        .group_by(Ticket.priority)
-        .all()
-    )
-    priority_breakdown = {priority.value: count for priority, count in priority_counts}
-
-    # Average confidence
-    avg_confidence = db.query(func.avg(Ticket.confidence)).scalar() or 0.0
-
-    # Human escalation rate
-    human_needed = db.query(Ticket).filter(
-        Ticket.status == TicketStatus.WAITING_HUMAN
-    ).count()
-    escalation_rate = (human_needed / total_tickets * 100) if total_tickets > 0 else 0
-
-    # Most common intents
-    intent_counts = (
-        db.query(Ticket.intent, func.count(Ticket.id))
-        .filter(Ticket.intent.isnot(None))
-        .group_by(Ticket.intent)
-        .order_by(func.count(Ticket.id).desc())
-        .limit(5)
-        .all()
-    )
-    top_intents = {intent: count for intent, count in intent_counts}
-
-    # Agent performance
-    agent_stats = (
-        db.query(
-            AgentTrace.agent_name,
-            func.avg(AgentTrace.execution_time_ms).label("avg_time"),
-            func.count(AgentTrace.id).label("executions"),
-        )
-        .group_by(AgentTrace.agent_name)
-        .all()
-    )
-    agent_performance = {
-        agent: {"avg_execution_time_ms": round(avg_time, 2), "total_executions": count}
-        for agent, avg_time, count in agent_stats
+    global _stats_cache
+    expires_at, cached = _stats_cache
+    if cached is not None and time.monotonic() < expires_at:
+        return cached
+
+    counters = dict((await db.execute(counters_query())).all())
+    result = summarize(counters)
+    _stats_cache = (time.monotonic() + settings.STATS_CACHE_TTL_SECONDS, result)
+    return result
+
+
+@router.get("/timeseries", response_model=Dict[str, Any])
+async def get_statistics_timeseries(
+    hours: int = Query(default=24, ge=1, le=24 * 31),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get hourly counter changes (tickets created, status transitions, agent runs) for the
+    last `hours` hours. Hours without activity are omitted.
+    """
+    buckets: Dict[str, Dict[str, float]] = {}
+    for bucket, metric, value in await db.execute(timeseries_query(hours)):
+        if value:
+            buckets.setdefault(bucket, {})[metric] = value
+    return {
+        "hours": hours,
+        "buckets": [{"hour": bucket, "counters": counters} for bucket, counters in buckets.items()],
     }
 
+
+@router.get("/agents", response_model=Dict[str, Any])
+async def get_agent_analytics(
+    window: Literal["hour", "day", "week"] = "day",
+    interval: Optional[Literal["hour", "day"]] = None,
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get per-agent runs, error rate (share of runs that raised), retry rate (share of runs
+    that hit retried LLM errors) and p50/p90/p99 latency and tokens over the last hour,
+    day or week.
+
+    Percentiles come from log-bucketed sketches kept in hourly buckets, so windows are
+    aligned to whole hours and also include the current, partial hour. Pass `interval`
+    for per-hour or per-day buckets to chart.
+    """
+    rows = await db.execute(agent_metrics_query(WINDOWS[window]))
+    return {"window": window, "interval": interval, **agent_analytics(rows, interval)}
+
+
+@router.get("/queue", response_model=Dict[str, Any])
+async def get_queue_metrics():
+    """
+    Get ticket worker pool backpressure metrics (queue depth, wait times) and the
+    trace write-behind buffer state.
+    """
+    return {**ticket_worker_pool.metrics(), "trace_writer": trace_writer.stats()}
+
+
+@router.get("/escalation", response_model=Dict[str, Any])
+async def get_escalation_stats():
+    """
+    Get escalation rules engine statistics (rule decisions vs LLM fallbacks).
+    """
+    return escalation_engine.stats()
+
+
+@router.get("/fast-path", response_model=Dict[str, Any])
+async def get_fast_path_stats():
+    """
+    Get fast path statistics (tickets routed to it, answers accepted vs fallbacks).
+    """
+    return fast_path_stats.stats()
+
+
+@router.get("/cache", response_model=Dict[str, Any])
+async def get_cache_stats():
+    """
+    Get cache hit/miss statistics.
+    """
     return {
-        "total_tickets": total_tickets,
-        "status_breakdown": status_breakdown,
-        "priority_breakdown": priority_breakdown,
-        "average_confidence": round(avg_confidence, 3),
-        "escalation_rate_percent": round(escalation_rate, 2),
-        "top_intents": top_intents,
-        "agent_performance": agent_performance,
+        "response_cache": response_cache.stats(),
+        "llm_cache": llm_cache.stats() if llm_cache else None,
     }
+
+
+@router.get("/classifier", response_model=Dict[str, Any])
+async def get_classifier_stats():
+    """
+    Get local intent classifier statistics (local triage rate, agreement with the LLM).
+    """
+    return intent_classifier.stats()
@@ -1,28 +1,150 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from typing import List
+from typing import List, Literal, Optional, Set, Tuple, Union
+import hashlib
+import json
 import random
 import string
+import time
 from datetime import datetime
 
-from app.core.database import get_db
-from app.models import Ticket, TicketStatus, AgentTrace
-from app.schemas import TicketCreate, TicketResponse, TicketUpdate, TicketWithTraces
-from app.agents.workflow import support_workflow
+from app.core.config import settings
+from app.core.database import AsyncSessionLocal, get_async_db
+from app.models import Ticket, TicketStatus, TicketPriority, AgentTrace
+from app.schemas import (
+    TicketCreate,
+    TicketResponse,
+    TicketSummary,
+    TicketSearchResult,
+    TicketUpdate,
+    TicketWithTraces,
+    TicketStatusResponse,
+    BulkBatchResponse,
+    AgentTraceResponse,
+    MessageResponse,
+)
+from app.services.bulk_ingest import (
+    BulkPayloadError,
+    parse_bulk_payload,
+    bulk_insert_tickets,
+    process_bulk,
+    offline_batches,
+)
+from app.services.ticket_processor import (
+    build_initial_state,
+    run_workflow,
+    arun_workflow,
+    workflow_result_values,
+    workflow_failed_values,
+    insert_ticket_counted,
+    ticket_outcome,
+    run_ticket,
+)
+from app.services.ticket_events import ticket_events, format_sse
+from app.services.ticket_queries import (
+    TICKET_INCLUDES,
+    TRACE_DATA_COLUMNS,
+    InvalidCursorError,
+    encode_cursor,
+    ticket_detail_query,
+    ticket_list_query,
+    ticket_version_query,
+)
+from app.services.ticket_search import (
+    SEARCH_DIALECTS,
+    fts5_query,
+    highlight_snippet,
+    ticket_search_query,
+)
+from app.services.stats_counters import (
+    aapply_deltas,
+    aapply_hourly_deltas,
+    ticket_deltas,
+    ticket_snapshot,
+    trace_deltas_by_hour,
+)
+from app.services.worker_pool import ticket_worker_pool, QueueFullError
 
 router = APIRouter(prefix="/api/tickets", tags=["tickets"])
 
+DEFAULT_INCLUDE = ",".join(TICKET_INCLUDES)
+INCLUDE_DESCRIPTION = (
+    "Comma-separated parts to return: traces, messages, trace_data (the traces' "
+    "input_data, output_data and tool_results). Parts left out are null."
+)
+TRACE_DATA_FIELDS = {column.key for column in TRACE_DATA_COLUMNS}
+
 
 def generate_ticket_number() -> str:
     """Generate a unique ticket number."""
     return f"TKT-{random.randint(100000, 999999)}"
 
 
+def generate_ticket_numbers(db: Session, count: int) -> List[str]:
+    """Distinct ticket numbers not yet in use, for bulk inserts."""
+    numbers: set = set()
+    while len(numbers) < count:
+        candidates = {generate_ticket_number() for _ in range(count - len(numbers))} - numbers
+        taken = {
+            number
+            for (number,) in db.query(Ticket.ticket_number).filter(
+                Ticket.ticket_number.in_(candidates)
+            )
+        }
+        numbers |= candidates - taken
+    return list(numbers)
+
+
+def _insert_new_tickets(db: Session, tickets: List[TicketCreate]) -> List[int]:
+    """Bulk-insert tickets under fresh ticket numbers. Returns their ids in input order."""
+    return bulk_insert_tickets(db, tickets, generate_ticket_numbers(db, len(tickets)))
+
+
+async def _insert_bulk(
+    request: Request, db: AsyncSession
+) -> Tuple[List[Tuple[int, int]], List[dict]]:
+    """Parse a bulk body and insert its valid tickets: ((index, ticket id) pairs, errors)."""
+    try:
+        valid, errors = parse_bulk_payload(
+            await request.body(), request.headers.get("content-type", "")
+        )
+    except BulkPayloadError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    if len(valid) + len(errors) > settings.BULK_MAX_TICKETS:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"At most {settings.BULK_MAX_TICKETS} tickets per request",
+        )
+
+    tickets = [ticket for _, ticket in valid]
+    ids = await db.run_sync(_insert_new_tickets, tickets)
+    await db.commit()
+    # Processing outlives this session; don't hold its connection while streaming
+    await db.close()
+    return [(index, ticket_id) for (index, _), ticket_id in zip(valid, ids)], errors
+
+
 @router.post("", response_model=TicketResponse, status_code=status.HTTP_201_CREATED)
-async def create_ticket(ticket_data: TicketCreate, db: Session = Depends(get_db)):
+async def create_ticket(
+    ticket_data: TicketCreate, response: Response, db: AsyncSession = Depends(get_async_db)
+):
     """
     Create a new support ticket and process it through the agent workflow.
+
+    With ASYNC_TICKET_PROCESSING enabled the ticket is queued for the worker pool
+    and returned immediately with 202 Accepted; poll GET /api/tickets/{id}/status.
     """
+    if settings.ASYNC_TICKET_PROCESSING and ticket_worker_pool.is_full():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Ticket queue is full, retry later",
+            headers={"Retry-After": "5"},
+        )
+
     # Create ticket in database
     ticket = Ticket(
         ticket_number=generate_ticket_number(),
@@ -31,149 +153,437 @@ async def create_ticket(ticket_data: TicketCreate, db: Session = Depends(get_db)
         subject=ticket_data.subject,
         message=ticket_data.message,
         order_id=ticket_data.order_id,
-        status=TicketStatus.IN_PROGRESS,
+        status=TicketStatus.NEW if settings.ASYNC_TICKET_PROCESSING else TicketStatus.IN_PROGRESS,
     )
 
-    db.add(ticket)
-    db.commit()
-    db.refresh(ticket)
-
-    # Prepare state for agent workflow
-    initial_state = {
-        "ticket_id": ticket.id,
-        "customer_email": ticket.customer_email,
-        "customer_name": ticket.customer_name,
-        "subject": ticket.subject,
-        "message": ticket.message,
-        "order_id": ticket.order_id,
-        "triage": None,
-        "research": None,
-        "policy_check": None,
-        "response": None,
-        "escalation": None,
-        "final_response": None,
-        "requires_human": False,
-        "overall_confidence": 0.0,
-        "_traces": [],
-    }
+    if settings.ASYNC_TICKET_PROCESSING:
+        db.add(ticket)
+        await db.flush()
+        snapshot = ticket_snapshot(ticket)
+        await aapply_deltas(db, ticket_deltas(None, snapshot), at=ticket.created_at)
+        await db.commit()
+        try:
+            ticket_worker_pool.enqueue(ticket.id)
+        except QueueFullError as e:
+            # The client will retry; don't leave a ticket nothing is going to process
+            await db.delete(ticket)
+            await aapply_deltas(db, ticket_deltas(snapshot, None), at=ticket.created_at)
+            await db.commit()
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=str(e),
+                headers={"Retry-After": "5"},
+            )
+        response.status_code = status.HTTP_202_ACCEPTED
+        return ticket
 
+    # The workflow runs on the unsaved ticket, then a single transaction inserts it with
+    # its results and bulk-inserts its traces. Nobody can follow a ticket before the
+    # response gives its id, so only the final event is published, for the replay.
     try:
-        # Run the agent workflow
-        final_state = support_workflow.invoke(initial_state)
-
-        # Update ticket with results
-        if final_state.get("triage"):
-            ticket.intent = final_state["triage"].intent
-            ticket.priority = final_state["triage"].priority
-            ticket.confidence = final_state["triage"].confidence
-
-        ticket.ai_response = final_state.get("final_response")
-        ticket.confidence = final_state.get("overall_confidence", 0.0)
-
-        # Set status based on escalation
-        if final_state.get("requires_human"):
-            ticket.status = TicketStatus.WAITING_HUMAN
+        if settings.ASYNC_AGENT_CLIENT:
+            final_state = await arun_workflow(build_initial_state(ticket))
         else:
-            ticket.status = TicketStatus.RESOLVED
-            ticket.resolved_at = datetime.utcnow()
-            ticket.final_response = final_state.get("final_response")
-            ticket.response_approved = 1
-
-        # Save agent traces
-        for trace_data in final_state.get("_traces", []):
-            trace = AgentTrace(
-                ticket_id=ticket.id,
-                agent_name=trace_data["agent_name"],
-                step_number=trace_data["step_number"],
-                input_data=trace_data.get("input_data"),
-                output_data=trace_data.get("output_data"),
-                reasoning=trace_data.get("reasoning"),
-                confidence=trace_data.get("confidence"),
-                tools_used=trace_data.get("tools_used"),
-                execution_time_ms=trace_data.get("execution_time_ms", 0),
-            )
-            db.add(trace)
-
-        db.commit()
-        db.refresh(ticket)
-
+            # Run the agent workflow in a thread so it does not block the event loop
+            final_state = await run_in_threadpool(run_workflow, build_initial_state(ticket))
     except Exception as e:
-        # If agent workflow fails, mark ticket for human review
-        ticket.status = TicketStatus.WAITING_HUMAN
-        ticket.ticket_metadata = {"error": str(e)}
-        db.commit()
-        db.refresh(ticket)
+        # If agent workflow fails, save the ticket for human review
+        ticket_id = await db.run_sync(insert_ticket_counted, ticket, workflow_failed_values(e))
+        await db.commit()
+        ticket_events.publish(ticket_id, "failed", {"error": str(e)})
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Agent workflow failed: {str(e)}",
         )
 
+    ticket_id = await db.run_sync(
+        insert_ticket_counted,
+        ticket,
+        workflow_result_values(final_state),
+        final_state.get("_traces", []),
+    )
+    await db.commit()
+    ticket_events.publish(ticket_id, "done", ticket_outcome(ticket))
     return ticket
 
 
-@router.get("", response_model=List[TicketResponse])
+@router.post("/bulk")
+async def bulk_create_tickets(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Import and process many tickets from NDJSON (application/x-ndjson) or a JSON array.
+
+    Valid tickets are inserted with one bulk insert, then processed BULK_CONCURRENCY at a
+    time and started at most BULK_TICKETS_PER_SECOND. The response streams one NDJSON
+    result per ticket as it finishes (invalid items first), tagged with its input index.
+    """
+    ticket_ids, errors = await _insert_bulk(request, db)
+
+    async def results():
+        for error in errors:
+            yield json.dumps(error, default=str) + "\n"
+        async for result in process_bulk(
+            ticket_ids, run_ticket, settings.BULK_CONCURRENCY, settings.BULK_TICKETS_PER_SECOND
+        ):
+            yield json.dumps(result, default=str) + "\n"
+
+    return StreamingResponse(
+        results(),
+        media_type="application/x-ndjson",
+        headers={"X-Tickets-Accepted": str(len(ticket_ids)), "X-Tickets-Invalid": str(len(errors))},
+    )
+
+
+@router.post(
+    "/bulk/batches", response_model=BulkBatchResponse, status_code=status.HTTP_202_ACCEPTED
+)
+async def create_bulk_batch(request: Request, db: AsyncSession = Depends(get_async_db)):
+    """
+    Offline bulk import for non-urgent backlogs, modelled on the OpenAI Batch API.
+
+    Tickets are inserted immediately and processed in the background at low concurrency
+    while the live ticket queue is idle. Poll GET /api/tickets/bulk/batches/{batch_id}.
+    Batch state is best-effort: it is kept in memory and lost on restart.
+    """
+    ticket_ids, errors = await _insert_bulk(request, db)
+    job = offline_batches.submit(ticket_ids, errors, run_ticket)
+    return job.to_dict()
+
+
+@router.get("/bulk/batches/{batch_id}", response_model=BulkBatchResponse)
+async def get_bulk_batch(batch_id: str):
+    """Status, request counts and per-ticket results of an offline bulk import."""
+    job = offline_batches.get(batch_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Batch not found")
+    return job.to_dict()
+
+
+@router.get("", response_model=List[Union[TicketResponse, TicketSummary]])
 async def list_tickets(
+    response: Response,
     status_filter: TicketStatus = None,
+    customer_email: Optional[str] = None,
+    cursor: Optional[str] = Query(
+        default=None, description="X-Next-Cursor of the previous page (replaces skip)"
+    ),
     skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(get_db),
+    limit: int = Query(default=100, ge=1),
+    view: Literal["full", "summary"] = "full",
+    db: AsyncSession = Depends(get_async_db),
 ):
     """
-    List all tickets with optional status filter.
+    List tickets newest first, with optional status and customer filters.
+
+    Pages are cursor-based: pass the X-Next-Cursor header of a page as `cursor` to get
+    the next one (absent on the last page). `view=summary` leaves out the message and
+    response text.
     """
-    query = db.query(Ticket)
+    try:
+        query = ticket_list_query(
+            status_filter, customer_email, cursor, skip, limit, summary=view == "summary"
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
 
-    if status_filter:
-        query = query.filter(Ticket.status == status_filter)
+    tickets = (await db.scalars(query)).all()
+    if len(tickets) == limit:
+        response.headers["X-Next-Cursor"] = encode_cursor(tickets[-1])
+    schema = TicketSummary if view == "summary" else TicketResponse
+    return [schema.model_validate(ticket) for ticket in tickets]
 
-    tickets = query.order_by(Ticket.created_at.desc()).offset(skip).limit(limit).all()
-    return tickets
 
+@router.get("/search", response_model=List[TicketSearchResult])
+async def search_tickets(
+    q: str = Query(..., min_length=1, max_length=500, description="Words that must all match"),
+    status_filter: TicketStatus = None,
+    priority: TicketPriority = None,
+    intent: Optional[str] = None,
+    skip: int = Query(default=0, ge=0),
+    limit: int = Query(default=20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Full-text search over ticket subject, message and responses, best matches first.
 
-@router.get("/{ticket_id}", response_model=TicketWithTraces)
-async def get_ticket(ticket_id: int, db: Session = Depends(get_db)):
+    Backed by SQLite FTS5 or a Postgres tsvector GIN index. Hits are ticket summaries
+    with a relevance score and a highlighted snippet.
     """
-    Get a specific ticket with all agent traces.
+    dialect = db.bind.dialect.name
+    if dialect not in SEARCH_DIALECTS:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Ticket search is not supported on {dialect}",
+        )
+    if dialect == "sqlite" and not fts5_query(q):
+        return []
+
+    rows = await db.execute(
+        ticket_search_query(dialect, q, status_filter, priority, intent, skip, limit)
+    )
+    return [
+        TicketSearchResult.model_validate(
+            {**row._mapping, "snippet": highlight_snippet(row.snippet)}
+        )
+        for row in rows
+    ]
+
+
+@router.get("/{ticket_id}/status", response_model=TicketStatusResponse)
+async def get_ticket_status(
+    ticket_id: int,
+    wait: float = Query(
+        default=0, ge=0, le=settings.TICKET_STATUS_MAX_WAIT_SECONDS,
+        description="Long-poll: seconds to wait for processing to finish",
+    ),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    Get the processing status of a ticket, optionally long-polling until it finishes.
+    """
+    ticket = await db.get(Ticket, ticket_id)
 
     if not ticket:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found"
         )
 
-    return ticket
+    if wait and ticket_worker_pool.is_pending(ticket_id):
+        await ticket_worker_pool.wait_for(ticket_id, timeout=wait)
+        await db.refresh(ticket)
 
+    return TicketStatusResponse(
+        id=ticket.id,
+        ticket_number=ticket.ticket_number,
+        status=ticket.status,
+        processing=ticket_worker_pool.is_pending(ticket_id),
+        updated_at=ticket.updated_at,
+    )
 
-@router.get("/number/{ticket_number}", response_model=TicketWithTraces)
-async def get_ticket_by_number(ticket_number: str, db: Session = Depends(get_db)):
+
+@router.get("/{ticket_id}/stream")
+async def stream_ticket(
+    ticket_id: int,
+    last_event_id: int = Header(default=0),
+    db: AsyncSession = Depends(get_async_db),
+):
     """
-    Get a ticket by its ticket number.
+    Stream a ticket's processing as Server-Sent Events.
+
+    Events: `status`, `agent` as each agent finishes, `response_delta` (or
+    `response_reset`) while the response is drafted, then `done` or `failed`. Already
+    processed tickets get a single `done` event. Reconnecting clients send
+    Last-Event-ID to skip events they have seen.
+
+    On every idle heartbeat the ticket is re-read, so a ticket finished elsewhere still
+    ends the stream with `done` or `failed`. A stream still open after
+    SSE_MAX_STREAM_SECONDS ends with a `timeout` event.
     """
-    ticket = db.query(Ticket).filter(Ticket.ticket_number == ticket_number).first()
+    ticket = await db.get(Ticket, ticket_id)
 
     if not ticket:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found"
         )
 
-    return ticket
+    processing = ticket.status in (TicketStatus.NEW, TicketStatus.IN_PROGRESS)
+    if processing or ticket_events.has_events(ticket_id):
+        events = _supervised_events(
+            ticket_id,
+            ticket_events.subscribe(
+                ticket_id,
+                after_id=last_event_id,
+                heartbeat_seconds=settings.SSE_HEARTBEAT_SECONDS,
+            ),
+            last_event_id,
+        )
+    else:
+        events = _single_event("done", ticket_outcome(ticket))
+    # Don't hold a pooled connection for the lifetime of the stream
+    await db.close()
+
+    async def event_stream():
+        async for message in events:
+            yield format_sse(message)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
+async def _single_event(event: str, data: dict):
+    yield {"id": 1, "event": event, "data": data}
+
+
+async def _final_event(ticket_id: int) -> Optional[Tuple[str, dict]]:
+    """The `done` or `failed` event of a ticket that finished processing, per the database."""
+    async with AsyncSessionLocal() as db:
+        ticket = await db.get(Ticket, ticket_id)
+    if ticket is None:
+        return "failed", {"error": "Ticket not found"}
+    if ticket.status in (TicketStatus.NEW, TicketStatus.IN_PROGRESS):
+        return None
+    error = (ticket.ticket_metadata or {}).get("error")
+    if error:
+        return "failed", {"error": error}
+    return "done", ticket_outcome(ticket)
+
+
+async def _supervised_events(ticket_id: int, events, last_id: int):
+    """
+    Pass a subscription through, checking the ticket's status on every heartbeat and
+    ending the stream after SSE_MAX_STREAM_SECONDS.
+    """
+    deadline = time.monotonic() + settings.SSE_MAX_STREAM_SECONDS
+    try:
+        async for message in events:
+            if message is None:
+                final = await _final_event(ticket_id)
+                if final is not None:
+                    # Finished without this process seeing it (e.g. another worker)
+                    event, data = final
+                    yield {"id": last_id + 1, "event": event, "data": data}
+                    return
+            else:
+                last_id = message["id"]
+            yield message
+            if time.monotonic() >= deadline:
+                yield {
+                    "id": last_id + 1,
+                    "event": "timeout",
+                    "data": {"max_stream_seconds": settings.SSE_MAX_STREAM_SECONDS},
+                }
+                return
+    finally:
+        await events.aclose()
+
+
+def _parse_include(include: str) -> Set[str]:
+    parts = {part.strip() for part in include.split(",") if part.strip()}
+    unknown = parts - set(TICKET_INCLUDES)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown include {sorted(unknown)}, expected some of {list(TICKET_INCLUDES)}",
+        )
+    return parts
+
+
+def _etag(version: tuple, include: Set[str]) -> str:
+    raw = "|".join(str(part) for part in (*version, *sorted(include)))
+    return f'"{hashlib.sha1(raw.encode()).hexdigest()[:20]}"'
+
+
+def _etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    return etag in tags or "*" in tags
+
+
+def _ticket_detail(ticket: Ticket, include: Set[str]) -> TicketWithTraces:
+    """Serialize only what was loaded: relations and trace columns not included are None."""
+    traces = None
+    if "traces" in include:
+        fields = AgentTraceResponse.model_fields
+        if "trace_data" not in include:
+            fields = [field for field in fields if field not in TRACE_DATA_FIELDS]
+        traces = [
+            AgentTraceResponse(**{field: getattr(trace, field) for field in fields})
+            for trace in ticket.agent_traces
+        ]
+    messages = None
+    if "messages" in include:
+        messages = [MessageResponse.model_validate(message) for message in ticket.messages]
+    return TicketWithTraces(
+        **TicketResponse.model_validate(ticket).model_dump(),
+        agent_traces=traces,
+        messages=messages,
+    )
+
+
+async def _get_ticket_detail(
+    db: AsyncSession, response: Response, where, include: str, if_none_match: Optional[str]
+) -> Union[TicketWithTraces, Response]:
+    """
+    A ticket with the requested relations, or 304 Not Modified when If-None-Match holds
+    its current ETag: one small version query for an unchanged ticket.
+    """
+    parts = _parse_include(include)
+    version = (await db.execute(ticket_version_query(where))).first()
+
+    if not version:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found"
+        )
+
+    etag = _etag(tuple(version), parts)
+    # Clients may keep the body but must revalidate it on every use
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if _etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    ticket = await db.scalar(ticket_detail_query(version.id, parts))
+    if not ticket:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found"
+        )
+    response.headers.update(headers)
+    return _ticket_detail(ticket, parts)
+
+
+@router.get("/{ticket_id}", response_model=TicketWithTraces)
+async def get_ticket(
+    ticket_id: int,
+    response: Response,
+    include: str = Query(default=DEFAULT_INCLUDE, description=INCLUDE_DESCRIPTION),
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get a specific ticket with all agent traces.
+
+    Supports ETag / If-None-Match: refreshing an unchanged ticket returns 304.
+    """
+    return await _get_ticket_detail(
+        db, response, Ticket.id == ticket_id, include, if_none_match
+    )
+
+
+@router.get("/number/{ticket_number}", response_model=TicketWithTraces)
+async def get_ticket_by_number(
+    ticket_number: str,
+    response: Response,
+    include: str = Query(default=DEFAULT_INCLUDE, description=INCLUDE_DESCRIPTION),
+    if_none_match: Optional[str] = Header(default=None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """
+    Get a ticket by its ticket number.
+    """
+    return await _get_ticket_detail(
+        db, response, Ticket.ticket_number == ticket_number, include, if_none_match
+    )
 
 
 @router.patch("/{ticket_id}", response_model=TicketResponse)
 async def update_ticket(
-    ticket_id: int, update_data: TicketUpdate, db: Session = Depends(get_db)
+    ticket_id: int, update_data: TicketUpdate, db: AsyncSession = Depends(get_async_db)
 ):
     """
     Update a ticket (for admin approval/editing).
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    # Locked so a concurrent update can't change the counted fields under the snapshot
+    ticket = await db.get(Ticket, ticket_id, with_for_update=True)
 
     if not ticket:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found"
         )
 
+    before = ticket_snapshot(ticket)
+
     # Update fields
     if update_data.status is not None:
         ticket.status = update_data.status
@@ -189,25 +599,45 @@ async def update_ticket(
     if update_data.response_approved is not None:
         ticket.response_approved = 1 if update_data.response_approved else 0
 
-    db.commit()
-    db.refresh(ticket)
+    await aapply_deltas(db, ticket_deltas(before, ticket_snapshot(ticket)), at=ticket.created_at)
+    await db.commit()
+    await db.refresh(ticket)
 
     return ticket
 
 
 @router.delete("/{ticket_id}", status_code=status.HTTP_204_NO_CONTENT)
-async def delete_ticket(ticket_id: int, db: Session = Depends(get_db)):
+async def delete_ticket(ticket_id: int, db: AsyncSession = Depends(get_async_db)):
     """
     Delete a ticket (admin only).
     """
-    ticket = db.query(Ticket).filter(Ticket.id == ticket_id).first()
+    ticket = await db.get(Ticket, ticket_id, with_for_update=True)
 
     if not ticket:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Ticket not found"
         )
 
-    db.delete(ticket)
-    db.commit()
+    traces = await db.execute(
+        select(
+            AgentTrace.created_at,
+            AgentTrace.agent_name,
+            AgentTrace.execution_time_ms,
+            AgentTrace.tokens_used,
+            AgentTrace.retry_count,
+            AgentTrace.output_data,
+        ).where(AgentTrace.ticket_id == ticket_id)
+    )
+    # Counters come off the hours they were counted in: the ticket's creation hour and
+    # the hours its traces were written
+    await aapply_hourly_deltas(
+        db,
+        [(ticket.created_at, ticket_deltas(ticket_snapshot(ticket), None))]
+        + trace_deltas_by_hour(traces, sign=-1),
+    )
+
+    # Loads the traces and messages so the ORM cascade can delete them
+    await db.delete(ticket)
+    await db.commit()
 
     return None
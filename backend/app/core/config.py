@@ -7,10 +7,27 @@ class Settings(BaseSettings):
 
     # Database
     DATABASE_URL: str = "sqlite:///./supportflow.db"
+    ASYNC_DATABASE_URL: Optional[str] = None  # Default: DATABASE_URL on aiosqlite/asyncpg
+    SQL_ECHO: bool = False  # Log every SQL statement
+    DB_POOL_SIZE: int = 10  # Per engine (sync and async each have a pool)
+    DB_MAX_OVERFLOW: int = 20
+    DB_POOL_TIMEOUT: float = 30.0  # Seconds to wait for a free connection
+    DB_POOL_RECYCLE: int = 1800  # Reconnect connections older than this (seconds)
+    DB_POOL_PRE_PING: bool = True  # Check connections before use, drops dead ones
+    SQLITE_BUSY_TIMEOUT_MS: int = 5000  # Wait for the write lock instead of failing
+    SQLITE_CACHE_SIZE_KB: int = 65536
 
     # OpenAI
     OPENAI_API_KEY: str
     OPENAI_MODEL: str = "gpt-4-turbo-preview"
+    OPENAI_BASE_URL: Optional[str] = None  # Override to point at a proxy or local stub
+    OPENAI_TIMEOUT: float = 60.0
+    OPENAI_CONNECT_TIMEOUT: float = 5.0
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    OPENAI_KEEPALIVE_EXPIRY: float = 30.0
+    OPENAI_MAX_RETRIES: int = 2  # Retries on connection errors, timeouts, 429 and 5xx
+    OPENAI_RETRY_BACKOFF_SECONDS: float = 0.5  # Doubled after each retry
 
     # External APIs
     TAVILY_API_KEY: Optional[str] = None
@@ -26,10 +43,94 @@ class Settings(BaseSettings):
     # Agent Configuration
     CONFIDENCE_THRESHOLD: float = 0.7
     MAX_AGENT_ITERATIONS: int = 10
+    PARALLEL_AGENTS: bool = True  # Run research and policy agents concurrently after triage
+    CONDITIONAL_ROUTING: bool = True  # Skip agents a ticket does not need
+    ESCALATION_SKIP_CONFIDENCE: float = 0.85  # Min agent confidence to skip escalation
+    ESCALATION_RULES_ENABLED: bool = True  # Decide escalation locally, LLM only if ambiguous
+    ESCALATION_RULES_PATH: Optional[str] = None  # JSON file overriding the default rules
+    FAST_PATH_ENABLED: bool = True  # One combined LLM call for simple informational tickets
+    FAST_PATH_MAX_MESSAGE_CHARS: int = 600  # Longer messages always take the full graph
+    FAST_PATH_MIN_CONFIDENCE: float = 0.8  # Below this the full graph re-runs the ticket
+
+    # Local Intent Classifier (retrain: python -m app.services.intent_classifier)
+    INTENT_CLASSIFIER_ENABLED: bool = True
+    INTENT_CLASSIFIER_PATH: str = "./intent_classifier.npz"
+    INTENT_CLASSIFIER_MIN_CONFIDENCE: float = 0.85  # Below this triage calls the LLM
+    INTENT_CLASSIFIER_MIN_EXAMPLES: int = 5  # Labels with fewer tickets are not learned
+    INTENT_CLASSIFIER_SHADOW_RATE: float = 0.1  # Confident tickets still sent to the LLM
+    INTENT_CLASSIFIER_TEMPERATURE: float = 0.05  # Softmax temperature over cosine similarity
+
+    # Ticket Processing
+    ASYNC_TICKET_PROCESSING: bool = False  # Return 202 and process tickets in the worker pool
+    ASYNC_AGENT_CLIENT: bool = False  # Run agents on the async OpenAI client via ainvoke
+    TICKET_WORKERS: int = 4
+    TICKET_QUEUE_MAX_SIZE: int = 100
+    TICKET_STATUS_MAX_WAIT_SECONDS: int = 30
+    # Resume tickets (live or bulk) left new or in progress by a restart. Only for a single
+    # API process per database: every process re-runs all unfinished tickets it finds.
+    TICKET_RECOVERY_ON_STARTUP: bool = False
+
+    # Trace Persistence
+    TRACE_WRITE_BUFFER_ENABLED: bool = False  # Batch trace inserts across tickets (write-behind)
+    TRACE_WRITE_BUFFER_MAX_ROWS: int = 500  # Flush when this many rows are pending
+    TRACE_WRITE_BUFFER_FLUSH_SECONDS: float = 1.0  # ...or at least this often
+
+    # Statistics (rebuild counters: python -m app.services.stats_counters --rebuild)
+    STATS_CACHE_TTL_SECONDS: float = 5.0  # GET /api/stats response reuse (0: always read)
+    STATS_SKETCH_RELATIVE_ACCURACY: float = 0.02  # Percentile error; rebuild after changing
+
+    # Bulk Ingestion (POST /api/tickets/bulk)
+    BULK_MAX_TICKETS: int = 5000  # Per request
+    BULK_CONCURRENCY: int = 8  # Tickets processed at once per bulk request
+    BULK_TICKETS_PER_SECOND: float = 2.0  # Rate tickets are started at (0: unlimited)
+    BULK_OFFLINE_CONCURRENCY: int = 2  # Offline (batch) mode runs one job at a time, slowly
+    BULK_OFFLINE_TICKETS_PER_SECOND: float = 0.5
+    BULK_OFFLINE_COMPLETION_WINDOW: str = "24h"
+    BULK_OFFLINE_IDLE_POLL_SECONDS: float = 1.0  # Wait while the live ticket queue is busy
+    BULK_OFFLINE_MAX_JOBS: int = 100  # Finished jobs kept for GET /api/tickets/bulk/{id}
+
+    # Streaming (GET /api/tickets/{id}/stream)
+    RESPONSE_STREAMING_ENABLED: bool = True  # Stream the response draft token by token
+    TICKET_EVENTS_RETENTION_SECONDS: int = 300  # Replay kept after a ticket finishes
+    TICKET_EVENTS_MAX_BUFFERED: int = 5000  # Events replayed to late subscribers
+    SSE_HEARTBEAT_SECONDS: float = 15.0  # Keep-alive comment interval on idle streams
+    SSE_MAX_STREAM_SECONDS: float = 600.0  # Streams end with a `timeout` event after this
+
+    # Semantic Response Cache: reuses one customer's drafted response for another with
+    # only the name swapped, so it is opt-in
+    RESPONSE_CACHE_ENABLED: bool = False
+    RESPONSE_CACHE_SIMILARITY: float = 0.92  # Min cosine similarity to reuse a response
+    RESPONSE_CACHE_TTL_SECONDS: int = 3600
+    RESPONSE_CACHE_MAX_ENTRIES: int = 1000
+
+    # LLM Call Memoization
+    LLM_CACHE_BACKEND: str = "memory"  # "none", "memory" or "sqlite"
+    LLM_CACHE_MAX_ENTRIES: int = 5000
+    LLM_CACHE_TTL_SECONDS: int = 3600  # Answers older than this are asked again (0: never)
+    LLM_CACHE_PATH: str = "./llm_cache.db"
+    LLM_CACHE_BYPASS_AGENTS: list[str] = []  # e.g. ["response"] to always call the LLM
 
     # Vector Store
+    VECTOR_STORE_BACKEND: str = "chroma"  # "chroma" or "numpy"
     CHROMA_PERSIST_DIRECTORY: str = "./chroma_db"
+    NUMPY_INDEX_DIRECTORY: str = "./numpy_index"
     EMBEDDING_MODEL: str = "sentence-transformers/all-MiniLM-L6-v2"
+    KB_QUERY_CACHE_SIZE: int = 1024  # Cached query embeddings
+    KB_WARMUP_BLOCKING: bool = False  # Wait for KB warm-up before serving (old behaviour)
+
+    # Retrieval
+    KB_HYBRID_SEARCH: bool = True  # Fuse BM25 with vector search (False: vector only)
+    KB_HYBRID_CANDIDATES: int = 20  # Candidates taken from each retriever before fusion
+    KB_RRF_K: int = 60  # Reciprocal rank fusion constant
+    KB_RERANK: bool = False  # Rerank fused candidates with a local cross-encoder
+    KB_RERANKER_MODEL: str = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+    KB_RERANK_CANDIDATES: int = 10
+
+    # Context Packing (prompt token budgets)
+    CONTEXT_BUDGET_RESEARCH_TOKENS: int = 600  # Knowledge base text in the research prompt
+    CONTEXT_BUDGET_POLICY_TOKENS: int = 300  # Order details in the policy prompt
+    CONTEXT_BUDGET_MESSAGE_TOKENS: int = 400  # Customer message in triage/response prompts
+    CONTEXT_BUDGET_RESPONSE_TOKENS: int = 400  # Research findings in the response prompt
 
     class Config:
         env_file = ".env"
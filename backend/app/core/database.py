@@ -1,22 +1,121 @@
-from sqlalchemy import create_engine
+from typing import Any, AsyncIterator, Dict
+
+from sqlalchemy import create_engine, event, inspect, text
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
 from app.core.config import settings
 
+# Async drivers for the URL schemes the sync engine understands
+ASYNC_DRIVERS = {"sqlite": "aiosqlite", "postgresql": "asyncpg"}
+
+
+def is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def async_database_url(url: str) -> str:
+    """The DATABASE_URL with its driver swapped for the async one (aiosqlite, asyncpg)."""
+    parsed = make_url(url)
+    backend = parsed.get_backend_name()
+    if backend not in ASYNC_DRIVERS:
+        raise ValueError(f"No async driver configured for {backend}, set ASYNC_DATABASE_URL")
+    return parsed.set(drivername=f"{backend}+{ASYNC_DRIVERS[backend]}").render_as_string(
+        hide_password=False
+    )
+
+
+def _engine_options(url: str) -> Dict[str, Any]:
+    options: Dict[str, Any] = {"echo": settings.SQL_ECHO}
+    if is_sqlite(url) and make_url(url).database in (None, "", ":memory:"):
+        # In-memory SQLite uses a single-connection pool; pool sizing does not apply
+        return options
+    if is_sqlite(url) and make_url(url).get_dialect().is_async:
+        # aiosqlite defaults to NullPool for files, which takes no pool sizing
+        options["poolclass"] = AsyncAdaptedQueuePool
+    options.update(
+        pool_size=settings.DB_POOL_SIZE,
+        max_overflow=settings.DB_MAX_OVERFLOW,
+        pool_timeout=settings.DB_POOL_TIMEOUT,
+        pool_recycle=settings.DB_POOL_RECYCLE,
+        pool_pre_ping=settings.DB_POOL_PRE_PING,
+    )
+    return options
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    """WAL lets readers run alongside the writer; NORMAL sync is durable enough under WAL."""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={settings.SQLITE_BUSY_TIMEOUT_MS}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute(f"PRAGMA cache_size=-{settings.SQLITE_CACHE_SIZE_KB}")
+    cursor.close()
+
+
 # Create database engine
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if "sqlite" in settings.DATABASE_URL else {},
-    echo=settings.DEBUG,
+    connect_args={"check_same_thread": False} if is_sqlite(settings.DATABASE_URL) else {},
+    **_engine_options(settings.DATABASE_URL),
 )
 
-# Create session factory
+# Async engine for request handlers (aiosqlite / asyncpg)
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(ASYNC_DATABASE_URL, **_engine_options(ASYNC_DATABASE_URL))
+
+if is_sqlite(settings.DATABASE_URL):
+    event.listen(engine, "connect", _set_sqlite_pragmas)
+    event.listen(async_engine.sync_engine, "connect", _set_sqlite_pragmas)
+
+# Create session factories
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Objects stay usable after commit: lazy reloads are not possible on an async session
+AsyncSessionLocal = async_sessionmaker(async_engine, autoflush=False, expire_on_commit=False)
 
 # Create base class for declarative models
 Base = declarative_base()
 
 
+def add_missing_columns(bind):
+    """
+    Add nullable columns added to existing tables (create_all only creates missing
+    tables). Columns that need a value for existing rows must be added by hand.
+    """
+    inspector = inspect(bind)
+    tables = set(inspector.get_table_names())
+    quote = bind.dialect.identifier_preparer.quote
+    with bind.begin() as connection:
+        for table in Base.metadata.sorted_tables:
+            if table.name not in tables:
+                continue
+            existing = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                if not column.nullable:
+                    print(f"✗ Missing NOT NULL column {table.name}.{column.name}, add it by hand")
+                    continue
+                column_type = column.type.compile(dialect=bind.dialect)
+                connection.execute(
+                    text(
+                        f"ALTER TABLE {quote(table.name)} "
+                        f"ADD COLUMN {quote(column.name)} {column_type}"
+                    )
+                )
+                print(f"✓ Added column {table.name}.{column.name}")
+
+
+def create_missing_indexes(bind):
+    """Create indexes added to existing tables (create_all only creates missing tables)."""
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=bind, checkfirst=True)
+
+
 def get_db():
     """Dependency to get database session."""
     db = SessionLocal()
@@ -24,3 +123,9 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+async def get_async_db() -> AsyncIterator[AsyncSession]:
+    """Dependency to get an async database session (doesn't block the event loop)."""
+    async with AsyncSessionLocal() as db:
+        yield db
@@ -0,0 +1,185 @@
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+
+# Seconds buckets: from fast tool calls up to slow, retried LLM calls
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+TOKEN_BUCKETS = (16, 32, 64, 128, 256, 512, 1024, 2048, 4096, 8192)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(label_names: Sequence[str], label_values: Tuple[str, ...], **extra) -> str:
+    pairs = list(zip(label_names, label_values)) + list(extra.items())
+    if not pairs:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in pairs) + "}"
+
+
+def _format_value(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+class Counter:
+    """Monotonic counter with labels."""
+
+    def __init__(self, name: str, documentation: str, label_names: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = defaultdict(float)
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        with self._lock:
+            self._values[key] += amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            for key, value in sorted(self._values.items()):
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}{labels} {_format_value(value)}")
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels, in the Prometheus text format."""
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket (+Inf last), sum]
+        self._series: Dict[Tuple[str, ...], List[Any]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels):
+        key = tuple(str(labels[name]) for name in self.label_names)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            for key, (counts, total) in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets + (float("inf"),), counts):
+                    cumulative += count
+                    le = "+Inf" if bound == float("inf") else _format_value(bound)
+                    labels = _format_labels(self.label_names, key, le=le)
+                    lines.append(f"{self.name}_bucket{labels} {cumulative}")
+                labels = _format_labels(self.label_names, key)
+                lines.append(f"{self.name}_sum{labels} {_format_value(total)}")
+                lines.append(f"{self.name}_count{labels} {cumulative}")
+        return lines
+
+
+class MetricsRegistry:
+    """Holds every metric and renders them for the /metrics endpoint."""
+
+    def __init__(self):
+        self._metrics: List[Any] = []
+
+    def counter(self, name: str, documentation: str, label_names: Sequence[str] = ()) -> Counter:
+        metric = Counter(name, documentation, label_names)
+        self._metrics.append(metric)
+        return metric
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        label_names: Sequence[str] = (),
+        buckets: Sequence[float] = LATENCY_BUCKETS,
+    ) -> Histogram:
+        metric = Histogram(name, documentation, label_names, buckets)
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global instance
+registry = MetricsRegistry()
+
+agent_duration = registry.histogram(
+    "supportflow_agent_duration_seconds", "Total agent node wall time", ["agent"]
+)
+agent_llm_duration = registry.histogram(
+    "supportflow_agent_llm_duration_seconds", "LLM call wall time, retries included", ["agent"]
+)
+agent_time_to_first_token = registry.histogram(
+    "supportflow_agent_time_to_first_token_seconds",
+    "Time to first token of streamed completions",
+    ["agent"],
+)
+agent_prompt_tokens = registry.histogram(
+    "supportflow_agent_prompt_tokens", "Prompt tokens per LLM call", ["agent"], TOKEN_BUCKETS
+)
+agent_completion_tokens = registry.histogram(
+    "supportflow_agent_completion_tokens",
+    "Completion tokens per LLM call",
+    ["agent"],
+    TOKEN_BUCKETS,
+)
+tool_duration = registry.histogram(
+    "supportflow_tool_duration_seconds", "Agent tool call wall time", ["tool"]
+)
+llm_retries = registry.counter(
+    "supportflow_llm_retries_total", "Retried LLM calls after transient errors", ["agent"]
+)
+agent_runs = registry.counter(
+    "supportflow_agent_runs_total",
+    "Agent node runs, by LLM use (called, cached or none)",
+    ["agent", "llm"],
+)
+agent_skipped = registry.counter(
+    "supportflow_agent_skipped_total",
+    "Agent runs skipped by conditional routing (also counted in agent runs)",
+    ["agent"],
+)
+
+
+def record_agent_trace(trace: Dict[str, Any], llm: str):
+    """Record an instrumented agent trace (see agent_nodes.instrument)."""
+    agent = trace["agent_name"]
+    agent_runs.inc(agent=agent, llm=llm)
+    if (trace.get("output_data") or {}).get("skipped"):
+        # Nothing ran: counted like /api/stats/agents does, no latency to observe
+        agent_skipped.inc(agent=agent)
+        return
+    agent_duration.observe(trace["execution_time_ms"] / 1000, agent=agent)
+
+    if llm == "called":
+        agent_llm_duration.observe(trace["llm_time_ms"] / 1000, agent=agent)
+        agent_prompt_tokens.observe(trace["prompt_tokens"], agent=agent)
+        agent_completion_tokens.observe(trace["completion_tokens"], agent=agent)
+        if trace["retry_count"]:
+            llm_retries.inc(trace["retry_count"], agent=agent)
+    ttft: Optional[int] = trace.get("time_to_first_token_ms")
+    if ttft is not None:
+        agent_time_to_first_token.observe(ttft / 1000, agent=agent)
+
+    for tool, result in (trace.get("tool_results") or {}).items():
+        tool_duration.observe(result["duration_ms"] / 1000, tool=tool)
@@ -1,11 +1,34 @@
-from fastapi import FastAPI
+import asyncio
+from fastapi import FastAPI, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, PlainTextResponse
 from contextlib import asynccontextmanager
 
 from app.core.config import settings
-from app.core.database import engine, Base
+from app.core.database import (
+    engine,
+    async_engine,
+    Base,
+    SessionLocal,
+    add_missing_columns,
+    create_missing_indexes,
+)
+from app.core.metrics import registry
 from app.api import tickets_router, stats_router
 from app.services.knowledge_base import kb
+from app.services.worker_pool import ticket_worker_pool
+from app.services.ticket_processor import (
+    process_ticket,
+    aprocess_ticket,
+    run_ticket,
+    unfinished_ticket_ids,
+    requeue_tickets,
+)
+from app.services.bulk_ingest import offline_batches
+from app.services.trace_writer import trace_writer
+from app.services.stats_counters import ensure_counters
+from app.services.ticket_search import install_search_index
+from app.agents.agent_nodes import aclient
 
 
 @asynccontextmanager
@@ -15,18 +38,73 @@ async def lifespan(app: FastAPI):
     """
     # Startup: Create database tables
     Base.metadata.create_all(bind=engine)
-
-    # Load knowledge base
-    try:
-        kb.load_documents("./knowledge_base")
-        print("✓ Knowledge base loaded successfully")
-    except Exception as e:
-        print(f"✗ Failed to load knowledge base: {e}")
+    add_missing_columns(engine)
+    create_missing_indexes(engine)
+    install_search_index(engine)
+
+    # Backfill the stats counters once for databases created before they existed
+    def backfill_stats_counters():
+        db = SessionLocal()
+        try:
+            if ensure_counters(db):
+                print("✓ Built stats counters from existing tickets")
+        finally:
+            db.close()
+
+    await asyncio.to_thread(backfill_stats_counters)
+
+    # Warm up the knowledge base (embedding model, index, documents) in the background
+    # so the server can accept connections immediately; /health/ready reports progress.
+    async def warm_up_knowledge_base():
+        try:
+            await asyncio.to_thread(kb.warm_up, "./knowledge_base")
+            print("✓ Knowledge base loaded successfully")
+        except Exception as e:
+            print(f"✗ Failed to load knowledge base: {e}")
+
+    warmup_task = asyncio.create_task(warm_up_knowledge_base())
+    if settings.KB_WARMUP_BLOCKING:
+        await warmup_task
+
+    # Start the trace write-behind flusher (TRACE_WRITE_BUFFER_ENABLED)
+    trace_writer.start()
+
+    # Start background ticket workers
+    if settings.ASYNC_TICKET_PROCESSING:
+        ticket_worker_pool.start(aprocess_ticket if settings.ASYNC_AGENT_CLIENT else process_ticket)
+        print(f"✓ Started {ticket_worker_pool.num_workers} ticket workers")
+
+    # Queues and bulk jobs are in memory: resume tickets a restart left new or in progress
+    async def recover_unfinished_tickets():
+        # The agents need the knowledge base; shielded so shutdown doesn't cancel warm-up
+        await asyncio.shield(warmup_task)
+        if not kb.is_ready:
+            print("✗ Knowledge base not ready, unfinished tickets were not resumed")
+            return
+        ticket_ids = await asyncio.to_thread(unfinished_ticket_ids)
+        if ticket_ids and ticket_worker_pool.running:
+            await requeue_tickets(ticket_ids)
+        elif ticket_ids:
+            # No worker pool: process them in the background like an offline bulk import
+            job = offline_batches.submit(list(enumerate(ticket_ids)), [], run_ticket)
+            print(f"✓ Resuming {len(ticket_ids)} unfinished tickets as batch {job.id}")
+
+    recovery_task = None
+    if settings.TICKET_RECOVERY_ON_STARTUP:
+        recovery_task = asyncio.create_task(recover_unfinished_tickets())
 
     yield
 
     # Shutdown
     print("Shutting down...")
+    if recovery_task:
+        recovery_task.cancel()
+        await asyncio.gather(recovery_task, return_exceptions=True)
+    await ticket_worker_pool.stop()
+    await offline_batches.stop()
+    await asyncio.to_thread(trace_writer.stop)
+    await async_engine.dispose()
+    await aclient.close()
 
 
 # Create FastAPI app
@@ -44,6 +122,8 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # Response headers browser clients need to read (pagination, caching, bulk imports)
+    expose_headers=["X-Next-Cursor", "ETag", "X-Tickets-Accepted", "X-Tickets-Invalid"],
 )
 
 # Include routers
@@ -67,6 +147,28 @@ async def health_check():
     return {"status": "healthy", "environment": settings.ENVIRONMENT}
 
 
+@app.get("/health/live")
+async def liveness_check():
+    """Liveness probe: the process is up and serving requests."""
+    return {"status": "alive"}
+
+
+@app.get("/health/ready")
+async def readiness_check():
+    """Readiness probe: the knowledge base has finished warming up."""
+    warmup = kb.warmup_status()
+    body = {"status": "ready" if kb.is_ready else "warming_up", "warmup": warmup}
+    if not kb.is_ready:
+        return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=body)
+    return body
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Per-agent latency, token and tool histograms in the Prometheus text format."""
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
+
+
 if __name__ == "__main__":
     import uvicorn
 
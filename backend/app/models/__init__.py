@@ -1,6 +1,7 @@
 from app.models.ticket import Ticket, TicketStatus, TicketPriority
 from app.models.agent_trace import AgentTrace
 from app.models.ticket_message import TicketMessage, MessageRole
+from app.models.stats_counter import StatsCounter
 
 __all__ = [
     "Ticket",
@@ -9,4 +10,5 @@ __all__ = [
     "AgentTrace",
     "TicketMessage",
     "MessageRole",
+    "StatsCounter",
 ]
@@ -29,6 +29,11 @@ class AgentTrace(Base):
     # Performance metrics
     execution_time_ms = Column(Integer)  # How long the agent took
     tokens_used = Column(Integer, nullable=True)  # LLM tokens consumed
+    llm_time_ms = Column(Integer, nullable=True)  # LLM wall time, retries included
+    prompt_tokens = Column(Integer, nullable=True)
+    completion_tokens = Column(Integer, nullable=True)
+    time_to_first_token_ms = Column(Integer, nullable=True)  # Streamed completions only
+    retry_count = Column(Integer, nullable=True)  # LLM retries after transient errors
 
     # Timestamps
     created_at = Column(DateTime, default=datetime.utcnow, index=True)
@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, Float, UniqueConstraint
+from app.core.database import Base
+
+
+class StatsCounter(Base):
+    """
+    Incrementally maintained statistics counter.
+
+    `bucket` is "total" for all-time values or an hour ("2024-01-15T10") for the change
+    in that hour, so the hourly buckets of a metric sum to its total.
+    """
+
+    __tablename__ = "stats_counters"
+    __table_args__ = (UniqueConstraint("bucket", "metric", name="uq_stats_counters_bucket_metric"),)
+
+    id = Column(Integer, primary_key=True)
+    bucket = Column(String(16), nullable=False, index=True)
+    metric = Column(String(255), nullable=False)  # e.g. "tickets", "status:resolved"
+    value = Column(Float, nullable=False, default=0.0)
+
+    def __repr__(self):
+        return f"<StatsCounter {self.bucket} {self.metric}={self.value}>"
@@ -1,4 +1,4 @@
-from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Enum, JSON
+from sqlalchemy import Column, Integer, String, Text, DateTime, Float, Enum, JSON, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -28,16 +28,22 @@ class Ticket(Base):
     """Support ticket model."""
 
     __tablename__ = "tickets"
+    # Keyset pagination of GET /api/tickets: newest first, optionally by status or customer
+    __table_args__ = (
+        Index("ix_tickets_created_at_id", "created_at", "id"),
+        Index("ix_tickets_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_tickets_customer_email_created_at_id", "customer_email", "created_at", "id"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     ticket_number = Column(String(50), unique=True, index=True)
-    customer_email = Column(String(255), index=True)
+    customer_email = Column(String(255))
     customer_name = Column(String(255))
     subject = Column(String(500))
     message = Column(Text)
 
     # Triage results
-    status = Column(Enum(TicketStatus), default=TicketStatus.NEW, index=True)
+    status = Column(Enum(TicketStatus), default=TicketStatus.NEW)
     priority = Column(Enum(TicketPriority), default=TicketPriority.MEDIUM)
     intent = Column(String(255))  # e.g., "refund_request", "product_inquiry", etc.
     confidence = Column(Float)  # AI confidence score
@@ -52,7 +58,7 @@ class Ticket(Base):
     ticket_metadata = Column(JSON, nullable=True)  # Store additional structured data
 
     # Timestamps
-    created_at = Column(DateTime, default=datetime.utcnow, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     resolved_at = Column(DateTime, nullable=True)
 
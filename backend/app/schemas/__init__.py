@@ -1,4 +1,13 @@
-from app.schemas.ticket import TicketCreate, TicketResponse, TicketUpdate, TicketWithTraces
+from app.schemas.ticket import (
+    TicketCreate,
+    TicketResponse,
+    TicketSummary,
+    TicketSearchResult,
+    TicketUpdate,
+    TicketWithTraces,
+    TicketStatusResponse,
+    BulkBatchResponse,
+)
 from app.schemas.agent_trace import AgentTraceResponse
 from app.schemas.message import MessageCreate, MessageResponse
 from app.schemas.agent_output import (
@@ -7,14 +16,19 @@ from app.schemas.agent_output import (
     PolicyCheckOutput,
     ResponseOutput,
     EscalationDecision,
+    FastPathOutput,
     AgentState,
 )
 
 __all__ = [
     "TicketCreate",
     "TicketResponse",
+    "TicketSummary",
+    "TicketSearchResult",
     "TicketUpdate",
     "TicketWithTraces",
+    "TicketStatusResponse",
+    "BulkBatchResponse",
     "AgentTraceResponse",
     "MessageCreate",
     "MessageResponse",
@@ -23,5 +37,6 @@ __all__ = [
     "PolicyCheckOutput",
     "ResponseOutput",
     "EscalationDecision",
+    "FastPathOutput",
     "AgentState",
 ]
@@ -68,6 +68,18 @@ class EscalationDecision(BaseModel):
     )
 
 
+class FastPathOutput(BaseModel):
+    """Structured output of the fast path: triage, research, response and escalation at once."""
+
+    triage: TriageOutput = Field(..., description="Intent and priority classification")
+    research_summary: str = Field(..., description="Summary of the relevant KB information")
+    research_confidence: float = Field(
+        ..., ge=0.0, le=1.0, description="Confidence that the articles answer the ticket"
+    )
+    response: ResponseOutput = Field(..., description="The drafted response to the customer")
+    escalation: EscalationDecision = Field(..., description="Whether a human must review")
+
+
 class AgentState(BaseModel):
     """Complete state passed between agents in the workflow."""
 
@@ -18,6 +18,11 @@ class AgentTraceResponse(BaseModel):
     tool_results: Optional[dict] = None
     execution_time_ms: int
     tokens_used: Optional[int] = None
+    llm_time_ms: Optional[int] = None
+    prompt_tokens: Optional[int] = None
+    completion_tokens: Optional[int] = None
+    time_to_first_token_ms: Optional[int] = None
+    retry_count: Optional[int] = None
     created_at: datetime
 
     class Config:
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List
+from typing import Any, Dict, Optional, List
 from datetime import datetime
 from app.models.ticket import TicketStatus, TicketPriority
 
@@ -14,21 +14,18 @@ class TicketCreate(BaseModel):
     order_id: Optional[str] = None
 
 
-class TicketResponse(BaseModel):
-    """Schema for ticket response."""
+class TicketSummary(BaseModel):
+    """Schema for ticket list rows (?view=summary): no message or response text."""
 
     id: int
     ticket_number: str
     customer_email: str
     customer_name: str
     subject: str
-    message: str
     status: TicketStatus
     priority: TicketPriority
     intent: Optional[str] = None
     confidence: Optional[float] = None
-    ai_response: Optional[str] = None
-    final_response: Optional[str] = None
     response_approved: bool
     order_id: Optional[str] = None
     created_at: datetime
@@ -39,6 +36,23 @@ class TicketResponse(BaseModel):
         from_attributes = True
 
 
+class TicketResponse(TicketSummary):
+    """Schema for ticket response."""
+
+    message: str
+    ai_response: Optional[str] = None
+    final_response: Optional[str] = None
+
+
+class TicketSearchResult(TicketSummary):
+    """Schema for a ticket search hit."""
+
+    score: float = Field(..., description="Relevance, higher is better")
+    snippet: Optional[str] = Field(
+        None, description="Matching text, HTML-escaped, with <mark> highlights"
+    )
+
+
 class TicketUpdate(BaseModel):
     """Schema for updating a ticket."""
 
@@ -48,11 +62,43 @@ class TicketUpdate(BaseModel):
     response_approved: Optional[bool] = None
 
 
+class TicketStatusResponse(BaseModel):
+    """Schema for ticket processing status (polling endpoint)."""
+
+    id: int
+    ticket_number: str
+    status: TicketStatus
+    processing: bool = Field(..., description="Whether the ticket is queued or being processed")
+    updated_at: datetime
+
+
+class BatchRequestCounts(BaseModel):
+    total: int
+    completed: int
+    failed: int
+
+
+class BulkBatchResponse(BaseModel):
+    """Offline bulk import job, shaped like an OpenAI Batch API batch object."""
+
+    id: str
+    object: str = "batch"
+    status: str = Field(..., description="validating, in_progress, completed, failed or cancelled")
+    completion_window: str
+    created_at: datetime
+    in_progress_at: Optional[datetime] = None
+    completed_at: Optional[datetime] = None
+    request_counts: BatchRequestCounts
+    results: List[Dict[str, Any]] = Field(
+        default_factory=list, description="Per-ticket results by input index"
+    )
+
+
 class TicketWithTraces(TicketResponse):
-    """Ticket response with agent traces included."""
+    """Ticket response with agent traces included (null when left out with ?include=)."""
 
-    agent_traces: List["AgentTraceResponse"] = []
-    messages: List["MessageResponse"] = []
+    agent_traces: Optional[List["AgentTraceResponse"]] = []
+    messages: Optional[List["MessageResponse"]] = []
 
 
 # Import here to avoid circular dependency
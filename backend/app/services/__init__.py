@@ -1,4 +1,24 @@
 from app.services.knowledge_base import kb, KnowledgeBase
+from app.services.vector_store import VectorStore, create_vector_store
+from app.services.bm25_index import BM25Index
 from app.services.mock_order_api import order_api, MockOrderAPI
+from app.services.worker_pool import ticket_worker_pool, TicketWorkerPool, QueueFullError
+from app.services.response_cache import response_cache, SemanticResponseCache
+from app.services.ticket_events import ticket_events, TicketEventBroker
 
-__all__ = ["kb", "KnowledgeBase", "order_api", "MockOrderAPI"]
+__all__ = [
+    "kb",
+    "KnowledgeBase",
+    "VectorStore",
+    "create_vector_store",
+    "BM25Index",
+    "order_api",
+    "MockOrderAPI",
+    "ticket_worker_pool",
+    "TicketWorkerPool",
+    "QueueFullError",
+    "response_cache",
+    "SemanticResponseCache",
+    "ticket_events",
+    "TicketEventBroker",
+]
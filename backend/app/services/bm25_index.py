@@ -0,0 +1,120 @@
+import heapq
+import math
+import re
+import threading
+from collections import Counter, defaultdict
+from typing import List, Dict, Any, Iterable, Optional, Tuple
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+STOPWORDS = frozenset(
+    "a an and are as at be by can do for from has have how i in is it my of on or our "
+    "the to was we what when where which will with you your".split()
+)
+
+
+def tokenize(text: str) -> List[str]:
+    """Lowercase alphanumeric tokens; snake_case statuses and SKU codes split into parts."""
+    return [token for token in TOKEN_PATTERN.findall(text.lower()) if token not in STOPWORDS]
+
+
+class BM25Index:
+    """
+    In-process inverted index with Okapi BM25 scoring.
+
+    Holds the same chunks as the vector store and is kept in sync on upsert/delete, so
+    exact-token queries (order statuses, SKUs, "RMA") match even when embeddings miss.
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75):
+        self.k1 = k1
+        self.b = b
+        self._lock = threading.Lock()
+        self._postings: Dict[str, Dict[str, int]] = defaultdict(dict)  # term -> {id: tf}
+        self._term_counts: Dict[str, Counter] = {}
+        self._lengths: Dict[str, int] = {}
+        self._records: Dict[str, Tuple[str, Dict[str, Any]]] = {}
+        self._total_length = 0
+
+    def __len__(self) -> int:
+        return len(self._lengths)
+
+    def add(
+        self,
+        ids: Iterable[str],
+        documents: Iterable[str],
+        metadatas: Iterable[Dict[str, Any]],
+    ):
+        """Index chunks, replacing any already indexed under the same id."""
+        with self._lock:
+            for id_, document, metadata in zip(ids, documents, metadatas):
+                self._remove(id_)
+                counts = Counter(tokenize(document))
+                for term, tf in counts.items():
+                    self._postings[term][id_] = tf
+                length = sum(counts.values())
+                self._term_counts[id_] = counts
+                self._lengths[id_] = length
+                self._records[id_] = (document, metadata)
+                self._total_length += length
+
+    def remove(self, ids: Iterable[str]):
+        with self._lock:
+            for id_ in ids:
+                self._remove(id_)
+
+    def _remove(self, id_: str):
+        counts = self._term_counts.pop(id_, None)
+        if counts is None:
+            return
+        for term in counts:
+            postings = self._postings[term]
+            postings.pop(id_, None)
+            if not postings:
+                del self._postings[term]
+        self._total_length -= self._lengths.pop(id_)
+        del self._records[id_]
+
+    def record(self, id_: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+        """(document, metadata) of an indexed chunk."""
+        return self._records.get(id_)
+
+    def search(self, query: str, n_results: int) -> List[Tuple[str, float]]:
+        """Top n_results (id, score) pairs; chunks sharing no term with the query are skipped."""
+        terms = set(tokenize(query))
+        with self._lock:
+            total_docs = len(self._lengths)
+            if not total_docs or not terms:
+                return []
+            avg_length = self._total_length / total_docs
+
+            scores: Dict[str, float] = defaultdict(float)
+            for term in terms:
+                postings = self._postings.get(term)
+                if not postings:
+                    continue
+                df = len(postings)
+                idf = math.log(1 + (total_docs - df + 0.5) / (df + 0.5))
+                for id_, tf in postings.items():
+                    norm = self.k1 * (1 - self.b + self.b * self._lengths[id_] / avg_length)
+                    scores[id_] += idf * tf * (self.k1 + 1) / (tf + norm)
+
+        return heapq.nlargest(n_results, scores.items(), key=lambda item: item[1])
+
+
+def reciprocal_rank_fusion(rankings: List[List[str]], k: int = 60) -> List[Tuple[str, float]]:
+    """
+    Fuse ranked id lists by reciprocal rank: score(d) = sum(1 / (k + rank(d))).
+
+    Scores are normalized by the best achievable score, so they fall in [0, 1].
+    """
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, id_ in enumerate(ranking, start=1):
+            scores[id_] += 1 / (k + rank)
+
+    best = len(rankings) / (k + 1)
+    return sorted(
+        ((id_, score / best) for id_, score in scores.items()),
+        key=lambda item: item[1],
+        reverse=True,
+    )
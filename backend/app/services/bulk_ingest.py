@@ -0,0 +1,300 @@
+import asyncio
+import json
+import time
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Ticket, TicketStatus, TicketPriority
+from app.schemas import TicketCreate
+from app.services.worker_pool import ticket_worker_pool
+from app.services.stats_counters import apply_deltas, ticket_deltas, ticket_snapshot
+
+NDJSON_CONTENT_TYPES = ("application/x-ndjson", "application/jsonl", "application/json-lines")
+
+# Strong references to bulk workers, which outlive the request that started them
+_running_tasks: Set[asyncio.Task] = set()
+
+
+class BulkPayloadError(ValueError):
+    """Raised when a bulk request body is neither NDJSON nor a JSON array."""
+
+
+def parse_bulk_payload(
+    body: bytes, content_type: str
+) -> Tuple[List[Tuple[int, TicketCreate]], List[Dict[str, Any]]]:
+    """
+    Parse NDJSON (one ticket per line) or a JSON array of tickets.
+
+    Returns (index, ticket) pairs for valid items and an error result per invalid item,
+    so one bad line does not reject the whole import.
+    """
+    if content_type.split(";")[0].strip() in NDJSON_CONTENT_TYPES:
+        raw_items = []
+        for line in body.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                raw_items.append(json.loads(line))
+            except json.JSONDecodeError as e:
+                raw_items.append(e)
+    else:
+        try:
+            raw_items = json.loads(body)
+        except json.JSONDecodeError as e:
+            raise BulkPayloadError(f"Invalid JSON: {e}")
+        if not isinstance(raw_items, list):
+            raise BulkPayloadError("Expected a JSON array of tickets or NDJSON")
+
+    valid, errors = [], []
+    for index, raw in enumerate(raw_items):
+        if isinstance(raw, json.JSONDecodeError):
+            errors.append({"index": index, "status": "invalid", "error": f"Invalid JSON: {raw}"})
+            continue
+        try:
+            valid.append((index, TicketCreate.model_validate(raw)))
+        except ValidationError as e:
+            errors.append(
+                {
+                    "index": index,
+                    "status": "invalid",
+                    "error": e.errors(include_url=False, include_context=False),
+                }
+            )
+    return valid, errors
+
+
+def bulk_insert_tickets(
+    db: Session, tickets: List[TicketCreate], ticket_numbers: List[str]
+) -> List[int]:
+    """
+    Insert tickets in one executemany statement and count them in the stats counters.
+    Returns their ids in input order.
+    """
+    if not tickets:
+        return []
+    now = datetime.utcnow()
+    rows = [
+        {
+            "ticket_number": number,
+            "customer_email": ticket.customer_email,
+            "customer_name": ticket.customer_name,
+            "subject": ticket.subject,
+            "message": ticket.message,
+            "order_id": ticket.order_id,
+            "status": TicketStatus.NEW,
+            "priority": TicketPriority.MEDIUM,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for ticket, number in zip(tickets, ticket_numbers)
+    ]
+    statement = insert(Ticket).returning(Ticket.id, sort_by_parameter_order=True)
+    ids = list(db.scalars(statement, rows))
+    # Every row starts out identical in the counted fields
+    apply_deltas(db, ticket_deltas(None, ticket_snapshot(rows[0]), count=len(rows)), at=now)
+    return ids
+
+
+class TokenBucket:
+    """Async token bucket: `rate` acquisitions per second with bursts up to `capacity`."""
+
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self):
+        if self.rate <= 0:
+            return
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+TicketHandler = Callable[[int], Awaitable[Optional[Dict[str, Any]]]]
+
+
+async def process_bulk(
+    ticket_ids: List[Tuple[int, int]],
+    handler: TicketHandler,
+    concurrency: int,
+    tickets_per_second: float,
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Run (index, ticket_id) pairs through the workflow, yielding a result per ticket as
+    it finishes.
+
+    A fixed set of `concurrency` workers takes tickets off a queue, so a large import
+    costs `concurrency` tasks rather than one per ticket, and new tickets start at no
+    more than `tickets_per_second`. The workers run in their own tasks, so tickets keep
+    going if the consumer (a streaming client) goes away.
+    """
+    pending: asyncio.Queue = asyncio.Queue()
+    for item in ticket_ids:
+        pending.put_nowait(item)
+    results: asyncio.Queue = asyncio.Queue()
+    bucket = TokenBucket(tickets_per_second, capacity=max(1.0, tickets_per_second))
+
+    async def worker():
+        # Every ticket is queued up front, so an empty queue means this worker is done
+        while not pending.empty():
+            index, ticket_id = pending.get_nowait()
+            await bucket.acquire()
+            start_time = time.monotonic()
+            try:
+                outcome = await handler(ticket_id)
+                result = {"index": index, "ticket_id": ticket_id, "status": "not_found"}
+                result.update(outcome or {})
+            except Exception as e:
+                result = {"index": index, "ticket_id": ticket_id, "status": "failed"}
+                result["error"] = str(e)
+            result["processing_ms"] = round((time.monotonic() - start_time) * 1000, 2)
+            results.put_nowait(result)
+
+    for _ in range(min(concurrency, len(ticket_ids))):
+        task = asyncio.create_task(worker())
+        _running_tasks.add(task)
+        task.add_done_callback(_running_tasks.discard)
+    for _ in ticket_ids:
+        yield await results.get()
+
+
+class BatchJob:
+    """An offline bulk import, shaped like an OpenAI Batch API batch object."""
+
+    def __init__(self, ticket_ids: List[Tuple[int, int]], errors: List[Dict[str, Any]]):
+        self.id = f"batch_{uuid.uuid4().hex[:24]}"
+        self.ticket_ids = ticket_ids
+        self.status = "validating"
+        self.created_at = datetime.utcnow()
+        self.in_progress_at: Optional[datetime] = None
+        self.completed_at: Optional[datetime] = None
+        self.results: List[Dict[str, Any]] = list(errors)
+        self.task: Optional[asyncio.Task] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        invalid = sum(result["status"] == "invalid" for result in self.results)
+        failed_runs = sum(result["status"] == "failed" for result in self.results)
+        return {
+            "id": self.id,
+            "object": "batch",
+            "status": self.status,
+            "completion_window": settings.BULK_OFFLINE_COMPLETION_WINDOW,
+            "created_at": self.created_at,
+            "in_progress_at": self.in_progress_at,
+            "completed_at": self.completed_at,
+            "request_counts": {
+                "total": len(self.ticket_ids) + invalid,
+                "completed": len(self.results) - invalid - failed_runs,
+                "failed": invalid + failed_runs,
+            },
+            "results": sorted(self.results, key=lambda result: result["index"]),
+        }
+
+
+class OfflineBatchRunner:
+    """
+    Local stand-in for the OpenAI Batch API, for backlogs that are not urgent.
+
+    Jobs are processed one at a time at low concurrency and only while the live ticket
+    queue is idle, trading latency (within the completion window) for leaving LLM
+    capacity to interactive traffic.
+
+    Best-effort: jobs and their results live only in this process's memory. A restart
+    forgets them (their batch ids return 404), and the tickets a job had not finished
+    stay unprocessed until startup recovery (TICKET_RECOVERY_ON_STARTUP) resumes them
+    as a new batch. The tickets themselves, and finished tickets' results, are in the database.
+    """
+
+    def __init__(self, concurrency: int, tickets_per_second: float, max_jobs: int):
+        self.concurrency = concurrency
+        self.tickets_per_second = tickets_per_second
+        self.max_jobs = max_jobs
+        self._jobs: Dict[str, BatchJob] = {}
+        self._lock = asyncio.Lock()
+
+    def submit(
+        self,
+        ticket_ids: List[Tuple[int, int]],
+        errors: List[Dict[str, Any]],
+        handler: TicketHandler,
+    ) -> BatchJob:
+        job = BatchJob(ticket_ids, errors)
+        self._jobs[job.id] = job
+        self._evict()
+        job.task = asyncio.create_task(self._run(job, handler), name=job.id)
+        return job
+
+    def get(self, batch_id: str) -> Optional[BatchJob]:
+        return self._jobs.get(batch_id)
+
+    async def _run(self, job: BatchJob, handler: TicketHandler):
+        # One job at a time; later jobs stay "validating" until they get the runner
+        async with self._lock:
+            job.status = "in_progress"
+            job.in_progress_at = datetime.utcnow()
+            try:
+                results = process_bulk(
+                    job.ticket_ids,
+                    self._when_idle(handler),
+                    self.concurrency,
+                    self.tickets_per_second,
+                )
+                async for result in results:
+                    job.results.append(result)
+                job.status = "completed"
+            except asyncio.CancelledError:
+                job.status = "cancelled"
+                raise
+            except Exception as e:
+                job.status = "failed"
+                print(f"✗ Batch {job.id} failed: {e}")
+            finally:
+                job.completed_at = datetime.utcnow()
+
+    @staticmethod
+    def _when_idle(handler: TicketHandler) -> TicketHandler:
+        async def run(ticket_id: int) -> Optional[Dict[str, Any]]:
+            while ticket_worker_pool.metrics()["queue_depth"] > 0:
+                await asyncio.sleep(settings.BULK_OFFLINE_IDLE_POLL_SECONDS)
+            return await handler(ticket_id)
+
+        return run
+
+    def _evict(self):
+        """Forget the oldest finished jobs beyond max_jobs."""
+        finished = [
+            job_id
+            for job_id, job in self._jobs.items()
+            if job.status in ("completed", "failed", "cancelled")
+        ]
+        for job_id in finished[: max(0, len(self._jobs) - self.max_jobs)]:
+            del self._jobs[job_id]
+
+    async def stop(self):
+        tasks = [job.task for job in self._jobs.values() if job.task and not job.task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+
+# Global instance
+offline_batches = OfflineBatchRunner(
+    concurrency=settings.BULK_OFFLINE_CONCURRENCY,
+    tickets_per_second=settings.BULK_OFFLINE_TICKETS_PER_SECOND,
+    max_jobs=settings.BULK_OFFLINE_MAX_JOBS,
+)
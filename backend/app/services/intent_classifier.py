@@ -0,0 +1,337 @@
+"""
+Local nearest-centroid intent/priority classifier over the knowledge base embeddings.
+
+Retrain from the tickets table with:
+
+    python -m app.services.intent_classifier --holdout 0.2
+"""
+
+import argparse
+import json
+import os
+import random
+import threading
+from collections import Counter, defaultdict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from pydantic import BaseModel
+
+from app.core.config import settings
+from app.services.knowledge_base import kb
+
+
+class ClassifierPrediction(BaseModel):
+    """Intent and priority predicted locally, with softmax confidences."""
+
+    intent: str
+    intent_confidence: float
+    priority: str
+    priority_confidence: float
+
+    @property
+    def confidence(self) -> float:
+        return min(self.intent_confidence, self.priority_confidence)
+
+
+def ticket_text(subject: str, message: str) -> str:
+    return f"{subject}\n{message}"
+
+
+class _CentroidHead:
+    """Nearest-centroid classifier for one label set."""
+
+    def __init__(self, labels: List[str], centroids: np.ndarray):
+        self.labels = labels
+        self.centroids = centroids
+
+    @classmethod
+    def fit(
+        cls, embeddings: np.ndarray, labels: List[str], min_examples: int
+    ) -> Optional["_CentroidHead"]:
+        by_label = defaultdict(list)
+        for idx, label in enumerate(labels):
+            by_label[label].append(idx)
+        kept = sorted(label for label, rows in by_label.items() if len(rows) >= min_examples)
+        if len(kept) < 2:
+            return None
+
+        centroids = np.stack([embeddings[by_label[label]].mean(axis=0) for label in kept])
+        return cls(kept, _normalize(centroids))
+
+    def predict(self, embeddings: np.ndarray, temperature: float) -> List[Tuple[str, float]]:
+        similarities = embeddings @ self.centroids.T
+        logits = similarities / temperature
+        logits -= logits.max(axis=1, keepdims=True)
+        probabilities = np.exp(logits)
+        probabilities /= probabilities.sum(axis=1, keepdims=True)
+        best = probabilities.argmax(axis=1)
+        return [(self.labels[idx], float(probabilities[row, idx])) for row, idx in enumerate(best)]
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+class IntentClassifier:
+    """
+    Answers triage locally for recurring intents.
+
+    One centroid per intent and per priority, computed from the embeddings of
+    historical tickets labelled by the triage LLM. Tracks how often its predictions
+    agree with the LLM on the tickets where both ran.
+    """
+
+    def __init__(self, path: str):
+        self.path = Path(path)
+        self._intent_head: Optional[_CentroidHead] = None
+        self._priority_head: Optional[_CentroidHead] = None
+        self.trained_on = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, Any] = {
+            "local": 0,  # Answered without the LLM
+            "llm": 0,  # Fell back to the LLM (not trained, low confidence or shadowed)
+            "compared": 0,  # Tickets where both the classifier and the LLM answered
+            "intent_agreed": 0,
+            "priority_agreed": 0,
+            "intents": defaultdict(lambda: {"compared": 0, "agreed": 0}),
+        }
+
+    @property
+    def is_trained(self) -> bool:
+        return self._intent_head is not None and self._priority_head is not None
+
+    def train(
+        self, texts: List[str], intents: List[str], priorities: List[str], min_examples: int
+    ) -> bool:
+        """Fit both heads. Returns False if there are too few labelled examples."""
+        if not texts:
+            return False
+        embeddings = _normalize(np.asarray(kb.embeddings.embed_documents(texts), np.float32))
+        intent_head = _CentroidHead.fit(embeddings, intents, min_examples)
+        priority_head = _CentroidHead.fit(embeddings, priorities, min_examples)
+        if intent_head is None or priority_head is None:
+            return False
+
+        self._intent_head, self._priority_head = intent_head, priority_head
+        self.trained_on = len(texts)
+        return True
+
+    def predict_many(self, texts: List[str]) -> List[ClassifierPrediction]:
+        if not self.is_trained or not texts:
+            return []
+        # Same encoding as train(); one-off ticket texts would only churn the KB's query cache
+        embeddings = _normalize(np.asarray(kb.embeddings.embed_documents(texts), np.float32))
+        temperature = settings.INTENT_CLASSIFIER_TEMPERATURE
+        return [
+            ClassifierPrediction(
+                intent=intent,
+                intent_confidence=intent_confidence,
+                priority=priority,
+                priority_confidence=priority_confidence,
+            )
+            for (intent, intent_confidence), (priority, priority_confidence) in zip(
+                self._intent_head.predict(embeddings, temperature),
+                self._priority_head.predict(embeddings, temperature),
+            )
+        ]
+
+    def predict(self, subject: str, message: str) -> Optional[ClassifierPrediction]:
+        predictions = self.predict_many([ticket_text(subject, message)])
+        return predictions[0] if predictions else None
+
+    def should_answer(self, prediction: Optional[ClassifierPrediction]) -> bool:
+        """Answer locally when confident, except for a sample kept to measure agreement."""
+        if prediction is None:
+            return False
+        if prediction.confidence < settings.INTENT_CLASSIFIER_MIN_CONFIDENCE:
+            return False
+        return random.random() >= settings.INTENT_CLASSIFIER_SHADOW_RATE
+
+    def record_local(self):
+        with self._lock:
+            self._stats["local"] += 1
+
+    def record_llm(self, prediction: Optional[ClassifierPrediction], intent: str, priority: str):
+        """Record an LLM triage, and whether the classifier's prediction agreed with it."""
+        with self._lock:
+            self._stats["llm"] += 1
+            if prediction is None:
+                return
+            self._stats["compared"] += 1
+            self._stats["intent_agreed"] += prediction.intent == intent
+            self._stats["priority_agreed"] += prediction.priority == priority
+            per_intent = self._stats["intents"][intent]
+            per_intent["compared"] += 1
+            per_intent["agreed"] += prediction.intent == intent
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                **self._stats,
+                "intents": {
+                    intent: dict(counts) for intent, counts in self._stats["intents"].items()
+                },
+            }
+        triaged = stats["local"] + stats["llm"]
+        compared = stats["compared"]
+        return {
+            "trained": self.is_trained,
+            "trained_on": self.trained_on,
+            "intents": self._intent_head.labels if self._intent_head else [],
+            "min_confidence": settings.INTENT_CLASSIFIER_MIN_CONFIDENCE,
+            "local": stats["local"],
+            "llm": stats["llm"],
+            "local_rate_percent": round(stats["local"] / triaged * 100, 2) if triaged else 0.0,
+            "compared": compared,
+            "intent_agreement_percent": (
+                round(stats["intent_agreed"] / compared * 100, 2) if compared else None
+            ),
+            "priority_agreement_percent": (
+                round(stats["priority_agreed"] / compared * 100, 2) if compared else None
+            ),
+            "agreement_by_intent": stats["intents"],
+        }
+
+    def save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(".tmp.npz")
+        np.savez(
+            tmp_path,
+            intent_centroids=self._intent_head.centroids,
+            priority_centroids=self._priority_head.centroids,
+            meta=np.array(
+                json.dumps(
+                    {
+                        "intent_labels": self._intent_head.labels,
+                        "priority_labels": self._priority_head.labels,
+                        "trained_on": self.trained_on,
+                        "embedding_model": settings.EMBEDDING_MODEL,
+                    }
+                )
+            ),
+        )
+        os.replace(tmp_path, self.path)
+
+    def load(self) -> bool:
+        """Load saved centroids; ignored if missing or built with another embedding model."""
+        if not self.path.exists():
+            return False
+        with np.load(self.path) as data:
+            meta = json.loads(str(data["meta"]))
+            if meta["embedding_model"] != settings.EMBEDDING_MODEL:
+                print("✗ Intent classifier was trained with another embedding model, ignoring it")
+                return False
+            self._intent_head = _CentroidHead(meta["intent_labels"], data["intent_centroids"])
+            self._priority_head = _CentroidHead(meta["priority_labels"], data["priority_centroids"])
+        self.trained_on = meta["trained_on"]
+        return True
+
+
+def load_training_data(db) -> List[Tuple[str, str, str]]:
+    """
+    (text, intent, priority) of tickets triaged by the LLM.
+
+    Tickets the classifier itself triaged are excluded so it never trains on its own
+    predictions.
+    """
+    from app.models import Ticket, AgentTrace
+
+    local_ids = {
+        ticket_id
+        for ticket_id, input_data in db.query(AgentTrace.ticket_id, AgentTrace.input_data)
+        .filter(AgentTrace.agent_name == "triage")
+        .all()
+        if (input_data or {}).get("decided_by") == "classifier"
+    }
+    rows = (
+        db.query(Ticket.id, Ticket.subject, Ticket.message, Ticket.intent, Ticket.priority)
+        .filter(Ticket.intent.isnot(None), Ticket.priority.isnot(None))
+        .all()
+    )
+    return [
+        (ticket_text(subject, message), intent, priority.value)
+        for ticket_id, subject, message, intent, priority in rows
+        if ticket_id not in local_ids
+    ]
+
+
+def _columns(examples: List[Tuple[str, str, str]]) -> Tuple[List[str], List[str], List[str]]:
+    texts = [text for text, _, _ in examples]
+    intents = [intent for _, intent, _ in examples]
+    priorities = [priority for _, _, priority in examples]
+    return texts, intents, priorities
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Retrain the local intent classifier")
+    parser.add_argument("--holdout", type=float, default=0.2, help="Share kept for evaluation")
+    parser.add_argument("--min-examples", type=int, default=settings.INTENT_CLASSIFIER_MIN_EXAMPLES)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal
+
+    db = SessionLocal()
+    try:
+        examples = load_training_data(db)
+    finally:
+        db.close()
+
+    rng = random.Random(args.seed)
+    rng.shuffle(examples)
+    split = int(len(examples) * (1 - args.holdout))
+    train, test = examples[:split], examples[split:]
+    print(f"{len(examples)} labelled tickets: {len(train)} train, {len(test)} holdout")
+    print(f"Intents: {dict(Counter(intent for _, intent, _ in examples).most_common())}")
+
+    classifier = IntentClassifier(settings.INTENT_CLASSIFIER_PATH)
+    if not classifier.train(*_columns(train), min_examples=args.min_examples):
+        print(f"✗ Need at least two intents and priorities with {args.min_examples} examples")
+        return
+
+    if test:
+        # Agreement with the LLM labels on held-out tickets, overall and when confident
+        predictions = classifier.predict_many([text for text, _, _ in test])
+        threshold = settings.INTENT_CLASSIFIER_MIN_CONFIDENCE
+        confident = [
+            (p, intent, priority)
+            for p, (_, intent, priority) in zip(predictions, test)
+            if p.confidence >= threshold
+        ]
+        intent_agreement = sum(p.intent == i for p, (_, i, _) in zip(predictions, test))
+        priority_agreement = sum(p.priority == pr for p, (_, _, pr) in zip(predictions, test))
+        print(f"Holdout intent agreement:   {intent_agreement / len(test):.1%}")
+        print(f"Holdout priority agreement: {priority_agreement / len(test):.1%}")
+        if confident:
+            agreed = sum(p.intent == i and p.priority == pr for p, i, pr in confident)
+            print(
+                f"Confident (>= {threshold}): {len(confident) / len(test):.1%} of tickets "
+                f"answered locally, {agreed / len(confident):.1%} fully agree with the LLM"
+            )
+
+        # Final model uses every labelled ticket
+        classifier.train(*_columns(examples), min_examples=args.min_examples)
+
+    classifier.save()
+    print(f"✓ Saved intent classifier ({classifier.trained_on} tickets) to {classifier.path}")
+
+
+def create_intent_classifier() -> IntentClassifier:
+    classifier = IntentClassifier(settings.INTENT_CLASSIFIER_PATH)
+    if settings.INTENT_CLASSIFIER_ENABLED:
+        try:
+            classifier.load()
+        except Exception as e:
+            print(f"✗ Failed to load intent classifier: {e}")
+    return classifier
+
+
+# Global instance
+intent_classifier = create_intent_classifier()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,60 +1,224 @@
 import os
-from typing import List, Dict
+import hashlib
+import json
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional
 from pathlib import Path
-import chromadb
-from chromadb.config import Settings
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_community.embeddings import HuggingFaceEmbeddings
 from app.core.config import settings
+from app.services.bm25_index import BM25Index, reciprocal_rank_fusion
+from app.services.vector_store import VectorStore, create_vector_store
+
+CHUNK_SIZE = 500
+CHUNK_OVERLAP = 50
 
 
 class KnowledgeBase:
-    """Knowledge base using ChromaDB for vector search."""
+    """Knowledge base with hybrid BM25 + vector search over a pluggable vector store."""
 
     def __init__(self):
-        self.client = chromadb.Client(
-            Settings(
-                persist_directory=settings.CHROMA_PERSIST_DIRECTORY,
-                anonymized_telemetry=False,
-            )
-        )
-        self.collection_name = "support_knowledge"
-        self.embeddings = HuggingFaceEmbeddings(
-            model_name=settings.EMBEDDING_MODEL,
-            model_kwargs={"device": "cpu"},
-        )
+        # The embedding model and vector store are created lazily (see warm_up) so that
+        # importing this module stays cheap and the API can bind before they are loaded.
+        self._store: Optional[VectorStore] = None
+        self._bm25: Optional[BM25Index] = None
+        self._reranker = None
+        self._embeddings: Optional[HuggingFaceEmbeddings] = None
+        self._init_lock = threading.Lock()
+
+        self.version = 0  # Bumped whenever the indexed content changes
+
+        # LRU cache of query embeddings; subjects and intent strings repeat constantly
+        self._query_cache: OrderedDict[str, List[float]] = OrderedDict()
+        self._query_cache_size = settings.KB_QUERY_CACHE_SIZE
+        self._query_cache_lock = threading.Lock()
+
+        self._warmup: Dict[str, Any] = {
+            "state": "pending",
+            "error": None,
+            "timings_ms": {},
+            "stats": None,
+        }
+
+    @property
+    def embeddings(self) -> HuggingFaceEmbeddings:
+        if self._embeddings is None:
+            with self._init_lock:
+                if self._embeddings is None:
+                    self._embeddings = HuggingFaceEmbeddings(
+                        model_name=settings.EMBEDDING_MODEL,
+                        model_kwargs={"device": "cpu"},
+                    )
+        return self._embeddings
+
+    @property
+    def store(self) -> VectorStore:
+        if self._store is None:
+            with self._init_lock:
+                if self._store is None:
+                    self._store = create_vector_store()
+        return self._store
+
+    @property
+    def bm25(self) -> BM25Index:
+        if self._bm25 is None:
+            store = self.store
+            with self._init_lock:
+                if self._bm25 is None:
+                    # Built from the stored chunks; kept in sync by load_documents afterwards
+                    index = BM25Index()
+                    index.add(*store.get_all())
+                    self._bm25 = index
+        return self._bm25
+
+    @property
+    def reranker(self):
+        if self._reranker is None:
+            with self._init_lock:
+                if self._reranker is None:
+                    from sentence_transformers import CrossEncoder
+
+                    self._reranker = CrossEncoder(settings.KB_RERANKER_MODEL, device="cpu")
+        return self._reranker
+
+    @property
+    def manifest_path(self) -> Path:
+        # Lives next to the index, so each backend keeps its own manifest
+        return Path(self.store.directory) / "manifest.json"
+
+    @property
+    def is_ready(self) -> bool:
+        return self._warmup["state"] == "ready"
+
+    def warmup_status(self) -> Dict[str, Any]:
+        """Progress of the background warm-up, for the readiness probe."""
+        return dict(self._warmup)
 
-        # Get or create collection
+    def warm_up(self, directory: str):
+        """
+        Load the embedding model, open the index and sync documents.
+
+        Meant to run in a background thread at startup; progress is reported through
+        warmup_status().
+        """
+        started_at = time.time()
+        phases = [
+            ("loading_model", lambda: self.embeddings.embed_query("warm up")),
+            ("opening_index", lambda: self.store.count()),
+            ("indexing", lambda: self.load_documents(directory)),
+        ]
+        if settings.KB_HYBRID_SEARCH:
+            phases.append(("lexical_index", lambda: len(self.bm25)))
+        if settings.KB_RERANK:
+            phases.append(("loading_reranker", lambda: self.reranker))
         try:
-            self.collection = self.client.get_collection(self.collection_name)
-        except Exception:
-            self.collection = self.client.create_collection(
-                name=self.collection_name,
-                metadata={"hnsw:space": "cosine"},
-            )
+            for phase, action in phases:
+                self._warmup["state"] = phase
+                phase_start = time.time()
+                result = action()
+                self._warmup["timings_ms"][phase] = int((time.time() - phase_start) * 1000)
+                if phase == "indexing":
+                    self._warmup["stats"] = result
+            self._warmup["timings_ms"]["total"] = int((time.time() - started_at) * 1000)
+            self._warmup["state"] = "ready"
+        except Exception as e:
+            self._warmup["state"] = "failed"
+            self._warmup["error"] = str(e)
+            raise
+
+    def _index_config(self) -> Dict[str, Any]:
+        """Settings that invalidate every stored embedding when they change."""
+        return {
+            "vector_store": type(self.store).__name__,
+            "embedding_model": settings.EMBEDDING_MODEL,
+            "chunk_size": CHUNK_SIZE,
+            "chunk_overlap": CHUNK_OVERLAP,
+        }
+
+    def _load_manifest(self) -> Dict[str, Any]:
+        empty = {"index_config": self._index_config(), "files": {}}
+        if not self.manifest_path.exists():
+            return empty
+
+        with open(self.manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+
+        indexed_chunks = sum(len(entry["chunk_ids"]) for entry in manifest["files"].values())
+        if (
+            manifest.get("index_config") != self._index_config()
+            or indexed_chunks != self.store.count()
+        ):
+            # Manifest is stale or the index was changed behind our back: rebuild
+            print("Knowledge base index is out of date, rebuilding")
+            self._reset_index()
+            return empty
+
+        return manifest
 
-    def load_documents(self, directory: str):
-        """Load documents from directory into the knowledge base."""
+    def _save_manifest(self, manifest: Dict[str, Any]):
+        self.manifest_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_suffix(".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+
+    def load_documents(self, directory: str) -> Dict[str, int]:
+        """
+        Incrementally sync the knowledge base with the markdown files in a directory.
+
+        A manifest of file content hashes is persisted next to the index, so only chunks
+        of new or changed files are embedded and chunks of removed files are deleted.
+        Returns counts of chunks added, kept and removed.
+        """
+        stats = {"added": 0, "kept": 0, "removed": 0}
         kb_path = Path(directory)
         if not kb_path.exists():
             print(f"Knowledge base directory {directory} does not exist")
-            return
+            return stats
 
         text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=500, chunk_overlap=50, length_function=len
+            chunk_size=CHUNK_SIZE, chunk_overlap=CHUNK_OVERLAP, length_function=len
         )
 
+        manifest = self._load_manifest()
+        files = manifest["files"]
+        seen_files = set()
+
         documents = []
         metadatas = []
         ids = []
+        removed_ids = []
+
+        for file_path in sorted(kb_path.glob("**/*.md")):
+            relative_path = file_path.relative_to(kb_path).as_posix()
+            seen_files.add(relative_path)
 
-        for idx, file_path in enumerate(kb_path.glob("**/*.md")):
             with open(file_path, "r", encoding="utf-8") as f:
                 content = f.read()
 
-            chunks = text_splitter.split_text(content)
+            file_hash = hashlib.sha256(content.encode()).hexdigest()
+            entry = files.get(relative_path)
+            if entry and entry["hash"] == file_hash:
+                stats["kept"] += len(entry["chunk_ids"])
+                continue
+
+            old_ids = set(entry["chunk_ids"]) if entry else set()
+            new_ids = []
+
+            for chunk_idx, chunk in enumerate(text_splitter.split_text(content)):
+                # Content-addressed IDs: unchanged chunks of an edited file are kept
+                chunk_id = f"{relative_path}:{hashlib.sha256(chunk.encode()).hexdigest()[:16]}"
+                if chunk_id in new_ids:
+                    continue
+                new_ids.append(chunk_id)
+
+                if chunk_id in old_ids:
+                    stats["kept"] += 1
+                    continue
 
-            for chunk_idx, chunk in enumerate(chunks):
                 documents.append(chunk)
                 metadatas.append(
                     {
@@ -63,53 +227,168 @@ class KnowledgeBase:
                         "full_path": str(file_path),
                     }
                 )
-                ids.append(f"{file_path.stem}_{idx}_{chunk_idx}")
+                ids.append(chunk_id)
+
+            removed_ids.extend(old_ids - set(new_ids))
+            files[relative_path] = {"hash": file_hash, "chunk_ids": new_ids}
+
+        for relative_path in set(files) - seen_files:
+            removed_ids.extend(files.pop(relative_path)["chunk_ids"])
+
+        if removed_ids:
+            self.store.delete(removed_ids)
+            if self._bm25 is not None:
+                self._bm25.remove(removed_ids)
 
         if documents:
             # Generate embeddings
             embeddings = self.embeddings.embed_documents(documents)
 
-            # Add to collection
-            self.collection.add(
-                documents=documents, embeddings=embeddings, metadatas=metadatas, ids=ids
-            )
-            print(f"Loaded {len(documents)} chunks from {directory}")
+            # Add to the index
+            self.store.upsert(ids, embeddings, documents, metadatas)
+            if self._bm25 is not None:
+                self._bm25.add(ids, documents, metadatas)
 
-    def search(self, query: str, n_results: int = 3) -> List[Dict[str, str]]:
-        """Search knowledge base for relevant documents."""
-        query_embedding = self.embeddings.embed_query(query)
+        stats["added"] = len(documents)
+        stats["removed"] = len(removed_ids)
+        if documents or removed_ids:
+            self.version += 1
 
-        results = self.collection.query(
-            query_embeddings=[query_embedding], n_results=n_results, include=["documents", "metadatas", "distances"]
+        self._save_manifest(manifest)
+        print(
+            f"Synced knowledge base from {directory}: {stats['added']} chunks added, "
+            f"{stats['kept']} kept, {stats['removed']} removed"
         )
+        return stats
 
-        articles = []
-        if results["documents"] and len(results["documents"][0]) > 0:
-            for doc, metadata, distance in zip(
-                results["documents"][0], results["metadatas"][0], results["distances"][0]
-            ):
-                articles.append(
-                    {
-                        "content": doc,
-                        "source": metadata.get("source", "Unknown"),
-                        "relevance_score": 1 - distance,  # Convert distance to similarity
-                    }
-                )
+    def embed_queries(self, queries: List[str]) -> List[List[float]]:
+        """Embed queries in one batched forward pass, serving repeats from the LRU cache."""
+        with self._query_cache_lock:
+            cached = {q: self._query_cache[q] for q in queries if q in self._query_cache}
+            for query in cached:
+                self._query_cache.move_to_end(query)
+
+        missing = [q for q in dict.fromkeys(queries) if q not in cached]
+        if missing:
+            # Same encoder settings as embed_query, batched
+            vectors = self.embeddings.embed_documents(missing)
+            with self._query_cache_lock:
+                for query, vector in zip(missing, vectors):
+                    cached[query] = vector
+                    self._query_cache[query] = vector
+                while len(self._query_cache) > self._query_cache_size:
+                    self._query_cache.popitem(last=False)
+
+        return [cached[q] for q in queries]
+
+    def search_many(self, queries: List[str], n_results: int = 3) -> List[List[Dict[str, Any]]]:
+        """
+        Search for several queries with one embedding batch and one index query.
+
+        With KB_HYBRID_SEARCH the vector ranking is fused with a BM25 ranking by
+        reciprocal rank, and with KB_RERANK the fused candidates are reordered by a
+        cross-encoder.
+        """
+        if not queries:
+            return []
+
+        query_embeddings = self.embed_queries(queries)
+
+        if not settings.KB_HYBRID_SEARCH:
+            results = self.store.query(query_embeddings, n_results=n_results)
+            return [
+                [
+                    # Convert distance to similarity
+                    _article(hit["id"], hit["document"], hit["metadata"], 1 - hit["distance"])
+                    for hit in hits
+                ]
+                for hits in results
+            ]
 
-        return articles
+        candidates = max(n_results, settings.KB_HYBRID_CANDIDATES)
+        vector_results = self.store.query(query_embeddings, n_results=candidates)
+
+        fused_results = []
+        for query, hits in zip(queries, vector_results):
+            records = {hit["id"]: (hit["document"], hit["metadata"]) for hit in hits}
+            lexical = self.bm25.search(query, candidates)
+            for id_, _ in lexical:
+                if id_ not in records:
+                    records[id_] = self.bm25.record(id_)
+
+            fused = reciprocal_rank_fusion(
+                [[hit["id"] for hit in hits], [id_ for id_, _ in lexical]], k=settings.KB_RRF_K
+            )
+            fused_results.append(
+                [(id_, records[id_], score) for id_, score in fused if records[id_] is not None]
+            )
+
+        if settings.KB_RERANK:
+            fused_results = self._rerank(queries, fused_results, n_results)
+
+        return [
+            [
+                _article(id_, document, metadata, score)
+                for id_, (document, metadata), score in fused[:n_results]
+            ]
+            for fused in fused_results
+        ]
+
+    def _rerank(
+        self, queries: List[str], candidates: List[List[tuple]], n_results: int
+    ) -> List[List[tuple]]:
+        """Reorder the top fused candidates of every query with one cross-encoder batch."""
+        # Never score fewer candidates than the caller asked for; search_many slices after
+        limit = max(n_results, settings.KB_RERANK_CANDIDATES)
+        pairs = [
+            (query, record[0])
+            for query, fused in zip(queries, candidates)
+            for _, record, _ in fused[:limit]
+        ]
+        if not pairs:
+            return candidates
+
+        scores = iter(self.reranker.predict(pairs))
+        reranked = []
+        for fused in candidates:
+            # Sigmoid maps the cross-encoder logit to a [0, 1] relevance score
+            head = [
+                (id_, record, 1 / (1 + math.exp(-float(next(scores)))))
+                for id_, record, _ in fused[:limit]
+            ]
+            reranked.append(sorted(head, key=lambda candidate: candidate[2], reverse=True))
+        return reranked
+
+    def search(self, query: str, n_results: int = 3) -> List[Dict[str, str]]:
+        """Search knowledge base for relevant documents."""
+        return self.search_many([query], n_results=n_results)[0]
+
+    def _reset_index(self):
+        self.store.reset()
+        self._bm25 = None
+        if self.manifest_path.exists():
+            self.manifest_path.unlink()
+        self.version += 1
 
     def reset(self):
         """Clear the knowledge base."""
         try:
-            self.client.delete_collection(self.collection_name)
-            self.collection = self.client.create_collection(
-                name=self.collection_name,
-                metadata={"hnsw:space": "cosine"},
-            )
+            self._reset_index()
             print("Knowledge base reset successfully")
         except Exception as e:
             print(f"Error resetting knowledge base: {e}")
 
 
+def _article(
+    chunk_id: str, document: str, metadata: Dict[str, Any], score: float
+) -> Dict[str, Any]:
+    return {
+        "chunk_id": chunk_id,
+        "content": document,
+        "source": metadata.get("source", "Unknown"),
+        "relevance_score": score,
+    }
+
+
 # Global instance
 kb = KnowledgeBase()
@@ -0,0 +1,81 @@
+import math
+from typing import Dict, Iterable, Optional, Tuple, Union
+
+# Bin key of values <= 0 (skipped LLM calls use 0 tokens, cache hits can take 0 ms)
+ZERO = "zero"
+
+BinKey = Union[int, str]
+
+
+class QuantileSketch:
+    """
+    Log-bucketed quantile sketch (DDSketch / HDR style).
+
+    A positive value v is counted in bin ceil(log_gamma(v)) with
+    gamma = (1 + relative_accuracy) / (1 - relative_accuracy), so every quantile is
+    within relative_accuracy of the true value. Bins only hold counts: sketches merge by
+    adding them, which is how hourly sketches are combined into a window.
+    """
+
+    def __init__(self, relative_accuracy: float = 0.02, bins: Optional[Dict[BinKey, float]] = None):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.bins: Dict[BinKey, float] = dict(bins or {})
+
+    def key(self, value: float) -> BinKey:
+        if value <= 0:
+            return ZERO
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def value(self, key: BinKey) -> float:
+        """Representative value of a bin (relative error at most relative_accuracy)."""
+        if key == ZERO:
+            return 0.0
+        return 2 * self.gamma**key / (self.gamma + 1)
+
+    def add(self, value: float, count: float = 1):
+        self.add_count(self.key(value), count)
+
+    def add_count(self, key: BinKey, count: float):
+        """Add to a bin directly, e.g. when loading stored bins."""
+        self.bins[key] = self.bins.get(key, 0) + count
+
+    def merge(self, other: "QuantileSketch"):
+        for key, count in other.bins.items():
+            self.add_count(key, count)
+
+    @property
+    def count(self) -> float:
+        return sum(count for count in self.bins.values() if count > 0)
+
+    def _sorted_bins(self) -> Iterable[Tuple[BinKey, float]]:
+        zero = self.bins.get(ZERO, 0)
+        if zero > 0:
+            yield ZERO, zero
+        for key in sorted(key for key in self.bins if key != ZERO):
+            if self.bins[key] > 0:
+                yield key, self.bins[key]
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Approximate q-quantile (0 <= q <= 1), or None for an empty sketch."""
+        total = self.count
+        if total <= 0:
+            return None
+        rank = q * (total - 1)
+        seen = 0.0
+        last = None
+        for key, count in self._sorted_bins():
+            seen += count
+            last = key
+            if seen > rank:
+                break
+        return self.value(last) if last is not None else None
+
+    def summary(self, quantiles: Iterable[float] = (0.5, 0.9, 0.99)) -> Dict[str, Optional[float]]:
+        """{"p50": ..., "p90": ..., "p99": ...} rounded to two decimals."""
+        result = {}
+        for q in quantiles:
+            value = self.quantile(q)
+            result[f"p{q * 100:g}"] = round(value, 2) if value is not None else None
+        return result
@@ -0,0 +1,150 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+
+from app.core.config import settings
+from app.services.knowledge_base import kb
+
+NAME_PLACEHOLDER = "[[customer_name]]"
+FIRST_NAME_PLACEHOLDER = "[[customer_first_name]]"
+# Shorter first names are left in cached responses as-is
+MIN_FIRST_NAME_LENGTH = 2
+
+
+class SemanticResponseCache:
+    """
+    Cache of agent outputs for near-duplicate tickets.
+
+    Keyed on the embedding of subject + message (using the knowledge base's embedding
+    model). Entries expire after a TTL, the least recently used entry is evicted when
+    full, and everything is dropped when the knowledge base is reloaded.
+    """
+
+    def __init__(self, max_entries: int, ttl_seconds: int, similarity_threshold: float):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.similarity_threshold = similarity_threshold
+
+        self._entries: OrderedDict[int, Dict[str, Any]] = OrderedDict()
+        self._next_key = 0
+        self._kb_version = kb.version
+        self._lock = threading.Lock()
+
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        self._invalidations = 0
+
+    def _embed(self, subject: str, message: str) -> np.ndarray:
+        vector = np.asarray(kb.embeddings.embed_query(f"{subject}\n{message}"), dtype=np.float32)
+        return vector / (np.linalg.norm(vector) or 1.0)
+
+    def _check_kb_version(self):
+        if kb.version != self._kb_version:
+            self._entries.clear()
+            self._kb_version = kb.version
+            self._invalidations += 1
+
+    def _expire(self):
+        cutoff = time.time() - self.ttl_seconds
+        expired = [key for key, entry in self._entries.items() if entry["created_at"] < cutoff]
+        for key in expired:
+            del self._entries[key]
+
+    def invalidate(self):
+        """Drop all cached entries."""
+        with self._lock:
+            self._entries.clear()
+            self._invalidations += 1
+
+    def lookup(self, subject: str, message: str) -> Optional[Tuple[Dict[str, Any], float]]:
+        """Return (cached entry, similarity) for the closest ticket above the threshold."""
+        embedding = self._embed(subject, message)
+
+        with self._lock:
+            self._check_kb_version()
+            self._expire()
+
+            best_key, best_similarity = None, -1.0
+            if self._entries:
+                keys = list(self._entries.keys())
+                matrix = np.stack([self._entries[key]["embedding"] for key in keys])
+                similarities = matrix @ embedding
+                best = int(np.argmax(similarities))
+                best_key, best_similarity = keys[best], float(similarities[best])
+
+            if best_key is None or best_similarity < self.similarity_threshold:
+                self._misses += 1
+                return None
+
+            self._entries.move_to_end(best_key)
+            self._hits += 1
+            return self._entries[best_key], best_similarity
+
+    def store(self, subject: str, message: str, customer_name: str, outputs: Dict[str, Any]):
+        """Cache agent outputs, templating the customer's name out of the response text."""
+        embedding = self._embed(subject, message)
+        response = dict(outputs["response"])
+        response["response_text"] = template_customer_name(response["response_text"], customer_name)
+
+        with self._lock:
+            self._check_kb_version()
+            self._entries[self._next_key] = {
+                "embedding": embedding,
+                "triage": outputs["triage"],
+                "research": outputs["research"],
+                "response": response,
+                "created_at": time.time(),
+            }
+            self._next_key += 1
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_rate_percent": round(self._hits / lookups * 100, 2) if lookups else 0.0,
+                "evictions": self._evictions,
+                "invalidations": self._invalidations,
+            }
+
+
+def _replace_word(text: str, word: str, replacement: str) -> str:
+    # Whole words only: "Al" must not match inside "Also"
+    return re.sub(rf"(?<!\w){re.escape(word)}(?!\w)", lambda _: replacement, text)
+
+
+def template_customer_name(text: str, customer_name: str) -> str:
+    """Replace the customer's full and first name (whole words) with placeholders."""
+    customer_name = (customer_name or "").strip()
+    if not customer_name:
+        return text
+    text = _replace_word(text, customer_name, NAME_PLACEHOLDER)
+    first_name = customer_name.split()[0]
+    # Initials would match words like "I" or "A"
+    if len(first_name) < MIN_FIRST_NAME_LENGTH:
+        return text
+    return _replace_word(text, first_name, FIRST_NAME_PLACEHOLDER)
+
+
+def render_customer_name(text: str, customer_name: str) -> str:
+    """Fill name placeholders with a customer's name."""
+    first_name = customer_name.split()[0] if customer_name and customer_name.strip() else ""
+    return text.replace(NAME_PLACEHOLDER, customer_name).replace(FIRST_NAME_PLACEHOLDER, first_name)
+
+
+# Global instance
+response_cache = SemanticResponseCache(
+    max_entries=settings.RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.RESPONSE_CACHE_TTL_SECONDS,
+    similarity_threshold=settings.RESPONSE_CACHE_SIMILARITY,
+)
@@ -0,0 +1,422 @@
+"""
+Rollup counters behind GET /api/stats, updated in the same transaction as the ticket
+changes they count.
+
+Hourly buckets count a ticket's state in the hour the ticket was created, whenever the
+change happens, and a trace in the hour it was written. A rebuild can recompute both
+from the tables, so it gives the same counters as the incremental updates.
+
+Rebuild them from the tickets and agent_traces tables with:
+
+    python -m app.services.stats_counters --rebuild
+"""
+
+import argparse
+from collections import Counter
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.models import Ticket, TicketStatus, AgentTrace, StatsCounter
+from app.services.quantile_sketch import ZERO, QuantileSketch
+
+TOTAL = "total"
+HOUR_FORMAT = "%Y-%m-%dT%H"
+
+# Analytics windows in hourly buckets: the current, partial hour plus the whole hours
+# before it, so a window always covers at least its length (the last hour: 60-120 min)
+WINDOWS = {"hour": 2, "day": 25, "week": 24 * 7 + 1}
+
+UPSERT_DIALECTS = {"postgresql": postgresql.insert, "sqlite": sqlite.insert}
+
+
+def hour_bucket(at: datetime) -> str:
+    return at.strftime(HOUR_FORMAT)
+
+
+def _value(enum_or_str: Any) -> Optional[str]:
+    return getattr(enum_or_str, "value", enum_or_str)
+
+
+def ticket_snapshot(ticket: Any) -> Dict[str, Any]:
+    """The counted fields of a ticket (an ORM object or a mapping of column values)."""
+    get = ticket.get if isinstance(ticket, dict) else lambda key: getattr(ticket, key, None)
+    metadata = get("ticket_metadata")
+    return {
+        "status": _value(get("status")),
+        "priority": _value(get("priority")),
+        "intent": get("intent"),
+        "confidence": get("confidence"),
+        # Set by workflow_failed_values when an agent raised
+        "failed_agent": metadata.get("failed_agent") if isinstance(metadata, dict) else None,
+    }
+
+
+def _ticket_metrics(snapshot: Optional[Dict[str, Any]]) -> Counter:
+    metrics = Counter()
+    if snapshot is None:
+        return metrics
+    metrics["tickets"] += 1
+    if snapshot["status"]:
+        metrics[f"status:{snapshot['status']}"] += 1
+    if snapshot["priority"]:
+        metrics[f"priority:{snapshot['priority']}"] += 1
+    if snapshot["intent"]:
+        metrics[f"intent:{snapshot['intent']}"] += 1
+    if snapshot["confidence"] is not None:
+        metrics["confidence_sum"] += snapshot["confidence"]
+        metrics["confidence_count"] += 1
+    if snapshot["failed_agent"]:
+        metrics[f"agent_failures:{snapshot['failed_agent']}"] += 1
+    return metrics
+
+
+def ticket_deltas(
+    before: Optional[Dict[str, Any]], after: Optional[Dict[str, Any]], count: int = 1
+) -> Dict[str, float]:
+    """Counter changes for `count` tickets going from `before` to `after` (None: absent)."""
+    deltas = Counter()
+    for metric, value in _ticket_metrics(after).items():
+        deltas[metric] += value * count
+    for metric, value in _ticket_metrics(before).items():
+        deltas[metric] -= value * count
+    return {metric: value for metric, value in deltas.items() if value}
+
+
+def trace_deltas(traces: Iterable[Any], sign: int = 1) -> Dict[str, float]:
+    """
+    Counter changes for agent traces written (sign=1) or deleted (sign=-1).
+
+    Besides run counts and totals, executed (not skipped) runs add to the bins of a
+    per-agent latency and token quantile sketch. Runs that raised leave no trace and are
+    counted from the ticket instead (agent_failures, see ticket_snapshot).
+    """
+    sketch = QuantileSketch(settings.STATS_SKETCH_RELATIVE_ACCURACY)
+    deltas = Counter()
+    for trace in traces:
+        get = trace.get if isinstance(trace, dict) else lambda key: getattr(trace, key, None)
+        agent = get("agent_name")
+        execution_time_ms = get("execution_time_ms") or 0
+        deltas[f"agent_runs:{agent}"] += sign
+        deltas[f"agent_time_ms:{agent}"] += sign * execution_time_ms
+        if (get("output_data") or {}).get("skipped"):
+            deltas[f"agent_skipped:{agent}"] += sign
+            continue
+        deltas[f"agent_executed_time_ms:{agent}"] += sign * execution_time_ms
+        deltas[f"agent_latency_bin:{agent}:{sketch.key(execution_time_ms)}"] += sign
+        if get("retry_count"):
+            deltas[f"agent_retried:{agent}"] += sign
+        tokens = get("tokens_used")
+        if tokens is not None:
+            deltas[f"agent_llm_runs:{agent}"] += sign
+            deltas[f"agent_tokens:{agent}"] += sign * tokens
+            deltas[f"agent_tokens_bin:{agent}:{sketch.key(tokens)}"] += sign
+    return dict(deltas)
+
+
+def trace_deltas_by_hour(traces: Iterable[Any], sign: int = 1) -> List[Tuple[datetime, Dict]]:
+    """trace_deltas grouped by the hour the traces were written, as (at, deltas) pairs."""
+    by_hour: Dict[str, Tuple[datetime, List[Any]]] = {}
+    for trace in traces:
+        created_at = trace.get("created_at") if isinstance(trace, dict) else trace.created_at
+        at = created_at or datetime.utcnow()
+        by_hour.setdefault(hour_bucket(at), (at, []))[1].append(trace)
+    return [(at, trace_deltas(group, sign)) for at, group in by_hour.values()]
+
+
+def merge_deltas(*deltas: Dict[str, float]) -> Dict[str, float]:
+    merged = Counter()
+    for item in deltas:
+        merged.update(item)
+    return dict(merged)
+
+
+def _upsert_statement(dialect: str, hourly: Iterable[Tuple[datetime, Dict[str, float]]]):
+    """
+    INSERT ... ON CONFLICT DO UPDATE adding (at, deltas) pairs to the total and hourly
+    rows. Rows are merged and sorted by (bucket, metric), so concurrent transactions lock
+    counter rows in the same order and can't deadlock on them.
+    """
+    if dialect not in UPSERT_DIALECTS:
+        raise ValueError(f"Stats counters are not supported on {dialect}")
+    insert = UPSERT_DIALECTS[dialect]
+    values = Counter()
+    for at, deltas in hourly:
+        for bucket in (TOTAL, hour_bucket(at)):
+            for metric, value in deltas.items():
+                values[(bucket, metric)] += value
+    rows = [
+        {"bucket": bucket, "metric": metric, "value": value}
+        for (bucket, metric), value in sorted(values.items())
+    ]
+    if not rows:
+        return None
+    statement = insert(StatsCounter).values(rows)
+    return statement.on_conflict_do_update(
+        index_elements=["bucket", "metric"],
+        set_={"value": StatsCounter.value + statement.excluded.value},
+    )
+
+
+def apply_deltas(db: Session, deltas: Dict[str, float], at: Optional[datetime] = None):
+    """Add counter changes in the session's transaction."""
+    apply_hourly_deltas(db, [(at or datetime.utcnow(), deltas)])
+
+
+def apply_hourly_deltas(db: Session, hourly: Iterable[Tuple[datetime, Dict[str, float]]]):
+    """Add (at, deltas) pairs, e.g. from trace_deltas_by_hour, in one statement."""
+    statement = _upsert_statement(db.bind.dialect.name, hourly)
+    if statement is not None:
+        db.execute(statement)
+
+
+async def aapply_deltas(db: AsyncSession, deltas: Dict[str, float], at: Optional[datetime] = None):
+    """Async variant of apply_deltas."""
+    await aapply_hourly_deltas(db, [(at or datetime.utcnow(), deltas)])
+
+
+async def aapply_hourly_deltas(
+    db: AsyncSession, hourly: Iterable[Tuple[datetime, Dict[str, float]]]
+):
+    """Add (at, deltas) pairs, e.g. from trace_deltas_by_hour, in one statement."""
+    statement = _upsert_statement(db.bind.dialect.name, hourly)
+    if statement is not None:
+        await db.execute(statement)
+
+
+def counters_query(bucket: str = TOTAL):
+    return select(StatsCounter.metric, StatsCounter.value).where(StatsCounter.bucket == bucket)
+
+
+def timeseries_query(hours: int, now: Optional[datetime] = None):
+    since = hour_bucket((now or datetime.utcnow()) - timedelta(hours=hours - 1))
+    return (
+        select(StatsCounter.bucket, StatsCounter.metric, StatsCounter.value)
+        .where(StatsCounter.bucket != TOTAL, StatsCounter.bucket >= since)
+        .order_by(StatsCounter.bucket)
+    )
+
+
+def summarize(counters: Dict[str, float]) -> Dict[str, Any]:
+    """The /api/stats response from the total counters."""
+
+    def prefixed(prefix: str) -> Dict[str, float]:
+        return {
+            metric[len(prefix) :]: value
+            for metric, value in counters.items()
+            if metric.startswith(prefix) and value
+        }
+
+    total_tickets = int(counters.get("tickets", 0))
+    status_breakdown = {key: int(value) for key, value in prefixed("status:").items()}
+    priority_breakdown = {key: int(value) for key, value in prefixed("priority:").items()}
+    confidence_count = counters.get("confidence_count", 0)
+    avg_confidence = (
+        counters.get("confidence_sum", 0) / confidence_count if confidence_count else 0.0
+    )
+    human_needed = status_breakdown.get(TicketStatus.WAITING_HUMAN.value, 0)
+    escalation_rate = (human_needed / total_tickets * 100) if total_tickets > 0 else 0
+    intents = sorted(prefixed("intent:").items(), key=lambda item: item[1], reverse=True)
+    agent_time = prefixed("agent_time_ms:")
+    agents = _accumulate_agents(counters.items())
+
+    return {
+        "total_tickets": total_tickets,
+        "status_breakdown": status_breakdown,
+        "priority_breakdown": priority_breakdown,
+        "average_confidence": round(avg_confidence, 3),
+        "escalation_rate_percent": round(escalation_rate, 2),
+        "top_intents": {intent: int(count) for intent, count in intents[:5]},
+        "agent_performance": {
+            agent: {
+                "avg_execution_time_ms": round(agent_time.get(agent, 0) / runs, 2),
+                "total_executions": int(runs),
+                "latency_ms": agents[agent]["latency"].summary() if agent in agents else None,
+            }
+            for agent, runs in prefixed("agent_runs:").items()
+        },
+    }
+
+
+def agent_metrics_query(hours: int, now: Optional[datetime] = None):
+    """Hourly per-agent counters and sketch bins for the last `hours` hours."""
+    return timeseries_query(hours, now).where(StatsCounter.metric.like("agent_%"))
+
+
+def _bin_key(key: str):
+    return key if key == ZERO else int(key)
+
+
+def _accumulate_agents(
+    counters: Iterable[Tuple[str, float]], agents: Optional[Dict[str, Dict[str, Any]]] = None
+) -> Dict[str, Dict[str, Any]]:
+    """Merge per-agent counters and sketch bins: {agent: {metric: value, sketches}}."""
+    agents = {} if agents is None else agents
+    for metric, value in counters:
+        kind, _, rest = metric.partition(":")
+        if not kind.startswith("agent_"):
+            continue
+        agent, _, key = rest.partition(":")
+        stats = agents.get(agent)
+        if stats is None:
+            accuracy = settings.STATS_SKETCH_RELATIVE_ACCURACY
+            stats = agents[agent] = {
+                "latency": QuantileSketch(accuracy),
+                "tokens": QuantileSketch(accuracy),
+            }
+        if kind == "agent_latency_bin":
+            stats["latency"].add_count(_bin_key(key), value)
+        elif kind == "agent_tokens_bin":
+            stats["tokens"].add_count(_bin_key(key), value)
+        else:
+            stats[kind] = stats.get(kind, 0) + value
+    return agents
+
+
+def _agent_report(stats: Dict[str, Any]) -> Dict[str, Any]:
+    runs = stats.get("agent_runs", 0)
+    executed = runs - stats.get("agent_skipped", 0)
+    failures = stats.get("agent_failures", 0)
+    attempted = executed + failures
+    llm_runs = stats.get("agent_llm_runs", 0)
+    tokens = stats.get("agent_tokens", 0)
+    executed_time = stats.get("agent_executed_time_ms", 0)
+    return {
+        "runs": int(runs),
+        "skipped": int(stats.get("agent_skipped", 0)),
+        "failures": int(failures),
+        # Share of executed runs that raised (failing the ticket's workflow)
+        "error_rate": round(failures / attempted, 4) if attempted else 0.0,
+        # Share of executed runs that needed LLM retries after transient errors
+        "retry_rate": round(stats.get("agent_retried", 0) / executed, 4) if executed else 0.0,
+        "latency_ms": {
+            **stats["latency"].summary(),
+            "mean": round(executed_time / executed, 2) if executed else None,
+        },
+        "tokens": {
+            **stats["tokens"].summary(),
+            "mean": round(tokens / llm_runs, 2) if llm_runs else None,
+            "total": int(tokens),
+        },
+    }
+
+
+def agent_analytics(
+    rows: Iterable[Tuple[str, str, float]], interval: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Per-agent runs, error and retry rates and latency/token percentiles from agent_metrics_query
+    rows, for the whole window and, with interval "hour" or "day", per bucket.
+    """
+    window: Dict[str, Dict[str, Any]] = {}
+    buckets: Dict[str, Dict[str, Dict[str, Any]]] = {}
+    for bucket, metric, value in rows:
+        _accumulate_agents([(metric, value)], window)
+        if interval:
+            start = bucket if interval == "hour" else bucket[:10]
+            _accumulate_agents([(metric, value)], buckets.setdefault(start, {}))
+
+    result: Dict[str, Any] = {
+        "agents": {agent: _agent_report(stats) for agent, stats in sorted(window.items())}
+    }
+    if interval:
+        result["buckets"] = [
+            {
+                "start": start,
+                "agents": {agent: _agent_report(stats) for agent, stats in sorted(agents.items())},
+            }
+            for start, agents in sorted(buckets.items())
+        ]
+    return result
+
+
+def rebuild(db: Session) -> int:
+    """
+    Recompute every counter from the tickets and agent_traces tables.
+
+    Like the incremental updates, hourly buckets attribute a ticket's current state to
+    the hour it was created and a trace to the hour it was written. Returns the number
+    of counter rows written.
+    """
+    counters: Dict[str, Counter] = {TOTAL: Counter()}
+
+    def add(bucket_at: Optional[datetime], deltas: Dict[str, float]):
+        for bucket in (TOTAL, hour_bucket(bucket_at or datetime.utcnow())):
+            counters.setdefault(bucket, Counter()).update(deltas)
+
+    tickets = db.execute(
+        select(
+            Ticket.created_at,
+            Ticket.status,
+            Ticket.priority,
+            Ticket.intent,
+            Ticket.confidence,
+            Ticket.ticket_metadata,
+        ).execution_options(yield_per=10000)
+    )
+    for ticket in tickets:
+        add(ticket.created_at, ticket_deltas(None, ticket_snapshot(dict(ticket._mapping))))
+
+    traces = db.execute(
+        select(
+            AgentTrace.created_at,
+            AgentTrace.agent_name,
+            AgentTrace.execution_time_ms,
+            AgentTrace.tokens_used,
+            AgentTrace.retry_count,
+            AgentTrace.output_data,
+        ).execution_options(yield_per=10000)
+    )
+    for trace in traces:
+        add(trace.created_at, trace_deltas([trace]))
+
+    rows = [
+        {"bucket": bucket, "metric": metric, "value": float(value)}
+        for bucket, metrics in counters.items()
+        for metric, value in metrics.items()
+        if value
+    ]
+    db.execute(delete(StatsCounter))
+    if rows:
+        db.execute(StatsCounter.__table__.insert(), rows)
+    return len(rows)
+
+
+def ensure_counters(db: Session) -> bool:
+    """Build the counters once for a database that has tickets but no counters yet."""
+    if db.scalar(select(StatsCounter.id).limit(1)) is not None:
+        return False
+    if db.scalar(select(Ticket.id).limit(1)) is None:
+        return False
+    rebuild(db)
+    db.commit()
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain the /api/stats rollup counters")
+    parser.add_argument("--rebuild", action="store_true", help="Recompute from all tickets")
+    args = parser.parse_args()
+
+    from app.core.database import SessionLocal, engine, Base
+
+    Base.metadata.create_all(bind=engine)
+    db = SessionLocal()
+    try:
+        if args.rebuild:
+            written = rebuild(db)
+            db.commit()
+            print(f"✓ Rebuilt {written} stats counters")
+        counters = dict(db.execute(counters_query()).all())
+        print(summarize(counters))
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import asyncio
+import json
+import threading
+import time
+from collections import deque
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from app.core.config import settings
+
+# Events after which a ticket's stream ends
+TERMINAL_EVENTS = {"done", "failed"}
+
+
+class _Channel:
+    """Replay buffer and live subscribers of one ticket."""
+
+    def __init__(self, max_events: int):
+        self.events: deque = deque(maxlen=max_events)
+        self.next_id = 1
+        self.subscribers: List[Tuple[asyncio.AbstractEventLoop, asyncio.Queue]] = []
+        self.closed_at: Optional[float] = None
+
+
+class TicketEventBroker:
+    """
+    Fans ticket processing events out to Server-Sent Events subscribers.
+
+    Agents publish from worker threads or from the event loop. A subscriber first gets
+    the events published so far, then live ones until the ticket is done; finished
+    channels are kept for a while so late subscribers still get the replay.
+    """
+
+    def __init__(self, retention_seconds: int, max_events: int):
+        self.retention_seconds = retention_seconds
+        self.max_events = max_events
+        self._channels: Dict[int, _Channel] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, ticket_id: Optional[int], event: str, data: Dict[str, Any]):
+        """Publish an event for a ticket. Thread-safe."""
+        if ticket_id is None:
+            return
+        with self._lock:
+            self._expire()
+            channel = self._channels.get(ticket_id)
+            if channel is None or channel.closed_at is not None:
+                # First event, or the ticket is being processed again
+                channel = self._channels[ticket_id] = _Channel(self.max_events)
+            message = {"id": channel.next_id, "event": event, "data": data}
+            channel.next_id += 1
+            channel.events.append(message)
+            if event in TERMINAL_EVENTS:
+                channel.closed_at = time.monotonic()
+            subscribers = list(channel.subscribers)
+
+        for loop, queue in subscribers:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, message)
+            except RuntimeError:
+                pass  # Subscriber's event loop is closed
+
+    def has_events(self, ticket_id: int) -> bool:
+        with self._lock:
+            channel = self._channels.get(ticket_id)
+            return bool(channel and channel.events)
+
+    async def subscribe(
+        self, ticket_id: int, after_id: int = 0, heartbeat_seconds: Optional[float] = None
+    ) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """
+        Yield a ticket's events (skipping ids up to after_id) until it is done.
+
+        Yields None when nothing was published for heartbeat_seconds.
+        """
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        with self._lock:
+            channel = self._channels.get(ticket_id)
+            if channel is None:
+                channel = self._channels[ticket_id] = _Channel(self.max_events)
+            replay = [message for message in channel.events if message["id"] > after_id]
+            closed = channel.closed_at is not None
+            if not closed:
+                channel.subscribers.append((loop, queue))
+
+        try:
+            for message in replay:
+                yield message
+            if closed:
+                return
+            while True:
+                try:
+                    message = await asyncio.wait_for(queue.get(), timeout=heartbeat_seconds)
+                except asyncio.TimeoutError:
+                    yield None
+                    continue
+                if message["id"] <= after_id:
+                    continue
+                yield message
+                if message["event"] in TERMINAL_EVENTS:
+                    return
+        finally:
+            with self._lock:
+                if (loop, queue) in channel.subscribers:
+                    channel.subscribers.remove((loop, queue))
+                if not channel.events and not channel.subscribers:
+                    self._channels.pop(ticket_id, None)
+
+    def _expire(self):
+        cutoff = time.monotonic() - self.retention_seconds
+        expired = [
+            ticket_id
+            for ticket_id, channel in self._channels.items()
+            if channel.closed_at is not None
+            and channel.closed_at < cutoff
+            and not channel.subscribers
+        ]
+        for ticket_id in expired:
+            del self._channels[ticket_id]
+
+
+def format_sse(message: Optional[Dict[str, Any]]) -> str:
+    """Encode an event for a text/event-stream response (None: keep-alive comment)."""
+    if message is None:
+        return ": keep-alive\n\n"
+    data = json.dumps(message["data"], default=str)
+    return f"id: {message['id']}\nevent: {message['event']}\ndata: {data}\n\n"
+
+
+def publish_traces(ticket_id: Optional[int], traces: List[Dict[str, Any]]):
+    """Publish an `agent` progress event per finished agent trace."""
+    for trace in traces:
+        ticket_events.publish(
+            ticket_id,
+            "agent",
+            {
+                "agent": trace["agent_name"],
+                "skipped": bool((trace.get("output_data") or {}).get("skipped")),
+                "confidence": trace.get("confidence"),
+                "reasoning": trace.get("reasoning"),
+                "execution_time_ms": trace.get("execution_time_ms"),
+            },
+        )
+
+
+class TextStreamPublisher:
+    """
+    Turns successive partial outputs of a streamed completion into text events.
+
+    Publishes `response_delta` with the text appended since the last partial, or
+    `response_reset` with the full text if it no longer extends it (a retried call).
+    """
+
+    def __init__(self, ticket_id: Optional[int], field: str):
+        self.ticket_id = ticket_id
+        self.field = field
+        self.text = ""
+
+    def __call__(self, partial: Any):
+        text = getattr(partial, self.field, None) or ""
+        if text == self.text:
+            return
+        if text.startswith(self.text):
+            delta = text[len(self.text) :]
+            ticket_events.publish(self.ticket_id, "response_delta", {"delta": delta})
+        else:
+            ticket_events.publish(self.ticket_id, "response_reset", {"text": text})
+        self.text = text
+
+
+# Global instance
+ticket_events = TicketEventBroker(
+    retention_seconds=settings.TICKET_EVENTS_RETENTION_SECONDS,
+    max_events=settings.TICKET_EVENTS_MAX_BUFFERED,
+)
@@ -0,0 +1,373 @@
+import asyncio
+import time
+from typing import Dict, Any, List, Optional, Tuple
+from datetime import datetime
+from sqlalchemy import select, update
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Ticket, TicketStatus
+from app.schemas.agent_output import TriageOutput, ResearchOutput, ResponseOutput
+from app.agents.workflow import (
+    support_workflow,
+    async_support_workflow,
+    merge_traces,
+    failed_agent,
+)
+from app.agents.agent_nodes import escalation_agent, aescalation_agent
+from app.services.response_cache import response_cache, render_customer_name
+from app.services.ticket_events import ticket_events, publish_traces
+from app.services.trace_writer import trace_writer, trace_rows
+from app.services.worker_pool import ticket_worker_pool
+from app.services.stats_counters import (
+    apply_deltas,
+    apply_hourly_deltas,
+    ticket_deltas,
+    ticket_snapshot,
+    trace_deltas_by_hour,
+)
+
+
+def build_initial_state(ticket: Ticket) -> Dict[str, Any]:
+    """Build the agent workflow input state for a ticket."""
+    return {
+        "ticket_id": ticket.id,
+        "customer_email": ticket.customer_email,
+        "customer_name": ticket.customer_name,
+        "subject": ticket.subject,
+        "message": ticket.message,
+        "order_id": ticket.order_id,
+        "triage": None,
+        "research": None,
+        "policy_check": None,
+        "response": None,
+        "escalation": None,
+        "final_response": None,
+        "requires_human": False,
+        "overall_confidence": 0.0,
+        "_traces": [],
+    }
+
+
+def _cache_eligible(initial_state: Dict[str, Any]) -> bool:
+    # Order-specific tickets depend on live order data and are never cached
+    return settings.RESPONSE_CACHE_ENABLED and not initial_state.get("order_id")
+
+
+def _cached_state(
+    initial_state: Dict[str, Any],
+) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+    """Build a state from a semantic cache hit: (state without escalation, cache trace)."""
+    start_time = time.time()
+    hit = response_cache.lookup(initial_state["subject"], initial_state["message"])
+    if not hit:
+        return None
+
+    entry, similarity = hit
+    response = ResponseOutput(**entry["response"])
+    response.response_text = render_customer_name(
+        response.response_text, initial_state["customer_name"]
+    )
+
+    state = {
+        **initial_state,
+        "triage": TriageOutput(**entry["triage"]),
+        "research": ResearchOutput(**entry["research"]),
+        "response": response,
+        "final_response": response.response_text,
+    }
+    trace = {
+        "agent_name": "cache",
+        "input_data": {"subject": initial_state["subject"], "similarity": round(similarity, 4)},
+        "output_data": {"cached_agents": ["triage", "research", "response"]},
+        "reasoning": f"Reused outputs from a similar ticket (similarity {similarity:.3f})",
+        "confidence": similarity,
+        "tools_used": [],
+        "execution_time_ms": int((time.time() - start_time) * 1000),
+    }
+    return state, trace
+
+
+def _finish_cached_state(
+    state: Dict[str, Any], cache_trace: Dict[str, Any], escalation_update: Dict[str, Any]
+) -> Dict[str, Any]:
+    traces = merge_traces([cache_trace], escalation_update.pop("_traces", []))
+    publish_traces(state.get("ticket_id"), traces)
+    return {**state, **escalation_update, "_traces": traces}
+
+
+def _store_in_cache(initial_state: Dict[str, Any], final_state: Dict[str, Any]):
+    """Cache outputs of tickets that resolved without a human."""
+    if final_state.get("requires_human"):
+        return
+    if not all(final_state.get(key) for key in ("triage", "research", "response")):
+        return
+
+    response_cache.store(
+        initial_state["subject"],
+        initial_state["message"],
+        initial_state["customer_name"],
+        {key: final_state[key].model_dump() for key in ("triage", "research", "response")},
+    )
+
+
+def run_workflow(initial_state: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Run the agent workflow for a prepared state.
+
+    Near-duplicates of earlier tickets are answered from the semantic response cache;
+    only the (rule-based) escalation decision is re-run for them.
+    """
+    if not _cache_eligible(initial_state):
+        return support_workflow.invoke(initial_state)
+
+    cached = _cached_state(initial_state)
+    if cached:
+        state, cache_trace = cached
+        return _finish_cached_state(state, cache_trace, escalation_agent(state))
+
+    final_state = support_workflow.invoke(initial_state)
+    _store_in_cache(initial_state, final_state)
+    return final_state
+
+
+async def arun_workflow(initial_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Run the agent workflow on the async OpenAI client."""
+    if not _cache_eligible(initial_state):
+        return await async_support_workflow.ainvoke(initial_state)
+
+    # Embedding the ticket is CPU-bound, keep it off the event loop
+    cached = await asyncio.to_thread(_cached_state, initial_state)
+    if cached:
+        state, cache_trace = cached
+        return _finish_cached_state(state, cache_trace, await aescalation_agent(state))
+
+    final_state = await async_support_workflow.ainvoke(initial_state)
+    await asyncio.to_thread(_store_in_cache, initial_state, final_state)
+    return final_state
+
+
+def workflow_result_values(final_state: Dict[str, Any]) -> Dict[str, Any]:
+    """Ticket column values for a finished workflow."""
+    now = datetime.utcnow()
+    values = {
+        "ai_response": final_state.get("final_response"),
+        "confidence": final_state.get("overall_confidence", 0.0),
+        # Set here rather than by onupdate so callers can return it without a reload
+        "updated_at": now,
+    }
+    if final_state.get("triage"):
+        values["intent"] = final_state["triage"].intent
+        values["priority"] = final_state["triage"].priority
+
+    # Set status based on escalation
+    if final_state.get("requires_human"):
+        values["status"] = TicketStatus.WAITING_HUMAN
+    else:
+        values["status"] = TicketStatus.RESOLVED
+        values["resolved_at"] = now
+        values["final_response"] = final_state.get("final_response")
+        values["response_approved"] = 1
+    return values
+
+
+def workflow_failed_values(error: Exception) -> Dict[str, Any]:
+    """Ticket column values routing a ticket whose workflow failed to human review."""
+    metadata = {"error": str(error)}
+    if failed_agent(error):
+        # Counted as a failed run of that agent (agent_failures)
+        metadata["failed_agent"] = failed_agent(error)
+    return {"status": TicketStatus.WAITING_HUMAN, "ticket_metadata": metadata}
+
+
+def _locked_counted_values(db: Session, ticket_id: int) -> Optional[Dict[str, Any]]:
+    """Column values of a ticket's counted fields, locked until the transaction ends."""
+    row = db.execute(
+        select(
+            Ticket.created_at,
+            Ticket.status,
+            Ticket.priority,
+            Ticket.intent,
+            Ticket.confidence,
+            Ticket.ticket_metadata,
+        )
+        .where(Ticket.id == ticket_id)
+        .with_for_update()
+    ).first()
+    return dict(row._mapping) if row else None
+
+
+def update_ticket_counted(
+    db: Session, ticket_id: int, values: Dict[str, Any], traces: Optional[list] = None
+) -> bool:
+    """UPDATE a ticket and its stats counters in the session's transaction."""
+    current = _locked_counted_values(db, ticket_id)
+    if current is None:
+        return False
+    db.execute(update(Ticket).where(Ticket.id == ticket_id).values(**values))
+    changes = ticket_deltas(ticket_snapshot(current), ticket_snapshot({**current, **values}))
+    apply_hourly_deltas(db, [(current["created_at"], changes)] + trace_deltas_by_hour(traces or []))
+    return True
+
+
+def insert_ticket_counted(
+    db: Session, ticket: Ticket, values: Dict[str, Any], traces: Optional[list] = None
+) -> int:
+    """
+    INSERT a processed ticket with its values, its traces and its stats counters in the
+    session's transaction. Returns the ticket id.
+    """
+    for key, value in values.items():
+        setattr(ticket, key, value)
+    db.add(ticket)
+    db.flush()
+    rows = trace_rows(ticket.id, traces or [])
+    apply_hourly_deltas(
+        db,
+        [(ticket.created_at, ticket_deltas(None, ticket_snapshot(ticket)))]
+        + trace_deltas_by_hour(rows),
+    )
+    trace_writer.write(db, rows)
+    return ticket.id
+
+
+def save_workflow_result(
+    db: Session, ticket_id: int, final_state: Dict[str, Any]
+) -> Optional[Dict[str, Any]]:
+    """
+    Write a finished workflow in the session's transaction: one UPDATE of the ticket and
+    a multi-row INSERT of its traces. Returns the ticket values, or None if the ticket
+    no longer exists.
+    """
+    values = workflow_result_values(final_state)
+    rows = trace_rows(ticket_id, final_state.get("_traces", []))
+    if not update_ticket_counted(db, ticket_id, values, rows):
+        return None
+    trace_writer.write(db, rows)
+    return values
+
+
+def ticket_outcome(ticket: Ticket) -> Dict[str, Any]:
+    """Payload of the `done` stream event for a processed ticket."""
+    return {
+        "status": ticket.status.value,
+        "intent": ticket.intent,
+        "priority": ticket.priority.value if ticket.priority else None,
+        "confidence": ticket.confidence,
+        "requires_human": ticket.status == TicketStatus.WAITING_HUMAN,
+        "ai_response": ticket.ai_response,
+    }
+
+
+def start_processing(ticket_id: int) -> Optional[Dict[str, Any]]:
+    """Mark a queued ticket as in progress and return its workflow state."""
+    db = SessionLocal()
+    try:
+        ticket = db.query(Ticket).filter(Ticket.id == ticket_id).with_for_update().first()
+        if not ticket:
+            return None
+
+        before = ticket_snapshot(ticket)
+        ticket.status = TicketStatus.IN_PROGRESS
+        apply_deltas(db, ticket_deltas(before, ticket_snapshot(ticket)), at=ticket.created_at)
+        db.commit()
+        ticket_events.publish(ticket_id, "status", {"status": ticket.status.value})
+        return build_initial_state(ticket)
+    finally:
+        db.close()
+
+
+def finish_processing(ticket_id: int, final_state: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    """Write workflow results and traces back to a ticket in one transaction."""
+    db = SessionLocal()
+    try:
+        values = save_workflow_result(db, ticket_id, final_state)
+        if values is None:
+            db.rollback()
+            return None
+        db.commit()
+    finally:
+        db.close()
+
+    outcome = ticket_outcome(Ticket(id=ticket_id, **values))
+    ticket_events.publish(ticket_id, "done", outcome)
+    return outcome
+
+
+def fail_processing(ticket_id: int, error: Exception):
+    """Route a ticket whose workflow failed to human review."""
+    db = SessionLocal()
+    try:
+        update_ticket_counted(db, ticket_id, workflow_failed_values(error))
+        db.commit()
+    finally:
+        db.close()
+    ticket_events.publish(ticket_id, "failed", {"error": str(error)})
+
+
+def process_ticket(ticket_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Process a persisted ticket through the agent workflow and return its outcome.
+
+    Used by the background worker pool; each step opens its own database session.
+    """
+    initial_state = start_processing(ticket_id)
+    if initial_state is None:
+        return None
+
+    try:
+        final_state = run_workflow(initial_state)
+        return finish_processing(ticket_id, final_state)
+    except Exception as e:
+        fail_processing(ticket_id, e)
+        raise
+
+
+async def aprocess_ticket(ticket_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Async variant of process_ticket: the workflow runs on the event loop via `ainvoke`,
+    database work runs in a thread.
+    """
+    initial_state = await asyncio.to_thread(start_processing, ticket_id)
+    if initial_state is None:
+        return None
+
+    try:
+        final_state = await arun_workflow(initial_state)
+        return await asyncio.to_thread(finish_processing, ticket_id, final_state)
+    except Exception as e:
+        await asyncio.to_thread(fail_processing, ticket_id, e)
+        raise
+
+
+async def run_ticket(ticket_id: int) -> Optional[Dict[str, Any]]:
+    """Process a persisted ticket from the event loop with the configured OpenAI client."""
+    if settings.ASYNC_AGENT_CLIENT:
+        return await aprocess_ticket(ticket_id)
+    return await asyncio.to_thread(process_ticket, ticket_id)
+
+
+def unfinished_ticket_ids() -> List[int]:
+    """Tickets still new or in progress, oldest first."""
+    db = SessionLocal()
+    try:
+        return list(
+            db.scalars(
+                select(Ticket.id)
+                .where(Ticket.status.in_([TicketStatus.NEW, TicketStatus.IN_PROGRESS]))
+                .order_by(Ticket.id)
+            )
+        )
+    finally:
+        db.close()
+
+
+async def requeue_tickets(ticket_ids: List[int]):
+    """
+    Queue tickets interrupted by a restart (the queue lives in memory), waiting for room
+    in the queue rather than rejecting them.
+    """
+    for ticket_id in ticket_ids:
+        await ticket_worker_pool.enqueue_wait(ticket_id)
+    print(f"✓ Re-queued {len(ticket_ids)} unfinished tickets")
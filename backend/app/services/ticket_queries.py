@@ -0,0 +1,121 @@
+import base64
+from datetime import datetime
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import Select, func, select, tuple_
+from sqlalchemy.orm import defer, load_only, raiseload, selectinload
+
+from app.models import Ticket, TicketStatus, AgentTrace, TicketMessage
+
+# Columns of a ?view=summary list row (TicketSummary): no message or response text
+SUMMARY_COLUMNS = (
+    Ticket.id,
+    Ticket.ticket_number,
+    Ticket.customer_email,
+    Ticket.customer_name,
+    Ticket.subject,
+    Ticket.status,
+    Ticket.priority,
+    Ticket.intent,
+    Ticket.confidence,
+    Ticket.response_approved,
+    Ticket.order_id,
+    Ticket.created_at,
+    Ticket.updated_at,
+    Ticket.resolved_at,
+)
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a pagination cursor can't be decoded."""
+
+
+def encode_cursor(ticket: Ticket) -> str:
+    """Opaque cursor pointing just past a ticket in newest-first order."""
+    raw = f"{ticket.created_at.isoformat()}|{ticket.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode()
+        created_at, ticket_id = raw.split("|")
+        return datetime.fromisoformat(created_at), int(ticket_id)
+    except (ValueError, UnicodeDecodeError) as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+def ticket_list_query(
+    status: Optional[TicketStatus] = None,
+    customer_email: Optional[str] = None,
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    summary: bool = False,
+) -> Select:
+    """
+    Newest-first ticket page.
+
+    With a cursor the page starts after the cursor's (created_at, id) and is an index
+    range scan on the matching ix_tickets_*_created_at_id index, however deep it is;
+    `skip` still works but scans and discards every skipped row.
+    """
+    query = select(Ticket)
+    if summary:
+        query = query.options(load_only(*SUMMARY_COLUMNS))
+    if status:
+        query = query.where(Ticket.status == status)
+    if customer_email:
+        query = query.where(Ticket.customer_email == customer_email)
+    if cursor:
+        query = query.where(tuple_(Ticket.created_at, Ticket.id) < decode_cursor(cursor))
+    elif skip:
+        query = query.offset(skip)
+    # id breaks ties between tickets created in the same instant (bulk imports)
+    return query.order_by(Ticket.created_at.desc(), Ticket.id.desc()).limit(limit)
+
+
+# Parts of GET /api/tickets/{id} selectable with ?include=
+TICKET_INCLUDES = ("traces", "messages", "trace_data")
+# Trace columns left out unless "trace_data" is included: the large JSON blobs
+TRACE_DATA_COLUMNS = (AgentTrace.input_data, AgentTrace.output_data, AgentTrace.tool_results)
+
+
+def ticket_version_query(where) -> Select:
+    """
+    One small query identifying the current state of a ticket and its relations, for
+    ETags: updated_at plus the count and newest id of its traces and messages.
+    """
+    traces = AgentTrace.ticket_id == Ticket.id
+    messages = TicketMessage.ticket_id == Ticket.id
+    return select(
+        Ticket.id,
+        Ticket.updated_at,
+        select(func.count(AgentTrace.id)).where(traces).scalar_subquery(),
+        select(func.max(AgentTrace.id)).where(traces).scalar_subquery(),
+        select(func.count(TicketMessage.id)).where(messages).scalar_subquery(),
+        select(func.max(TicketMessage.id)).where(messages).scalar_subquery(),
+    ).where(where)
+
+
+def ticket_detail_query(ticket_id: int, include: Iterable[str]) -> Select:
+    """
+    A ticket with the relations in `include` loaded up front (one SELECT IN query each,
+    as lazy loads are not possible on an async session) and the rest not loaded at all.
+    """
+    include = set(include)
+    options = [defer(Ticket.ticket_metadata, raiseload=True)]
+    if "traces" in include:
+        traces = selectinload(Ticket.agent_traces)
+        if "trace_data" not in include:
+            traces = traces.options(
+                *(defer(column, raiseload=True) for column in TRACE_DATA_COLUMNS)
+            )
+        options.append(traces)
+    else:
+        options.append(raiseload(Ticket.agent_traces))
+    if "messages" in include:
+        options.append(selectinload(Ticket.messages))
+    else:
+        options.append(raiseload(Ticket.messages))
+    return select(Ticket).where(Ticket.id == ticket_id).options(*options)
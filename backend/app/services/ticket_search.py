@@ -0,0 +1,185 @@
+"""
+Full-text search over ticket subject, message and responses.
+
+SQLite uses an FTS5 external-content table kept in sync by triggers on `tickets`;
+Postgres uses a generated, weighted `tsvector` column with a GIN index. Both are
+installed (and backfilled) by `install_search_index` at startup.
+"""
+
+import html
+from typing import List, Optional
+
+from sqlalchemy import Select, column, func, literal_column, select, table, text
+from sqlalchemy.engine import Engine
+
+from app.models import Ticket, TicketStatus, TicketPriority
+from app.services.ticket_queries import SUMMARY_COLUMNS
+
+SEARCH_DIALECTS = ("sqlite", "postgresql")
+SEARCH_COLUMNS = ("subject", "message", "ai_response", "final_response")
+# Relevance weight per column, subject matches count most
+COLUMN_WEIGHTS = (10.0, 1.0, 0.5, 0.5)
+TS_CONFIG = "english"
+# The index marks matches with control characters, which survive HTML escaping of the
+# customer text and are only then turned into tags (see highlight_snippet)
+HIGHLIGHT_START, HIGHLIGHT_STOP = "\x02", "\x03"
+
+_columns = ", ".join(SEARCH_COLUMNS)
+_new_values = ", ".join(f"new.{name}" for name in SEARCH_COLUMNS)
+_old_values = ", ".join(f"old.{name}" for name in SEARCH_COLUMNS)
+
+SQLITE_DDL = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS tickets_fts USING fts5(
+        {_columns}, content='tickets', content_rowid='id', tokenize='porter unicode61'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS tickets_fts_insert AFTER INSERT ON tickets BEGIN
+        INSERT INTO tickets_fts(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS tickets_fts_delete AFTER DELETE ON tickets BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, {_columns})
+        VALUES ('delete', old.id, {_old_values});
+    END""",
+    # Status-only updates (most of them) leave the index alone
+    f"""CREATE TRIGGER IF NOT EXISTS tickets_fts_update AFTER UPDATE OF {_columns} ON tickets
+    BEGIN
+        INSERT INTO tickets_fts(tickets_fts, rowid, {_columns})
+        VALUES ('delete', old.id, {_old_values});
+        INSERT INTO tickets_fts(rowid, {_columns}) VALUES (new.id, {_new_values});
+    END""",
+]
+
+_weighted = " || ".join(
+    f"setweight(to_tsvector('{TS_CONFIG}', coalesce({name}, '')), '{weight}')"
+    for name, weight in zip(SEARCH_COLUMNS, "ABCC")
+)
+POSTGRES_DDL = [
+    # Generated columns are kept in sync by Postgres itself on insert and update
+    f"""ALTER TABLE tickets ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS ({_weighted}) STORED""",
+    "CREATE INDEX IF NOT EXISTS ix_tickets_search_vector ON tickets USING GIN (search_vector)",
+]
+
+fts = table("tickets_fts", column("rowid"))
+fts_table = literal_column("tickets_fts")
+search_vector = literal_column("tickets.search_vector")
+
+
+def install_search_index(engine: Engine):
+    """Create the full-text index for the engine's dialect, backfilling existing tickets."""
+    dialect = engine.dialect.name
+    if dialect not in SEARCH_DIALECTS:
+        print(f"✗ Ticket search is not supported on {dialect}")
+        return
+    with engine.begin() as connection:
+        if dialect == "postgresql":
+            for statement in POSTGRES_DDL:
+                connection.execute(text(statement))
+            return
+        exists = connection.execute(
+            text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'tickets_fts'")
+        ).first()
+        for statement in SQLITE_DDL:
+            connection.execute(text(statement))
+        if not exists:
+            connection.execute(text("INSERT INTO tickets_fts(tickets_fts) VALUES ('rebuild')"))
+            print("✓ Built the ticket search index")
+
+
+def fts5_query(query: str) -> str:
+    """
+    User input as an FTS5 query: every term must match, a trailing * matches prefixes.
+    Terms are quoted so FTS5 operators and punctuation can't cause syntax errors.
+    """
+    terms = []
+    for term in query.split():
+        prefix = term.endswith("*")
+        term = term.rstrip("*").replace('"', "")
+        if term:
+            terms.append(f'"{term}"' + ("*" if prefix else ""))
+    return " ".join(terms)
+
+
+def highlight_snippet(snippet: Optional[str]) -> Optional[str]:
+    """A snippet from the index as HTML: the text escaped, the matches in <mark> tags."""
+    if snippet is None:
+        return None
+    escaped = html.escape(snippet)
+    return escaped.replace(HIGHLIGHT_START, "<mark>").replace(HIGHLIGHT_STOP, "</mark>")
+
+
+def _filters(
+    status: Optional[TicketStatus], priority: Optional[TicketPriority], intent: Optional[str]
+) -> List:
+    filters = []
+    if status:
+        filters.append(Ticket.status == status)
+    if priority:
+        filters.append(Ticket.priority == priority)
+    if intent:
+        filters.append(Ticket.intent == intent)
+    return filters
+
+
+def ticket_search_query(
+    dialect: str,
+    query: str,
+    status: Optional[TicketStatus] = None,
+    priority: Optional[TicketPriority] = None,
+    intent: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 20,
+) -> Select:
+    """
+    Ranked matches as TicketSummary columns plus `score` (higher is better) and a raw
+    `snippet` for highlight_snippet. Ranking runs on the index alone; snippets are only
+    built for the returned page.
+    """
+    filters = _filters(status, priority, intent)
+    if dialect == "postgresql":
+        tsquery = func.websearch_to_tsquery(TS_CONFIG, query)
+        page = (
+            select(Ticket.id, func.ts_rank_cd(search_vector, tsquery).label("score"))
+            .where(search_vector.op("@@")(tsquery), *filters)
+            .order_by(literal_column("score").desc(), Ticket.id.desc())
+            .offset(skip)
+            .limit(limit)
+            .subquery()
+        )
+        snippet = func.ts_headline(
+            TS_CONFIG,
+            func.concat_ws(" … ", *(getattr(Ticket, name) for name in SEARCH_COLUMNS)),
+            tsquery,
+            f'StartSel="{HIGHLIGHT_START}", StopSel="{HIGHLIGHT_STOP}", '
+            "MaxFragments=2, MaxWords=20",
+        )
+        return (
+            select(*SUMMARY_COLUMNS, page.c.score, snippet.label("snippet"))
+            .join(page, page.c.id == Ticket.id)
+            .order_by(page.c.score.desc(), Ticket.id.desc())
+        )
+
+    match = fts_table.op("MATCH")(fts5_query(query))
+    # bm25() is lower for better matches; negate it so score is higher-is-better everywhere
+    score = (-func.bm25(fts_table, *COLUMN_WEIGHTS)).label("score")
+    # Every match gets ranked: only join tickets when a filter needs its columns
+    source = fts.join(Ticket.__table__, Ticket.id == fts.c.rowid) if filters else fts
+    page = (
+        select(fts.c.rowid.label("id"), score)
+        .select_from(source)
+        .where(match, *filters)
+        .order_by(literal_column("score").desc(), fts.c.rowid.desc())
+        .offset(skip)
+        .limit(limit)
+        .subquery()
+    )
+    # Looked up per page row by rowid; joining the index instead would run the search again
+    snippet = (
+        select(func.snippet(fts_table, -1, HIGHLIGHT_START, HIGHLIGHT_STOP, "…", 16))
+        .where(match, fts.c.rowid == page.c.id)
+        .scalar_subquery()
+    )
+    return (
+        select(*SUMMARY_COLUMNS, page.c.score, snippet.label("snippet"))
+        .join(page, page.c.id == Ticket.id)
+        .order_by(page.c.score.desc(), Ticket.id.desc())
+    )
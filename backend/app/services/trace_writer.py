@@ -0,0 +1,190 @@
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import AgentTrace
+
+# Rows per multi-row INSERT; keeps bound parameters well under SQLite's limit
+INSERT_CHUNK_ROWS = 500
+
+logger = logging.getLogger(__name__)
+
+
+def trace_rows(ticket_id: int, traces: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """agent_traces column values for a ticket's workflow traces."""
+    now = datetime.utcnow()
+    return [
+        {
+            "ticket_id": ticket_id,
+            "agent_name": trace["agent_name"],
+            "step_number": trace["step_number"],
+            "input_data": trace.get("input_data"),
+            "output_data": trace.get("output_data"),
+            "reasoning": trace.get("reasoning"),
+            "confidence": trace.get("confidence"),
+            "tools_used": trace.get("tools_used"),
+            "tool_results": trace.get("tool_results"),
+            "execution_time_ms": trace.get("execution_time_ms", 0),
+            "tokens_used": trace.get("tokens_used"),
+            "llm_time_ms": trace.get("llm_time_ms"),
+            "prompt_tokens": trace.get("prompt_tokens"),
+            "completion_tokens": trace.get("completion_tokens"),
+            "time_to_first_token_ms": trace.get("time_to_first_token_ms"),
+            "retry_count": trace.get("retry_count"),
+            "created_at": now,
+        }
+        for trace in traces
+    ]
+
+
+def insert_traces(db: Session, rows: List[Dict[str, Any]]):
+    """Insert trace rows with multi-row INSERT ... VALUES statements."""
+    for offset in range(0, len(rows), INSERT_CHUNK_ROWS):
+        db.execute(insert(AgentTrace).values(rows[offset : offset + INSERT_CHUNK_ROWS]))
+
+
+class TraceWriteBuffer:
+    """
+    Write-behind buffer that batches agent trace inserts across tickets.
+
+    Rows are flushed by a background thread when max_rows are pending or every
+    flush_interval seconds. Traces show up on a ticket shortly after its status, and
+    rows still pending are lost if the process dies.
+    """
+
+    def __init__(
+        self,
+        enabled: bool,
+        max_rows: int,
+        flush_interval: float,
+        session_factory: Callable[[], Session] = SessionLocal,
+    ):
+        self.enabled = enabled
+        self.max_rows = max_rows
+        self.flush_interval = flush_interval
+        self.session_factory = session_factory
+        self._pending: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._flushed_rows = 0
+        self._flushes = 0
+        self._dropped_rows = 0
+
+    def write(self, db: Session, rows: List[Dict[str, Any]]):
+        """Insert rows in the session's transaction, or buffer them once it commits."""
+        if not rows:
+            return
+        if not self.enabled:
+            insert_traces(db, rows)
+            return
+        # Buffered rows reference the ticket row, so only queue them after it is committed
+        event.listen(db, "after_commit", lambda session: self.add(rows), once=True)
+
+    def add(self, rows: List[Dict[str, Any]]):
+        with self._lock:
+            self._pending.extend(rows)
+            full = len(self._pending) >= self.max_rows
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write all pending rows in one transaction. Returns the number written.
+
+        If the batch fails, the rows are retried one by one and only those that still
+        fail (e.g. traces of a deleted ticket) are dropped.
+        """
+        with self._flush_lock:
+            with self._lock:
+                rows, self._pending = self._pending, []
+            if not rows:
+                return 0
+            db = self.session_factory()
+            try:
+                try:
+                    insert_traces(db, rows)
+                    db.commit()
+                    written = len(rows)
+                except Exception as e:
+                    db.rollback()
+                    logger.warning(
+                        "Writing %d buffered traces failed, retrying row by row: %s", len(rows), e
+                    )
+                    written = self._insert_each(db, rows)
+            finally:
+                db.close()
+            self._flushed_rows += written
+            self._dropped_rows += len(rows) - written
+            self._flushes += 1
+            return written
+
+    @staticmethod
+    def _insert_each(db: Session, rows: List[Dict[str, Any]]) -> int:
+        written = 0
+        for row in rows:
+            try:
+                insert_traces(db, [row])
+                db.commit()
+                written += 1
+            except Exception as e:
+                db.rollback()
+                logger.error(
+                    "Dropped buffered %s trace of ticket %s: %s",
+                    row["agent_name"],
+                    row["ticket_id"],
+                    e,
+                )
+        return written
+
+    def start(self):
+        if not self.enabled or self._thread:
+            return
+        self._stopped.clear()
+        self._thread = threading.Thread(target=self._run, name="trace-writer", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stop the flusher thread and write whatever is pending."""
+        if self._thread:
+            self._stopped.set()
+            self._wake.set()
+            self._thread.join()
+            self._thread = None
+        self.flush()
+
+    def _run(self):
+        while not self._stopped.is_set():
+            self._wake.wait(timeout=self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self._pending)
+        return {
+            "enabled": self.enabled,
+            "pending_rows": pending,
+            "flushed_rows": self._flushed_rows,
+            "flushes": self._flushes,
+            "dropped_rows": self._dropped_rows,
+            "avg_rows_per_flush": (
+                round(self._flushed_rows / self._flushes, 1) if self._flushes else 0.0
+            ),
+        }
+
+
+# Global instance
+trace_writer = TraceWriteBuffer(
+    enabled=settings.TRACE_WRITE_BUFFER_ENABLED,
+    max_rows=settings.TRACE_WRITE_BUFFER_MAX_ROWS,
+    flush_interval=settings.TRACE_WRITE_BUFFER_FLUSH_SECONDS,
+)
@@ -0,0 +1,275 @@
+import json
+import os
+import threading
+from abc import ABC, abstractmethod
+from pathlib import Path
+from typing import List, Dict, Any, Optional, Tuple
+import numpy as np
+
+from app.core.config import settings
+
+
+class VectorStore(ABC):
+    """Storage and nearest-neighbour search for knowledge base chunks."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    @abstractmethod
+    def count(self) -> int:
+        ...
+
+    @abstractmethod
+    def upsert(
+        self,
+        ids: List[str],
+        embeddings: List[List[float]],
+        documents: List[str],
+        metadatas: List[Dict[str, Any]],
+    ):
+        ...
+
+    @abstractmethod
+    def delete(self, ids: List[str]):
+        ...
+
+    @abstractmethod
+    def query(
+        self, query_embeddings: List[List[float]], n_results: int
+    ) -> List[List[Dict[str, Any]]]:
+        """
+        Return, for each query, up to n_results hits ordered by similarity.
+
+        Each hit has "id", "document", "metadata" and "distance" (cosine distance).
+        """
+        ...
+
+    @abstractmethod
+    def get_all(self) -> Tuple[List[str], List[str], List[Dict[str, Any]]]:
+        """Every stored chunk as (ids, documents, metadatas), e.g. to build a lexical index."""
+        ...
+
+    @abstractmethod
+    def reset(self):
+        ...
+
+
+class ChromaVectorStore(VectorStore):
+    """ChromaDB persistent collection with HNSW cosine index."""
+
+    def __init__(self, directory: str, collection_name: str = "support_knowledge"):
+        super().__init__(directory)
+        self.collection_name = collection_name
+
+        # Imported here: chromadb alone adds noticeably to cold start
+        import chromadb
+        from chromadb.config import Settings
+
+        self.client = chromadb.PersistentClient(
+            path=directory, settings=Settings(anonymized_telemetry=False)
+        )
+        self.collection = self.client.get_or_create_collection(
+            name=collection_name, metadata={"hnsw:space": "cosine"}
+        )
+
+    def count(self) -> int:
+        return self.collection.count()
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.collection.upsert(
+            ids=ids, embeddings=embeddings, documents=documents, metadatas=metadatas
+        )
+
+    def delete(self, ids):
+        self.collection.delete(ids=ids)
+
+    def query(self, query_embeddings, n_results):
+        results = self.collection.query(
+            query_embeddings=query_embeddings,
+            n_results=n_results,
+            include=["documents", "metadatas", "distances"],
+        )
+        empty = [[] for _ in query_embeddings]
+        return [
+            [
+                {"id": id_, "document": doc, "metadata": metadata, "distance": distance}
+                for id_, doc, metadata, distance in zip(ids, docs, metadatas, distances)
+            ]
+            for ids, docs, metadatas, distances in zip(
+                results["ids"] or empty,
+                results["documents"] or empty,
+                results["metadatas"] or empty,
+                results["distances"] or empty,
+            )
+        ]
+
+    def get_all(self):
+        results = self.collection.get(include=["documents", "metadatas"])
+        return results["ids"], results["documents"], results["metadatas"]
+
+    def reset(self):
+        self.client.delete_collection(self.collection_name)
+        self.collection = self.client.create_collection(
+            name=self.collection_name, metadata={"hnsw:space": "cosine"}
+        )
+
+
+class NumpyVectorStore(VectorStore):
+    """
+    Exact in-process search over a contiguous float32 matrix of normalized embeddings.
+
+    Embeddings live in a memory-mapped .npy file, documents and metadata in a JSON
+    sidecar. Queries are a single matrix product plus an argpartition top-k, which for
+    a few thousand chunks beats an ANN index in both latency and memory.
+    """
+
+    EMBEDDINGS_FILE = "embeddings.npy"
+    RECORDS_FILE = "records.json"
+
+    def __init__(self, directory: str):
+        super().__init__(directory)
+        self._lock = threading.Lock()
+        self._matrix: Optional[np.ndarray] = None
+        self._ids: List[str] = []
+        self._documents: List[str] = []
+        self._metadatas: List[Dict[str, Any]] = []
+        self._positions: Dict[str, int] = {}
+        self._load()
+
+    @property
+    def _embeddings_path(self) -> Path:
+        return Path(self.directory) / self.EMBEDDINGS_FILE
+
+    @property
+    def _records_path(self) -> Path:
+        return Path(self.directory) / self.RECORDS_FILE
+
+    def _load(self):
+        if not (self._embeddings_path.exists() and self._records_path.exists()):
+            return
+        with open(self._records_path, "r", encoding="utf-8") as f:
+            records = json.load(f)
+        self._ids = records["ids"]
+        self._documents = records["documents"]
+        self._metadatas = records["metadatas"]
+        self._positions = {id_: idx for idx, id_ in enumerate(self._ids)}
+        self._matrix = np.load(self._embeddings_path, mmap_mode="r")
+
+    def _save(self, matrix: Optional[np.ndarray]):
+        Path(self.directory).mkdir(parents=True, exist_ok=True)
+        if matrix is None or not len(self._ids):
+            for path in (self._embeddings_path, self._records_path):
+                if path.exists():
+                    path.unlink()
+            self._matrix = None
+            return
+
+        # Write to temp files and swap in, so a crash never leaves a torn index
+        tmp_embeddings = self._embeddings_path.with_suffix(".tmp.npy")
+        np.save(tmp_embeddings, np.ascontiguousarray(matrix, dtype=np.float32))
+        tmp_records = self._records_path.with_suffix(".tmp")
+        with open(tmp_records, "w", encoding="utf-8") as f:
+            json.dump(
+                {"ids": self._ids, "documents": self._documents, "metadatas": self._metadatas}, f
+            )
+        os.replace(tmp_embeddings, self._embeddings_path)
+        os.replace(tmp_records, self._records_path)
+        self._matrix = np.load(self._embeddings_path, mmap_mode="r")
+
+    @staticmethod
+    def _normalize(vectors: np.ndarray) -> np.ndarray:
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def count(self) -> int:
+        return len(self._ids)
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        vectors = self._normalize(np.asarray(embeddings, dtype=np.float32))
+        with self._lock:
+            matrix = (
+                np.array(self._matrix)
+                if self._matrix is not None
+                else np.empty((0, vectors.shape[1]), dtype=np.float32)
+            )
+            new_rows = []
+            for id_, vector, document, metadata in zip(ids, vectors, documents, metadatas):
+                position = self._positions.get(id_)
+                if position is not None:
+                    matrix[position] = vector
+                    self._documents[position] = document
+                    self._metadatas[position] = metadata
+                    continue
+                self._positions[id_] = len(self._ids)
+                self._ids.append(id_)
+                self._documents.append(document)
+                self._metadatas.append(metadata)
+                new_rows.append(vector)
+            if new_rows:
+                matrix = np.vstack([matrix, np.stack(new_rows)])
+            self._save(matrix)
+
+    def delete(self, ids):
+        with self._lock:
+            drop = {self._positions[id_] for id_ in ids if id_ in self._positions}
+            if not drop:
+                return
+            keep = [idx for idx in range(len(self._ids)) if idx not in drop]
+            matrix = np.array(self._matrix[keep]) if keep else None
+            self._ids = [self._ids[idx] for idx in keep]
+            self._documents = [self._documents[idx] for idx in keep]
+            self._metadatas = [self._metadatas[idx] for idx in keep]
+            self._positions = {id_: idx for idx, id_ in enumerate(self._ids)}
+            self._save(matrix)
+
+    def query(self, query_embeddings, n_results):
+        with self._lock:
+            matrix, ids = self._matrix, self._ids
+            documents, metadatas = self._documents, self._metadatas
+        if matrix is None or not len(query_embeddings):
+            return [[] for _ in query_embeddings]
+
+        queries = self._normalize(np.asarray(query_embeddings, dtype=np.float32))
+        scores = queries @ matrix.T  # (queries, chunks) cosine similarities
+        k = min(n_results, scores.shape[1])
+        if k <= 0:
+            return [[] for _ in query_embeddings]
+
+        # argpartition finds the top k in O(n); only those k are fully sorted
+        top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        results = []
+        for row, candidates in enumerate(top):
+            ordered = candidates[np.argsort(-scores[row, candidates])]
+            results.append(
+                [
+                    {
+                        "id": ids[idx],
+                        "document": documents[idx],
+                        "metadata": metadatas[idx],
+                        "distance": float(1 - scores[row, idx]),
+                    }
+                    for idx in ordered
+                ]
+            )
+        return results
+
+    def get_all(self):
+        with self._lock:
+            return list(self._ids), list(self._documents), list(self._metadatas)
+
+    def reset(self):
+        with self._lock:
+            self._ids, self._documents, self._metadatas = [], [], []
+            self._positions = {}
+            self._save(None)
+
+
+def create_vector_store(backend: Optional[str] = None) -> VectorStore:
+    """Build the vector store selected by VECTOR_STORE_BACKEND ("chroma" or "numpy")."""
+    backend = (backend or settings.VECTOR_STORE_BACKEND).lower()
+    if backend == "chroma":
+        return ChromaVectorStore(settings.CHROMA_PERSIST_DIRECTORY)
+    if backend == "numpy":
+        return NumpyVectorStore(settings.NUMPY_INDEX_DIRECTORY)
+    raise ValueError(f"Unknown VECTOR_STORE_BACKEND: {backend}")
@@ -0,0 +1,154 @@
+import asyncio
+import time
+from collections import deque
+from typing import Any, Callable, Dict, Optional
+
+from app.core.config import settings
+
+
+class QueueFullError(Exception):
+    """Raised when the ticket queue cannot accept more work."""
+
+
+class TicketWorkerPool:
+    """Bounded queue plus a fixed pool of workers that process tickets off the event loop."""
+
+    def __init__(self, num_workers: int, max_queue_size: int):
+        self.num_workers = num_workers
+        self.max_queue_size = max_queue_size
+        self.handler: Optional[Callable[[int], Any]] = None
+
+        self._queue: Optional[asyncio.Queue] = None
+        self._workers: list[asyncio.Task] = []
+        self._done_events: Dict[int, asyncio.Event] = {}
+
+        # Backpressure metrics
+        self._in_flight = 0
+        self._processed = 0
+        self._failed = 0
+        self._rejected = 0
+        self._wait_times_ms: deque = deque(maxlen=1000)
+        self._run_times_ms: deque = deque(maxlen=1000)
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self, handler: Callable[[int], Any]):
+        """Start the workers. `handler` is called with a ticket ID for each queued ticket."""
+        if self.running:
+            return
+        self.handler = handler
+        self._queue = asyncio.Queue(maxsize=self.max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._worker(), name=f"ticket-worker-{i}")
+            for i in range(self.num_workers)
+        ]
+
+    async def stop(self):
+        """Cancel the workers. Tickets still queued stay in their persisted state."""
+        for worker in self._workers:
+            worker.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+
+    def enqueue(self, ticket_id: int):
+        """Queue a ticket for processing without blocking."""
+        if not self.running:
+            raise QueueFullError("Ticket worker pool is not running")
+        try:
+            self._queue.put_nowait((ticket_id, time.monotonic()))
+        except asyncio.QueueFull:
+            self._rejected += 1
+            raise QueueFullError("Ticket queue is full")
+        self._done_events.setdefault(ticket_id, asyncio.Event())
+
+    async def enqueue_wait(self, ticket_id: int):
+        """Queue a ticket, waiting for room in the queue. For backlogs, not requests."""
+        if not self.running:
+            raise QueueFullError("Ticket worker pool is not running")
+        if self.is_pending(ticket_id):
+            return
+        self._done_events[ticket_id] = asyncio.Event()
+        await self._queue.put((ticket_id, time.monotonic()))
+
+    def is_full(self) -> bool:
+        return self.running and self._queue.full()
+
+    def is_pending(self, ticket_id: int) -> bool:
+        """Whether a ticket is queued or currently being processed."""
+        return ticket_id in self._done_events
+
+    async def wait_for(self, ticket_id: int, timeout: float) -> bool:
+        """Wait until a queued ticket finishes. Returns False on timeout."""
+        event = self._done_events.get(ticket_id)
+        if event is None:
+            return True
+        try:
+            await asyncio.wait_for(event.wait(), timeout=timeout)
+            return True
+        except asyncio.TimeoutError:
+            return False
+
+    async def _worker(self):
+        while True:
+            ticket_id, enqueued_at = await self._queue.get()
+            started_at = time.monotonic()
+            self._wait_times_ms.append((started_at - enqueued_at) * 1000)
+            self._in_flight += 1
+            try:
+                if asyncio.iscoroutinefunction(self.handler):
+                    await self.handler(ticket_id)
+                else:
+                    # Sync handlers run in a thread so the event loop stays responsive
+                    await asyncio.to_thread(self.handler, ticket_id)
+                self._processed += 1
+            except Exception as e:
+                self._failed += 1
+                print(f"✗ Ticket {ticket_id} processing failed: {e}")
+            finally:
+                self._in_flight -= 1
+                self._run_times_ms.append((time.monotonic() - started_at) * 1000)
+                event = self._done_events.pop(ticket_id, None)
+                if event:
+                    event.set()
+                self._queue.task_done()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Snapshot of queue depth, wait times and throughput counters."""
+        wait_times = sorted(self._wait_times_ms)
+        run_times = sorted(self._run_times_ms)
+
+        def percentile(values, pct):
+            if not values:
+                return 0.0
+            return round(values[min(len(values) - 1, int(len(values) * pct))], 2)
+
+        return {
+            "running": self.running,
+            "workers": self.num_workers,
+            "queue_depth": self._queue.qsize() if self._queue else 0,
+            "queue_capacity": self.max_queue_size,
+            "in_flight": self._in_flight,
+            "processed": self._processed,
+            "failed": self._failed,
+            "rejected": self._rejected,
+            "wait_time_ms": {
+                "avg": round(sum(wait_times) / len(wait_times), 2) if wait_times else 0.0,
+                "p50": percentile(wait_times, 0.5),
+                "p95": percentile(wait_times, 0.95),
+                "max": round(wait_times[-1], 2) if wait_times else 0.0,
+            },
+            "run_time_ms": {
+                "avg": round(sum(run_times) / len(run_times), 2) if run_times else 0.0,
+                "p95": percentile(run_times, 0.95),
+            },
+        }
+
+
+# Global instance
+ticket_worker_pool = TicketWorkerPool(
+    num_workers=settings.TICKET_WORKERS,
+    max_queue_size=settings.TICKET_QUEUE_MAX_SIZE,
+)
@@ -0,0 +1 @@
+# Performance benchmarks (run from backend/, e.g. python -m benchmarks.bench_async_client)
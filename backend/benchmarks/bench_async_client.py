@@ -0,0 +1,81 @@
+"""
+Tickets in flight: sync workflow on a thread pool vs async workflow on one event loop.
+
+Runs against the local chat-completions stub, so it measures orchestration overhead and
+concurrency rather than model quality.
+
+    python -m benchmarks.bench_async_client --tickets 50 --latency-ms 500
+"""
+
+import argparse
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_openai_server import serve
+
+
+def make_state(i: int) -> dict:
+    return {
+        "ticket_id": i,
+        "customer_email": f"customer{i}@example.com",
+        "customer_name": f"Customer {i}",
+        "subject": "Where is my order?",
+        "message": "I ordered a keyboard last week and it has not arrived yet.",
+        "order_id": None,
+        "triage": None,
+        "research": None,
+        "policy_check": None,
+        "response": None,
+        "escalation": None,
+        "final_response": None,
+        "requires_human": False,
+        "overall_confidence": 0.0,
+        "_traces": [],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=50)
+    parser.add_argument("--latency-ms", type=int, default=500)
+    parser.add_argument("--threads", type=int, default=4, help="Sync worker threads")
+    parser.add_argument("--port", type=int, default=9000)
+    args = parser.parse_args()
+
+    server = serve(args.port, args.latency_ms)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{args.port}/v1"
+    os.environ.setdefault("OPENAI_API_KEY", "stub")
+
+    # Import after the environment points at the stub
+    from app.agents.workflow import support_workflow, async_support_workflow
+    from app.services.knowledge_base import kb
+
+    kb.load_documents("../knowledge_base")
+    states = [make_state(i) for i in range(args.tickets)]
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        list(pool.map(support_workflow.invoke, states))
+    sync_elapsed = time.perf_counter() - start
+
+    async def run_async():
+        await asyncio.gather(*(async_support_workflow.ainvoke(s) for s in states))
+
+    start = time.perf_counter()
+    asyncio.run(run_async())
+    async_elapsed = time.perf_counter() - start
+
+    print(f"{args.tickets} tickets, {args.latency_ms}ms stub latency per LLM call")
+    print(f"  sync  ({args.threads} threads): {sync_elapsed:7.2f}s "
+          f"({args.tickets / sync_elapsed:6.2f} tickets/s)")
+    print(f"  async (1 event loop):  {async_elapsed:7.2f}s "
+          f"({args.tickets / async_elapsed:6.2f} tickets/s)")
+    server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,89 @@
+"""
+Per-ticket knowledge base retrieval latency, as issued by the research agent.
+
+Compares the old path (one embed_query + index query per query) with search_many
+(one batched embedding pass + one index query), cold and with the query cache warm.
+
+    python -m benchmarks.bench_retrieval --tickets 200
+"""
+
+import argparse
+import random
+import statistics
+import time
+
+SUBJECTS = [
+    "Where is my order?",
+    "I want a refund",
+    "Package arrived damaged",
+    "How do I reset my password?",
+    "Warranty claim for my keyboard",
+    "Can I change my shipping address?",
+    "Refund not received yet",
+    "Account locked after too many attempts",
+]
+INTENTS = [
+    "shipping_inquiry",
+    "refund_request",
+    "product_question",
+    "account_issue",
+    "warranty_claim",
+]
+
+
+def ticket_queries(rng: random.Random) -> list[str]:
+    intent = rng.choice(INTENTS)
+    return [rng.choice(SUBJECTS), intent.replace("_", " ")]
+
+
+def summarize(label: str, samples: list[float]):
+    samples = sorted(samples)
+    p95 = samples[int(len(samples) * 0.95) - 1]
+    print(f"  {label:<28} mean {statistics.mean(samples):7.2f}ms   p95 {p95:7.2f}ms")
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=200)
+    parser.add_argument("--kb-dir", default="../knowledge_base")
+    args = parser.parse_args()
+
+    from app.services.knowledge_base import kb
+
+    kb.load_documents(args.kb_dir)
+    rng = random.Random(42)
+    tickets = [ticket_queries(rng) for _ in range(args.tickets)]
+
+    def per_query(queries):
+        for query in queries:
+            embedding = kb.embeddings.embed_query(query)
+            kb.store.query([embedding], n_results=2)
+
+    def batched(queries):
+        kb.search_many(queries, n_results=2)
+
+    def clear_cache():
+        kb._query_cache.clear()
+
+    results = {}
+    for label, fn, cold in [
+        ("per-query (before)", per_query, True),
+        ("search_many, cold cache", batched, True),
+        ("search_many, warm cache", batched, False),
+    ]:
+        samples = []
+        for queries in tickets:
+            if cold:
+                clear_cache()
+            start = time.perf_counter()
+            fn(queries)
+            samples.append((time.perf_counter() - start) * 1000)
+        results[label] = samples
+
+    print(f"Retrieval latency per ticket ({args.tickets} tickets, 2 queries each)")
+    for label, samples in results.items():
+        summarize(label, samples)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+"""
+GET /api/tickets/search latency: the full-text index vs a LIKE scan.
+
+Fills a scratch database with synthetic tickets (varied text from a generated
+vocabulary, 1M by default; pass --tickets 3000000 for a few million), installs the
+search index and times rare, common, multi-word, prefix and filtered queries. The LIKE
+baseline is what client-side filtering amounts to and is only timed once per query.
+Tables are created and dropped, so only point --database-url at a scratch database.
+
+    python -m benchmarks.bench_search --tickets 1000000
+    python -m benchmarks.bench_search --database-url postgresql://localhost/bench
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, insert, or_, select, text
+
+from app.core.database import Base
+from app.models import Ticket, TicketStatus, TicketPriority
+from app.services.ticket_search import SEARCH_COLUMNS, install_search_index, ticket_search_query
+
+INSERT_BATCH = 10000
+VOCABULARY = 20000
+TOPICS = ["refund", "keyboard", "shipping", "invoice", "password", "warranty", "discount"]
+QUERIES = [
+    ("rare", "zyxwv", {}),
+    ("common", "refund", {}),
+    ("two words", "refund keyboard", {}),
+    ("prefix", "ship*", {}),
+    ("filtered", "warranty", {"status": TicketStatus.WAITING_HUMAN}),
+]
+
+
+def vocabulary(rng: random.Random) -> list:
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choices(letters, k=rng.randint(4, 9))) for _ in range(VOCABULARY)]
+
+
+def sentence(rng: random.Random, words: list, length: int) -> str:
+    # Zipf-like: a few words are very common, most are rare
+    picked = [words[int(rng.paretovariate(1.1)) % len(words)] for _ in range(length)]
+    picked[rng.randrange(length)] = rng.choice(TOPICS)
+    return " ".join(picked)
+
+
+def populate(engine, tickets: int, rng: random.Random):
+    words = vocabulary(rng)
+    words[VOCABULARY // 2] = "zyxwv"  # A rare term the queries look for
+    now = datetime.utcnow()
+    statuses = list(TicketStatus)
+    with engine.begin() as connection:
+        for offset in range(0, tickets, INSERT_BATCH):
+            rows = [
+                {
+                    "ticket_number": f"TKT-{i:08d}",
+                    "customer_email": f"customer{i % 50000}@example.com",
+                    "customer_name": "Customer",
+                    "subject": sentence(rng, words, 6),
+                    "message": sentence(rng, words, 60),
+                    "status": rng.choice(statuses),
+                    "priority": TicketPriority.MEDIUM,
+                    "ai_response": sentence(rng, words, 40),
+                    "response_approved": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i in range(offset, min(offset + INSERT_BATCH, tickets))
+            ]
+            connection.execute(insert(Ticket), rows)
+
+
+def timed(engine, query, repeats: int) -> float:
+    samples = []
+    with engine.connect() as connection:
+        for _ in range(repeats):
+            start = time.perf_counter()
+            connection.execute(query).all()
+            samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def like_query(term: str, filters: dict):
+    """Substring scan over every text column, the alternative without an index."""
+    pattern = f"%{term.rstrip('*').split()[0]}%"
+    query = select(Ticket.id).where(
+        or_(*(getattr(Ticket, name).like(pattern) for name in SEARCH_COLUMNS))
+    )
+    if filters.get("status"):
+        query = query.where(Ticket.status == filters["status"])
+    return query.limit(20)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{directory}/bench.db"
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        dialect = engine.dialect.name
+        try:
+            start = time.perf_counter()
+            populate(engine, args.tickets, rng)
+            print(f"Inserted {args.tickets} tickets in {time.perf_counter() - start:.1f}s")
+            start = time.perf_counter()
+            install_search_index(engine)
+            print(f"Built the search index in {time.perf_counter() - start:.1f}s")
+
+            print(f"\nTop 20 hits, median of {args.repeats} runs (ms)")
+            print(f"{'query':<10} {'terms':<16} {'index':>8} {'LIKE scan':>10}")
+            for label, terms, filters in QUERIES:
+                indexed = timed(
+                    engine, ticket_search_query(dialect, terms, **filters), args.repeats
+                )
+                scan = timed(engine, like_query(terms, filters), 1)
+                print(f"{label:<10} {terms:<16} {indexed:>8.2f} {scan:>10.2f}")
+        finally:
+            with engine.begin() as connection:
+                if dialect == "sqlite":
+                    connection.execute(text("DROP TABLE IF EXISTS tickets_fts"))
+            Base.metadata.drop_all(engine)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
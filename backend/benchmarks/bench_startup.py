@@ -0,0 +1,67 @@
+"""
+Cold start: time until the API answers its first request, and until it is ready.
+
+Starts uvicorn twice, once with the knowledge base warmed up before serving
+(KB_WARMUP_BLOCKING=true, the old behaviour) and once warming up in the background.
+
+    python -m benchmarks.bench_startup
+"""
+
+import argparse
+import os
+import subprocess
+import sys
+import time
+import urllib.error
+import urllib.request
+
+
+def wait_for(url: str, timeout: float, expect_ok: bool = True) -> float:
+    """Poll a URL until it answers (with 200 if expect_ok). Returns the time it happened."""
+    deadline = time.perf_counter() + timeout
+    while time.perf_counter() < deadline:
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return time.perf_counter()
+        except urllib.error.HTTPError:
+            if not expect_ok:
+                return time.perf_counter()
+        except (urllib.error.URLError, ConnectionError):
+            pass
+        time.sleep(0.02)
+    raise TimeoutError(f"{url} did not respond within {timeout}s")
+
+
+def measure(blocking: bool, port: int, timeout: float) -> tuple[float, float]:
+    env = {**os.environ, "KB_WARMUP_BLOCKING": str(blocking).lower()}
+    env.setdefault("OPENAI_API_KEY", "stub")
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port)],
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    try:
+        first_byte = wait_for(f"http://127.0.0.1:{port}/health/live", timeout) - start
+        ready = wait_for(f"http://127.0.0.1:{port}/health/ready", timeout) - start
+        return first_byte, ready
+    finally:
+        process.terminate()
+        process.wait()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--timeout", type=float, default=300)
+    args = parser.parse_args()
+
+    print("Cold start (seconds since process launch)")
+    for label, blocking in [("blocking warm-up", True), ("background warm-up", False)]:
+        first_byte, ready = measure(blocking, args.port, args.timeout)
+        print(f"  {label:<20} first byte {first_byte:6.2f}s   ready {ready:6.2f}s")
+
+
+if __name__ == "__main__":
+    main()
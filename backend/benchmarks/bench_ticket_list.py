@@ -0,0 +1,200 @@
+"""
+GET /api/tickets page latency at depth: the previous OFFSET query on single-column
+indexes vs OFFSET and keyset (cursor) pagination on the composite (..., created_at, id)
+indexes.
+
+Fills a scratch database with synthetic tickets (1M by default, several minutes and a
+few hundred MB on SQLite), then times the list query at increasing page depths for
+all tickets, a status filter and a customer filter, in the full and summary views.
+Tables are created and dropped, so only point --database-url at a scratch database.
+
+    python -m benchmarks.bench_ticket_list --tickets 1000000
+    python -m benchmarks.bench_ticket_list --database-url postgresql://localhost/bench
+"""
+
+import argparse
+import os
+import random
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import create_engine, insert, select, text
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Ticket, TicketStatus, TicketPriority
+from app.services.ticket_queries import encode_cursor, ticket_list_query
+
+INSERT_BATCH = 10000
+PAGE_SIZE = 50
+CUSTOMERS = 50000
+NEW_INDEXES = (
+    "ix_tickets_created_at_id",
+    "ix_tickets_status_created_at_id",
+    "ix_tickets_customer_email_created_at_id",
+)
+OLD_INDEXES = {
+    "ix_tickets_created_at": "created_at",
+    "ix_tickets_status": "status",
+    "ix_tickets_customer_email": "customer_email",
+}
+STATUS_WEIGHTS = {
+    TicketStatus.RESOLVED: 70,
+    TicketStatus.WAITING_HUMAN: 15,
+    TicketStatus.CLOSED: 10,
+    TicketStatus.IN_PROGRESS: 4,
+    TicketStatus.NEW: 1,
+}
+MESSAGE = "I ordered a mechanical keyboard two weeks ago and it still has not arrived. " * 4
+RESPONSE = "Thanks for reaching out! Your order shipped yesterday and should arrive soon. " * 4
+
+
+def populate(engine, tickets: int, rng: random.Random):
+    start = datetime.utcnow() - timedelta(days=365)
+    step = timedelta(days=365) / tickets
+    statuses = list(STATUS_WEIGHTS)
+    weights = list(STATUS_WEIGHTS.values())
+    with engine.begin() as connection:
+        for offset in range(0, tickets, INSERT_BATCH):
+            rows = []
+            for i in range(offset, min(offset + INSERT_BATCH, tickets)):
+                created_at = start + step * i
+                rows.append(
+                    {
+                        "ticket_number": f"TKT-{i:08d}",
+                        "customer_email": f"customer{rng.randrange(CUSTOMERS)}@example.com",
+                        "customer_name": "Customer",
+                        "subject": "Where is my order?",
+                        "message": MESSAGE,
+                        "status": rng.choices(statuses, weights)[0],
+                        "priority": TicketPriority.MEDIUM,
+                        "intent": "shipping_inquiry",
+                        "confidence": 0.9,
+                        "ai_response": RESPONSE,
+                        "final_response": RESPONSE,
+                        "response_approved": 1,
+                        "created_at": created_at,
+                        "updated_at": created_at,
+                    }
+                )
+            connection.execute(insert(Ticket), rows)
+
+
+def use_indexes(engine, old: bool):
+    """Switch between the previous single-column indexes and the composite ones."""
+    with engine.begin() as connection:
+        for name in NEW_INDEXES + tuple(OLD_INDEXES):
+            connection.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        if old:
+            for name, column in OLD_INDEXES.items():
+                connection.execute(text(f"CREATE INDEX {name} ON tickets ({column})"))
+        else:
+            for index in Ticket.__table__.indexes:
+                if index.name in NEW_INDEXES:
+                    index.create(connection)
+        connection.execute(text("ANALYZE"))
+
+
+def previous_query(filters: dict, skip: int):
+    """The list query before keyset pagination: created_at order with OFFSET."""
+    query = select(Ticket)
+    if filters.get("status"):
+        query = query.where(Ticket.status == filters["status"])
+    if filters.get("customer_email"):
+        query = query.where(Ticket.customer_email == filters["customer_email"])
+    return query.order_by(Ticket.created_at.desc()).offset(skip).limit(PAGE_SIZE)
+
+
+def timed(Session, query, repeats: int) -> float:
+    samples = []
+    for _ in range(repeats):
+        db = Session()
+        try:
+            start = time.perf_counter()
+            db.scalars(query).all()
+            samples.append((time.perf_counter() - start) * 1000)
+        finally:
+            db.close()
+    return statistics.median(samples)
+
+
+def cursor_at(Session, filters: dict, depth: int) -> Optional[str]:
+    """Cursor of the row just before page `depth` (not timed), None past the end."""
+    db = Session()
+    try:
+        query = ticket_list_query(**filters, skip=depth * PAGE_SIZE - 1, limit=1)
+        ticket = db.scalars(query).first()
+        return encode_cursor(ticket) if ticket else None
+    finally:
+        db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=1_000_000)
+    parser.add_argument("--depths", type=int, nargs="+", default=[0, 100, 1000, 2500])
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL"))
+    args = parser.parse_args()
+
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        url = args.database_url or f"sqlite:///{directory}/bench.db"
+        engine = create_engine(url)
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        Session = sessionmaker(bind=engine)
+        try:
+            start = time.perf_counter()
+            populate(engine, args.tickets, rng)
+            print(f"Inserted {args.tickets} tickets in {time.perf_counter() - start:.1f}s")
+
+            # (label, filters, depths): one customer has a single page of tickets
+            scenarios = [
+                ("all", {}, args.depths),
+                ("status", {"status": TicketStatus.WAITING_HUMAN}, args.depths),
+                ("customer", {"customer_email": "customer42@example.com"}, [0]),
+            ]
+            cases = []
+            for label, filters, depths in scenarios:
+                for depth in depths:
+                    cursor = cursor_at(Session, filters, depth) if depth else None
+                    if depth and cursor is None:
+                        continue  # Fewer matching tickets than this depth
+                    cases.append((label, filters, depth, cursor))
+
+            use_indexes(engine, old=True)
+            old = [
+                timed(Session, previous_query(filters, depth * PAGE_SIZE), args.repeats)
+                for _, filters, depth, _ in cases
+            ]
+            use_indexes(engine, old=False)
+
+            print(f"\nPage of {PAGE_SIZE}, median of {args.repeats} runs (ms)")
+            print(
+                f"{'filter':<9} {'page':>6}   {'before':>8} {'offset':>8} "
+                f"{'cursor':>8} {'cursor+summary':>15}"
+            )
+            for (label, filters, depth, cursor), before in zip(cases, old):
+                page = dict(filters, limit=PAGE_SIZE)
+                offset = timed(
+                    Session, ticket_list_query(**page, skip=depth * PAGE_SIZE), args.repeats
+                )
+                keyset = timed(Session, ticket_list_query(**page, cursor=cursor), args.repeats)
+                summary = timed(
+                    Session, ticket_list_query(**page, cursor=cursor, summary=True), args.repeats
+                )
+                print(
+                    f"{label:<9} {depth:>6}   {before:>8.2f} {offset:>8.2f} "
+                    f"{keyset:>8.2f} {summary:>15.2f}"
+                )
+        finally:
+            Base.metadata.drop_all(engine)
+            engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
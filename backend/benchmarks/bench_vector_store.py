@@ -0,0 +1,106 @@
+"""
+Vector store backends: ChromaDB (HNSW) vs the exact NumPy index.
+
+Uses synthetic normalized embeddings of the production dimension, so no model is
+loaded. Reports index build time, reopen time (cold start), batched query latency and
+resident memory growth, at several corpus sizes.
+
+    python -m benchmarks.bench_vector_store --sizes 1000 10000 100000
+"""
+
+import argparse
+import gc
+import os
+import statistics
+import tempfile
+import time
+
+import numpy as np
+
+from app.services.vector_store import ChromaVectorStore, NumpyVectorStore
+
+DIMENSION = 384  # all-MiniLM-L6-v2
+BATCH_SIZE = 5000  # Chroma rejects larger upserts
+
+
+def rss_mb() -> float:
+    """Current resident set size (Linux)."""
+    with open("/proc/self/statm") as f:
+        resident_pages = int(f.read().split()[1])
+    return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+
+
+def random_embeddings(rng: np.random.Generator, n: int) -> np.ndarray:
+    vectors = rng.standard_normal((n, DIMENSION)).astype(np.float32)
+    return vectors / np.linalg.norm(vectors, axis=1, keepdims=True)
+
+
+def build(store_cls, directory: str, embeddings: np.ndarray) -> float:
+    store = store_cls(directory)
+    start = time.perf_counter()
+    for offset in range(0, len(embeddings), BATCH_SIZE):
+        batch = embeddings[offset : offset + BATCH_SIZE]
+        ids = [f"chunk-{offset + i}" for i in range(len(batch))]
+        store.upsert(
+            ids,
+            batch.tolist(),
+            [f"document {id_}" for id_ in ids],
+            [{"source": f"article-{(offset + i) % 50}.md"} for i in range(len(batch))],
+        )
+    return (time.perf_counter() - start) * 1000
+
+
+def measure(store_cls, size: int, queries: int, rng: np.random.Generator) -> dict:
+    embeddings = random_embeddings(rng, size)
+    query_batches = [random_embeddings(rng, 2).tolist() for _ in range(queries)]
+
+    with tempfile.TemporaryDirectory() as directory:
+        build_ms = build(store_cls, directory, embeddings)
+        del embeddings
+        gc.collect()
+
+        rss_before = rss_mb()
+        start = time.perf_counter()
+        store = store_cls(directory)
+        store.count()
+        reopen_ms = (time.perf_counter() - start) * 1000
+
+        samples = []
+        for batch in query_batches:
+            start = time.perf_counter()
+            store.query(batch, n_results=2)
+            samples.append((time.perf_counter() - start) * 1000)
+        samples.sort()
+
+        return {
+            "build_ms": build_ms,
+            "reopen_ms": reopen_ms,
+            "query_mean_ms": statistics.mean(samples),
+            "query_p95_ms": samples[int(len(samples) * 0.95) - 1],
+            "rss_growth_mb": rss_mb() - rss_before,
+        }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    backends = [("numpy", NumpyVectorStore), ("chroma", ChromaVectorStore)]
+    print(f"Vector store comparison ({args.queries} batched queries of 2, dim {DIMENSION})")
+    for size in args.sizes:
+        print(f"\n{size} chunks")
+        for label, store_cls in backends:
+            result = measure(store_cls, size, args.queries, np.random.default_rng(42))
+            print(
+                f"  {label:<7} build {result['build_ms']:9.0f}ms   "
+                f"reopen {result['reopen_ms']:7.1f}ms   "
+                f"query mean {result['query_mean_ms']:6.2f}ms "
+                f"p95 {result['query_p95_ms']:6.2f}ms   "
+                f"rss +{result['rss_growth_mb']:.0f}MB"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,182 @@
+"""
+Database time per processed ticket: the old ORM write path vs one unit of work vs the
+trace write-behind buffer.
+
+Each ticket carries a typical set of agent traces. Reports wall time and SQL statements
+per ticket on a fresh SQLite file, and on Postgres when a URL is given. Tables are
+created and dropped, so only point it at a scratch database.
+
+    python -m benchmarks.bench_write_path --tickets 500
+    python -m benchmarks.bench_write_path --postgres-url postgresql://localhost/bench
+"""
+
+import argparse
+import os
+import statistics
+import tempfile
+import time
+from datetime import datetime
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from app.core.database import Base
+from app.models import Ticket, TicketStatus, AgentTrace
+from app.services.trace_writer import TraceWriteBuffer, insert_traces, trace_rows
+
+AGENTS = ["triage", "research", "policy", "response", "escalation"]
+
+
+def make_traces() -> list:
+    return [
+        {
+            "agent_name": agent,
+            "step_number": step,
+            "input_data": {"subject": "Where is my order?", "token_counts": {"prompt": 412}},
+            "output_data": {"intent": "order_status", "summary": "Order ships in 2 days" * 5},
+            "reasoning": "Customer asks about delivery time of a recent order",
+            "confidence": 0.9,
+            "tools_used": ["search_knowledge_base"],
+            "tool_results": {"search_knowledge_base": {"duration_ms": 12.5}},
+            "execution_time_ms": 850,
+            "tokens_used": 600,
+            "llm_time_ms": 800,
+            "prompt_tokens": 450,
+            "completion_tokens": 150,
+            "time_to_first_token_ms": None,
+            "retry_count": 0,
+        }
+        for step, agent in enumerate(AGENTS, start=1)
+    ]
+
+
+def new_ticket(i: int) -> Ticket:
+    return Ticket(
+        ticket_number=f"TKT-{i:07d}",
+        customer_email=f"customer{i}@example.com",
+        customer_name=f"Customer {i}",
+        subject="Where is my order?",
+        message="I ordered a keyboard last week and it has not arrived yet.",
+        status=TicketStatus.IN_PROGRESS,
+    )
+
+
+def resolve(ticket: Ticket):
+    ticket.intent = "order_status"
+    ticket.confidence = 0.9
+    ticket.ai_response = "Your order ships in two days."
+    ticket.final_response = ticket.ai_response
+    ticket.status = TicketStatus.RESOLVED
+    ticket.resolved_at = datetime.utcnow()
+    ticket.response_approved = 1
+
+
+def orm_path(Session, i: int, traces: list, buffer: TraceWriteBuffer):
+    """The previous create_ticket: commit + refresh, per-row ORM traces, commit + refresh."""
+    db = Session()
+    try:
+        ticket = new_ticket(i)
+        db.add(ticket)
+        db.commit()
+        db.refresh(ticket)
+        resolve(ticket)
+        for trace in traces:
+            db.add(AgentTrace(ticket_id=ticket.id, **trace))
+        db.commit()
+        db.refresh(ticket)
+    finally:
+        db.close()
+
+
+def unit_of_work(Session, i: int, traces: list, buffer: TraceWriteBuffer):
+    """Ticket insert with its results plus a multi-row trace insert, one commit."""
+    db = Session()
+    try:
+        ticket = new_ticket(i)
+        resolve(ticket)
+        db.add(ticket)
+        db.flush()
+        insert_traces(db, trace_rows(ticket.id, traces))
+        db.commit()
+    finally:
+        db.close()
+
+
+def write_behind(Session, i: int, traces: list, buffer: TraceWriteBuffer):
+    """Ticket insert only; traces are batched across tickets by the buffer."""
+    db = Session()
+    try:
+        ticket = new_ticket(i)
+        resolve(ticket)
+        db.add(ticket)
+        db.flush()
+        rows = trace_rows(ticket.id, traces)
+        db.commit()
+        buffer.add(rows)
+        if buffer.stats()["pending_rows"] >= buffer.max_rows:
+            buffer.flush()
+    finally:
+        db.close()
+
+
+def measure(url: str, strategy, tickets: int) -> dict:
+    engine = create_engine(url)
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine, autoflush=False)
+    buffer = TraceWriteBuffer(True, max_rows=500, flush_interval=1.0, session_factory=Session)
+    traces = make_traces()
+
+    statements = 0
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def count(*_):
+        nonlocal statements
+        statements += 1
+
+    try:
+        samples = []
+        start_all = time.perf_counter()
+        for i in range(tickets):
+            start = time.perf_counter()
+            strategy(Session, i, traces, buffer)
+            samples.append((time.perf_counter() - start) * 1000)
+        buffer.flush()  # Include the last partial batch in the total
+        total_ms = (time.perf_counter() - start_all) * 1000
+        samples.sort()
+        return {
+            "mean_ms": total_ms / tickets,
+            "p50_ms": statistics.median(samples),
+            "p95_ms": samples[int(len(samples) * 0.95) - 1],
+            "statements": statements / tickets,
+        }
+    finally:
+        Base.metadata.drop_all(engine)
+        engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--tickets", type=int, default=500)
+    parser.add_argument("--postgres-url", default=os.getenv("BENCH_POSTGRES_URL"))
+    args = parser.parse_args()
+
+    strategies = [("orm", orm_path), ("unit-of-work", unit_of_work), ("write-behind", write_behind)]
+    with tempfile.TemporaryDirectory() as directory:
+        databases = [("sqlite", f"sqlite:///{directory}/bench.db")]
+        if args.postgres_url:
+            databases.append(("postgres", args.postgres_url))
+
+        print(f"Write path per ticket ({args.tickets} tickets, {len(AGENTS)} traces each)")
+        for db_label, url in databases:
+            print(f"\n{db_label}")
+            for label, strategy in strategies:
+                result = measure(url, strategy, args.tickets)
+                print(
+                    f"  {label:<13} mean {result['mean_ms']:6.2f}ms   "
+                    f"p50 {result['p50_ms']:6.2f}ms   p95 {result['p95_ms']:6.2f}ms   "
+                    f"{result['statements']:.1f} statements"
+                )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Offline retrieval quality: recall@k, MRR and latency over a labeled query set.
+
+Each labeled query names the article it should hit and a phrase the retrieved chunk
+must contain. Compares vector-only, hybrid (BM25 + vector, RRF) and, with --rerank,
+hybrid plus cross-encoder reranking.
+
+    python -m benchmarks.eval_retrieval --k 1 3 5
+"""
+
+import argparse
+import json
+import statistics
+import time
+from pathlib import Path
+
+DEFAULT_QUERIES = Path(__file__).with_name("retrieval_queries.json")
+
+
+def is_relevant(article: dict, label: dict) -> bool:
+    return (
+        article["source"] == label["source"]
+        and label["contains"].lower() in article["content"].lower()
+    )
+
+
+def evaluate(kb, labels: list[dict], ks: list[int]) -> dict:
+    max_k = max(ks)
+    hits_at = {k: 0 for k in ks}
+    reciprocal_ranks = []
+    latencies = []
+
+    for label in labels:
+        # One query per call, as the research agent issues them; the embedding cache is
+        # cleared so latency includes encoding the query
+        kb._query_cache.clear()
+        start = time.perf_counter()
+        articles = kb.search(label["query"], n_results=max_k)
+        latencies.append((time.perf_counter() - start) * 1000)
+
+        rank = next(
+            (i for i, article in enumerate(articles, start=1) if is_relevant(article, label)),
+            None,
+        )
+        reciprocal_ranks.append(1 / rank if rank else 0.0)
+        for k in ks:
+            if rank and rank <= k:
+                hits_at[k] += 1
+
+    latencies.sort()
+    return {
+        "recall": {k: hits / len(labels) for k, hits in hits_at.items()},
+        "mrr": statistics.mean(reciprocal_ranks),
+        "latency_mean_ms": statistics.mean(latencies),
+        "latency_p95_ms": latencies[max(int(len(latencies) * 0.95) - 1, 0)],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--queries", default=str(DEFAULT_QUERIES))
+    parser.add_argument("--kb-dir", default="../knowledge_base")
+    parser.add_argument("--k", type=int, nargs="+", default=[1, 3, 5])
+    parser.add_argument("--rerank", action="store_true", help="Also evaluate the reranker")
+    args = parser.parse_args()
+
+    from app.core.config import settings
+    from app.services.knowledge_base import kb
+
+    with open(args.queries, "r", encoding="utf-8") as f:
+        labels = json.load(f)
+
+    kb.load_documents(args.kb_dir)
+
+    modes = [("vector", False, False), ("hybrid", True, False)]
+    if args.rerank:
+        modes.append(("hybrid + rerank", True, True))
+
+    print(f"Retrieval quality over {len(labels)} labeled queries")
+    for label, hybrid, rerank in modes:
+        settings.KB_HYBRID_SEARCH = hybrid
+        settings.KB_RERANK = rerank
+        kb.search(labels[0]["query"], n_results=1)  # Load models/indexes outside the timing
+        result = evaluate(kb, labels, args.k)
+        recall = "   ".join(f"R@{k} {value:.2f}" for k, value in result["recall"].items())
+        print(
+            f"  {label:<16} {recall}   MRR {result['mrr']:.3f}   "
+            f"latency mean {result['latency_mean_ms']:6.2f}ms "
+            f"p95 {result['latency_p95_ms']:6.2f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
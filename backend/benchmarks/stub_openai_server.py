@@ -0,0 +1,173 @@
+"""
+Local stub of the OpenAI chat completions endpoint.
+
+Answers structured-output (tool/function calling) requests with arguments generated from
+the request's JSON schema after a configurable delay, so the agent workflow can be
+exercised, tested and benchmarked without network access or API cost. Requests with
+"stream": true get the same answer as server-sent chunks.
+
+    python -m benchmarks.stub_openai_server --port 9000 --latency-ms 800
+    OPENAI_BASE_URL=http://localhost:9000/v1 OPENAI_API_KEY=stub uvicorn app.main:app
+"""
+
+import argparse
+import json
+import re
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+# Pieces a streamed answer is split into
+STREAM_CHUNKS = 4
+
+
+def example_from_schema(schema: Dict[str, Any], defs: Dict[str, Any]) -> Any:
+    """Build a value that validates against a (pydantic-generated) JSON schema."""
+    if "$ref" in schema:
+        return example_from_schema(defs[schema["$ref"].split("/")[-1]], defs)
+    for combinator in ("allOf", "anyOf", "oneOf"):
+        if combinator in schema:
+            options = [s for s in schema[combinator] if s.get("type") != "null"]
+            return example_from_schema(options[0] if options else {}, defs)
+    if "default" in schema and schema["default"] is not None:
+        return schema["default"]
+    if "enum" in schema:
+        return schema["enum"][0]
+
+    schema_type = schema.get("type")
+    if schema_type == "object":
+        return {
+            name: example_from_schema(prop, defs)
+            for name, prop in schema.get("properties", {}).items()
+        }
+    if schema_type == "array":
+        return [example_from_schema(schema.get("items", {}), defs)]
+    if schema_type == "number":
+        return max(schema.get("minimum", 0.0), min(schema.get("maximum", 1.0), 0.9))
+    if schema_type == "integer":
+        return 1
+    if schema_type == "boolean":
+        return False
+    return "stub"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    latency_ms = 0
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        body = json.loads(self.rfile.read(length) or b"{}")
+        time.sleep(self.latency_ms / 1000)
+
+        message: Dict[str, Any] = {"role": "assistant", "content": None}
+        if body.get("tools"):
+            function = body["tools"][0]["function"]
+            parameters = function["parameters"]
+            arguments = example_from_schema(parameters, parameters.get("$defs", {}))
+            message["tool_calls"] = [
+                {
+                    "id": f"call_{uuid.uuid4().hex[:12]}",
+                    "type": "function",
+                    "function": {"name": function["name"], "arguments": json.dumps(arguments)},
+                }
+            ]
+        elif body.get("functions"):
+            function = body["functions"][0]
+            parameters = function["parameters"]
+            arguments = example_from_schema(parameters, parameters.get("$defs", {}))
+            message["function_call"] = {
+                "name": function["name"],
+                "arguments": json.dumps(arguments),
+            }
+        else:
+            message["content"] = "stub response"
+
+        if body.get("stream"):
+            self._stream(body, message)
+            return
+
+        payload = {
+            "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": body.get("model", "stub"),
+            "choices": [{"index": 0, "message": message, "finish_reason": "stop"}],
+            "usage": {"prompt_tokens": 100, "completion_tokens": 50, "total_tokens": 150},
+        }
+        data = json.dumps(payload).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def _stream(self, body: Dict[str, Any], message: Dict[str, Any]):
+        """Send a message as chat.completion.chunk events, its text in a few pieces."""
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+
+        def chunk(delta: Dict[str, Any], finish_reason: Optional[str] = None) -> bytes:
+            payload = {
+                "id": completion_id,
+                "object": "chat.completion.chunk",
+                "created": int(time.time()),
+                "model": body.get("model", "stub"),
+                "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+            }
+            return f"data: {json.dumps(payload)}\n\n".encode()
+
+        if message.get("tool_calls"):
+            call = message["tool_calls"][0]
+            text = call["function"]["arguments"]
+            first = {"tool_calls": [{**call, "index": 0, "function": {**call["function"]}}]}
+            first["tool_calls"][0]["function"]["arguments"] = ""
+
+            def delta(piece):
+                return {"tool_calls": [{"index": 0, "function": {"arguments": piece}}]}
+
+        elif message.get("function_call"):
+            text = message["function_call"]["arguments"]
+            first = {"function_call": {"name": message["function_call"]["name"], "arguments": ""}}
+
+            def delta(piece):
+                return {"function_call": {"arguments": piece}}
+
+        else:
+            text = message["content"]
+            first = {"content": ""}
+
+            def delta(piece):
+                return {"content": piece}
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.end_headers()
+        self.wfile.write(chunk({"role": "assistant", **first}))
+        # Split after commas only: instructor's partial JSON parser can't take a number
+        # or literal cut in half (real token boundaries don't do that either)
+        pieces = re.split(r"(?<=,)", text)
+        size = max(1, -(-len(pieces) // STREAM_CHUNKS))
+        for start in range(0, len(pieces), size):
+            self.wfile.write(chunk(delta("".join(pieces[start : start + size]))))
+        self.wfile.write(chunk({}, finish_reason="stop"))
+        self.wfile.write(b"data: [DONE]\n\n")
+        self.wfile.flush()
+
+
+def serve(port: int, latency_ms: int) -> ThreadingHTTPServer:
+    StubHandler.latency_ms = latency_ms
+    return ThreadingHTTPServer(("127.0.0.1", port), StubHandler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--port", type=int, default=9000)
+    parser.add_argument("--latency-ms", type=int, default=800)
+    args = parser.parse_args()
+
+    server = serve(args.port, args.latency_ms)
+    print(f"Stub OpenAI server on http://127.0.0.1:{args.port}/v1 ({args.latency_ms}ms latency)")
+    server.serve_forever()
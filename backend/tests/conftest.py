@@ -0,0 +1,104 @@
+"""
+Shared test setup.
+
+Settings are read when app modules are imported, so the environment is pointed at a
+scratch directory and at the local OpenAI stub (benchmarks/stub_openai_server.py) here,
+before any test module imports the app.
+"""
+
+import os
+import re
+import socket
+import tempfile
+import threading
+import zlib
+from typing import List
+
+import pytest
+
+SCRATCH = tempfile.mkdtemp(prefix="supportflow-tests-")
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+STUB_PORT = _free_port()
+
+os.environ.update(
+    {
+        "OPENAI_API_KEY": "stub",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{STUB_PORT}/v1",
+        "OPENAI_MAX_RETRIES": "1",
+        "OPENAI_RETRY_BACKOFF_SECONDS": "0",
+        "DATABASE_URL": f"sqlite:///{SCRATCH}/supportflow.db",
+        "VECTOR_STORE_BACKEND": "numpy",
+        "NUMPY_INDEX_DIRECTORY": f"{SCRATCH}/numpy_index",
+        "LLM_CACHE_BACKEND": "none",
+        "RESPONSE_CACHE_ENABLED": "false",
+        "INTENT_CLASSIFIER_ENABLED": "false",
+    }
+)
+
+KNOWLEDGE_BASE = os.path.join(os.path.dirname(__file__), "..", "..", "knowledge_base")
+EMBEDDING_DIMENSIONS = 256
+
+
+class HashEmbeddings:
+    """Deterministic bag-of-words vectors in place of the sentence-transformers model."""
+
+    def embed_query(self, text: str) -> List[float]:
+        vector = [0.0] * EMBEDDING_DIMENSIONS
+        vector[0] = 0.01  # Never all zeros
+        for word in re.findall(r"\w+", text.lower()):
+            vector[zlib.crc32(word.encode()) % EMBEDDING_DIMENSIONS] += 1.0
+        return vector
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self.embed_query(text) for text in texts]
+
+
+@pytest.fixture(scope="session")
+def stub_openai():
+    """The OpenAI stub server, answering instantly."""
+    from benchmarks.stub_openai_server import serve
+
+    server = serve(STUB_PORT, latency_ms=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{STUB_PORT}/v1"
+    server.shutdown()
+
+
+@pytest.fixture(scope="session")
+def knowledge_base():
+    """The knowledge base loaded from ../knowledge_base with hash embeddings."""
+    from app.services.knowledge_base import kb
+
+    kb._embeddings = HashEmbeddings()
+    kb.load_documents(KNOWLEDGE_BASE)
+    return kb
+
+
+@pytest.fixture(scope="session")
+def database():
+    """The scratch database with its tables and search index created, as at startup."""
+    from app.core.database import Base, engine
+    from app.services.ticket_search import install_search_index
+
+    Base.metadata.create_all(bind=engine)
+    install_search_index(engine)
+    return engine
+
+
+@pytest.fixture
+def api(database):
+    """HTTP client for the app, without running its startup (no KB warm-up or workers)."""
+    import httpx
+
+    from app.main import app
+
+    # In-process transport, nothing to close
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
@@ -0,0 +1,68 @@
+"""The async agent nodes and `ainvoke` against the local OpenAI stub."""
+
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents import agent_nodes
+from app.agents.workflow import async_support_workflow, failed_agent, support_workflow
+from app.models import Ticket
+from app.schemas.agent_output import TriageOutput
+from app.services.ticket_processor import build_initial_state, workflow_failed_values
+
+pytestmark = pytest.mark.usefixtures("stub_openai", "knowledge_base")
+
+
+def ticket_state(ticket_id: int, **fields) -> dict:
+    ticket = {
+        "customer_email": "ann@example.com",
+        "customer_name": "Ann Lee",
+        "subject": "Refund for a broken keyboard",
+        "message": "My keyboard arrived broken and I would like a refund.",
+        "order_id": "ORD-001",
+        **fields,
+    }
+    return build_initial_state(Ticket(id=ticket_id, **ticket))
+
+
+def agent_names(state: dict) -> list:
+    return [trace["agent_name"] for trace in state["_traces"]]
+
+
+@pytest.mark.asyncio
+async def test_async_triage_node_records_llm_usage():
+    update = await agent_nodes.atriage_agent(ticket_state(101))
+
+    assert isinstance(update["triage"], TriageOutput)
+    [trace] = update["_traces"]
+    assert trace["agent_name"] == "triage"
+    assert trace["prompt_tokens"] == 100  # Usage reported by the stub
+    assert trace["completion_tokens"] == 50
+    assert trace["retry_count"] == 0
+
+
+@pytest.mark.asyncio
+async def test_ainvoke_runs_the_same_agents_as_invoke():
+    async_state = await async_support_workflow.ainvoke(ticket_state(103))
+    sync_state = support_workflow.invoke(ticket_state(104))
+
+    assert agent_names(async_state) == agent_names(sync_state)
+    assert agent_names(async_state)[:2] == ["triage", "research"]
+    assert async_state["final_response"]
+    assert async_state["research"].relevant_articles
+
+
+@pytest.mark.asyncio
+async def test_failed_node_is_tagged_with_its_agent(monkeypatch):
+    async def create(**kwargs):
+        raise ValueError("malformed completion")
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(agent_nodes, "aclient", fake)
+
+    with pytest.raises(ValueError) as error:
+        await async_support_workflow.ainvoke(ticket_state(106))
+
+    assert failed_agent(error.value) == "triage"
+    metadata = workflow_failed_values(error.value)["ticket_metadata"]
+    assert metadata == {"error": "malformed completion", "failed_agent": "triage"}
@@ -0,0 +1,50 @@
+import pytest
+
+from app.services.bm25_index import BM25Index, reciprocal_rank_fusion, tokenize
+
+
+@pytest.fixture
+def index():
+    index = BM25Index()
+    index.add(
+        ["shipping", "rma", "refund"],
+        [
+            "Standard shipping takes 3-5 business days.",
+            "Request an RMA number before sending an item back.",
+            "Refunds are issued to the original payment method.",
+        ],
+        [{"source": "shipping.md"}, {"source": "returns.md"}, {"source": "refunds.md"}],
+    )
+    return index
+
+
+def test_tokenize_splits_codes_and_drops_stopwords():
+    assert tokenize("Where is my SKU-123 in_transit order?") == ["sku", "123", "transit", "order"]
+
+
+def test_exact_tokens_rank_their_chunk_first(index):
+    assert index.search("what is an RMA", 3)[0][0] == "rma"
+    assert index.search("the a of", 3) == []  # Stopwords only
+    assert index.search("warranty", 3) == []  # No shared term
+
+
+def test_replacing_and_removing_chunks_keeps_the_index_consistent(index):
+    index.add(["rma"], ["Warranty claims need a receipt."], [{"source": "warranty.md"}])
+    assert index.search("rma", 3) == []
+    assert index.search("warranty", 3)[0][0] == "rma"
+
+    index.remove(["rma", "missing"])
+    assert len(index) == 2
+    assert index.record("rma") is None
+    assert index.record("refund") == (
+        "Refunds are issued to the original payment method.",
+        {"source": "refunds.md"},
+    )
+
+
+def test_reciprocal_rank_fusion_rewards_agreement():
+    fused = reciprocal_rank_fusion([["a", "b", "c"], ["b", "a"]], k=60)
+
+    assert {id_ for id_, _ in fused[:2]} == {"a", "b"}
+    assert fused[-1][0] == "c"
+    assert reciprocal_rank_fusion([["a"], ["a"]], k=60) == [("a", 1.0)]
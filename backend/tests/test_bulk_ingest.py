@@ -0,0 +1,168 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from app.api import tickets as tickets_api
+from app.core.database import SessionLocal
+from app.models import Ticket, TicketStatus
+from app.schemas import TicketCreate
+from app.services import bulk_ingest
+from app.services.bulk_ingest import (
+    BulkPayloadError,
+    OfflineBatchRunner,
+    TokenBucket,
+    bulk_insert_tickets,
+    parse_bulk_payload,
+    process_bulk,
+)
+
+TICKET = (
+    '{"customer_email": "ann@example.com", "customer_name": "Ann Lee", '
+    '"subject": "Shipping", "message": "How long does shipping take?"}'
+)
+JSON = {"content-type": "application/json"}
+
+
+async def collect(results) -> list:
+    return [result async for result in results]
+
+
+def test_ndjson_lines_are_validated_one_by_one():
+    body = f"{TICKET}\nnot json\n\n{{}}\n{TICKET}\n".encode()
+
+    valid, errors = parse_bulk_payload(body, "application/x-ndjson; charset=utf-8")
+
+    assert [index for index, _ in valid] == [0, 3]
+    assert [(error["index"], error["status"]) for error in errors] == [
+        (1, "invalid"),
+        (2, "invalid"),
+    ]
+    assert errors[0]["error"].startswith("Invalid JSON")
+
+
+def test_json_arrays_are_accepted_and_other_bodies_rejected():
+    valid, errors = parse_bulk_payload(f"[{TICKET}, {TICKET}]".encode(), "application/json")
+    assert len(valid) == 2 and not errors
+
+    with pytest.raises(BulkPayloadError):
+        parse_bulk_payload(TICKET.encode(), "application/json")
+    with pytest.raises(BulkPayloadError):
+        parse_bulk_payload(b"[", "application/json")
+
+
+def test_bulk_insert_returns_ids_in_input_order(database):
+    tickets = [TicketCreate.model_validate_json(TICKET) for _ in range(3)]
+    db = SessionLocal()
+    try:
+        ids = bulk_insert_tickets(db, tickets, ["TKT-BULK-1", "TKT-BULK-2", "TKT-BULK-3"])
+        db.commit()
+        numbers = [db.get(Ticket, ticket_id).ticket_number for ticket_id in ids]
+        statuses = {db.get(Ticket, ticket_id).status for ticket_id in ids}
+    finally:
+        db.close()
+
+    assert numbers == ["TKT-BULK-1", "TKT-BULK-2", "TKT-BULK-3"]
+    assert statuses == {TicketStatus.NEW}
+
+
+@pytest.mark.asyncio
+async def test_a_fixed_set_of_workers_processes_every_ticket():
+    in_flight, peak = 0, 0
+
+    async def handler(ticket_id):
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        if ticket_id == 3:
+            raise RuntimeError("boom")
+        return None if ticket_id == 4 else {"status": "resolved"}
+
+    results = process_bulk([(i, i) for i in range(20)], handler, 3, tickets_per_second=0)
+    first = await results.__anext__()
+    workers = len(bulk_ingest._running_tasks)
+    rest = await collect(results)
+
+    assert workers == 3 and peak == 3
+    by_index = {result["index"]: result for result in [first, *rest]}
+    assert sorted(by_index) == list(range(20))
+    assert by_index[3]["status"] == "failed" and by_index[3]["error"] == "boom"
+    assert by_index[4]["status"] == "not_found"
+    assert by_index[5]["status"] == "resolved"
+
+
+@pytest.mark.asyncio
+async def test_token_bucket_limits_the_start_rate():
+    bucket = TokenBucket(rate=50, capacity=1)
+    start = time.monotonic()
+    for _ in range(6):
+        await bucket.acquire()
+
+    assert time.monotonic() - start >= 0.09  # 5 refills at 50/s
+
+
+@pytest.mark.asyncio
+async def test_offline_batches_report_batch_api_counts():
+    async def handler(ticket_id):
+        if ticket_id == 2:
+            raise RuntimeError("boom")
+        return {"status": "resolved"}
+
+    runner = OfflineBatchRunner(concurrency=2, tickets_per_second=0, max_jobs=10)
+    invalid = [{"index": 0, "status": "invalid", "error": "Invalid JSON"}]
+    job = runner.submit([(1, 1), (2, 2), (3, 3)], invalid, handler)
+    await asyncio.wait_for(job.task, timeout=1)
+
+    batch = runner.get(job.id).to_dict()
+    assert batch["status"] == "completed"
+    assert batch["request_counts"] == {"total": 4, "completed": 2, "failed": 2}
+    assert [result["index"] for result in batch["results"]] == [0, 1, 2, 3]
+
+
+async def resolve(ticket_id):
+    return {"status": "resolved"}
+
+
+@pytest.mark.asyncio
+async def test_bulk_endpoint_streams_one_result_per_item(api, monkeypatch):
+    monkeypatch.setattr(tickets_api, "run_ticket", resolve)
+    body = f"{TICKET}\nnot json\n{TICKET}\n"
+
+    response = await api.post(
+        "/api/tickets/bulk", content=body, headers={"content-type": "application/x-ndjson"}
+    )
+
+    assert response.status_code == 200
+    assert response.headers["x-tickets-accepted"] == "2"
+    assert response.headers["x-tickets-invalid"] == "1"
+    results = [json.loads(line) for line in response.text.splitlines()]
+    assert (results[0]["index"], results[0]["status"]) == (1, "invalid")  # Invalid first
+    by_index = {result["index"]: result for result in results[1:]}
+    assert sorted(by_index) == [0, 2]
+    db = SessionLocal()
+    try:
+        statuses = {db.get(Ticket, result["ticket_id"]).status for result in by_index.values()}
+    finally:
+        db.close()
+    assert statuses == {TicketStatus.NEW}  # run_ticket is stubbed out
+
+
+@pytest.mark.asyncio
+async def test_batch_endpoint_inserts_then_processes_in_the_background(api, monkeypatch):
+    runner = OfflineBatchRunner(concurrency=2, tickets_per_second=0, max_jobs=10)
+    monkeypatch.setattr(tickets_api, "offline_batches", runner)
+    monkeypatch.setattr(tickets_api, "run_ticket", resolve)
+
+    response = await api.post(
+        "/api/tickets/bulk/batches", content=f"[{TICKET}, {TICKET}]", headers=JSON
+    )
+
+    assert response.status_code == 202
+    batch_id = response.json()["id"]
+    await asyncio.wait_for(runner.get(batch_id).task, timeout=1)
+    batch = (await api.get(f"/api/tickets/bulk/batches/{batch_id}")).json()
+    assert batch["status"] == "completed"
+    assert batch["request_counts"] == {"total": 2, "completed": 2, "failed": 0}
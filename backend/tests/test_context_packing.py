@@ -0,0 +1,88 @@
+from app.agents.agent_nodes import _response_prompt, _triage_prompt
+from app.agents.context_packing import (
+    compact_order,
+    compact_refund_check,
+    count_tokens,
+    dedupe_articles,
+    pack_articles,
+    truncate_to_tokens,
+)
+from app.core.config import settings
+from app.schemas.agent_output import ResearchOutput
+
+LONG_TEXT = " ".join(f"word{i}" for i in range(2000))
+
+
+def article(source, content, score):
+    return {"source": source, "content": content, "relevance_score": score}
+
+
+def test_truncate_to_tokens_respects_the_budget():
+    cut = truncate_to_tokens(LONG_TEXT, 50)
+
+    assert cut.endswith("...")
+    assert count_tokens(cut) <= 52
+    assert truncate_to_tokens("short text", 50) == "short text"
+    assert truncate_to_tokens(LONG_TEXT, 0) == ""
+
+
+def test_dedupe_drops_repeats_of_the_same_source_only():
+    text = "Standard shipping takes three to five business days across the country."
+    articles = [
+        article("shipping.md", text, 0.9),
+        article("shipping.md", text, 0.8),
+        article("faq.md", text, 0.7),
+    ]
+
+    assert [a["source"] for a in dedupe_articles(articles)] == ["shipping.md", "faq.md"]
+
+
+def test_pack_articles_fills_the_budget_most_relevant_first():
+    articles = [
+        article("low.md", LONG_TEXT, 0.1),
+        article("high.md", "Returns are accepted within 30 days.", 0.9),
+    ]
+
+    packed, stats = pack_articles(articles, 100)
+
+    assert [a["source"] for a in packed] == ["high.md", "low.md"]
+    assert packed[1]["content"].endswith("...")
+    assert stats["context_tokens"] <= 100 + 2
+    assert stats["packed"] == 2 and stats["candidates"] == 2
+
+
+def test_compact_order_leaves_out_contact_details():
+    order = {
+        "order_id": "ORD-1",
+        "customer_email": "jane@example.com",
+        "status": "shipped",
+        "total": 59.0,
+        "order_date": "2024-01-05T10:00:00",
+        "items": [{"name": "Mug", "quantity": 2, "price": 12.0}],
+        "refund_eligible": True,
+    }
+
+    summary = compact_order(order)
+
+    assert "jane@example.com" not in summary
+    assert "ORD-1 | status=shipped | ordered=2024-01-05" in summary
+    assert "items=[Mug x2 $12.0]" in summary and "refund_eligible=yes" in summary
+    assert compact_order(None) == "No order provided"
+    assert compact_refund_check({"eligible": False, "reason": "Too late"}) == (
+        "eligible=no | reason=Too late"
+    )
+
+
+def test_prompts_cut_the_message_and_research_to_their_budgets():
+    state = {
+        "customer_name": "Jane",
+        "customer_email": "jane@example.com",
+        "subject": "Long story",
+        "message": LONG_TEXT,
+        "research": ResearchOutput(relevant_articles=[], summary=LONG_TEXT, confidence=0.9),
+    }
+    budgets = settings.CONTEXT_BUDGET_MESSAGE_TOKENS + settings.CONTEXT_BUDGET_RESPONSE_TOKENS
+
+    assert count_tokens(_triage_prompt(state)) < settings.CONTEXT_BUDGET_MESSAGE_TOKENS + 200
+    assert count_tokens(_response_prompt(state)) < budgets + 300
+    assert count_tokens(LONG_TEXT) > budgets + 300
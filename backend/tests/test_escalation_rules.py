@@ -0,0 +1,110 @@
+import time
+
+import pytest
+
+from app.agents.agent_nodes import _fast_path_result, no_llm_call
+from app.agents.escalation_rules import EscalationRuleEngine, EscalationRules, escalation_engine
+from app.models import TicketPriority
+from app.schemas.agent_output import (
+    EscalationDecision,
+    FastPathOutput,
+    PolicyCheckOutput,
+    ResponseOutput,
+    TriageOutput,
+)
+
+
+def state(intent="shipping_inquiry", priority=TicketPriority.MEDIUM, review=False, policy=None):
+    return {
+        "triage": TriageOutput(intent=intent, priority=priority, confidence=0.9, reasoning="test"),
+        "response": ResponseOutput(
+            response_text="Hi", confidence=0.9, requires_human_review=review
+        ),
+        "policy_check": policy,
+    }
+
+
+@pytest.fixture
+def engine():
+    return EscalationRuleEngine(EscalationRules(default_threshold=0.7))
+
+
+def test_strictest_threshold_wins(engine):
+    assert engine.threshold_for("shipping_inquiry", TicketPriority.LOW) == 0.7
+    assert engine.threshold_for("refund_request", TicketPriority.LOW) == 0.8
+    assert engine.threshold_for("shipping_inquiry", TicketPriority.HIGH) == 0.8
+
+
+@pytest.mark.parametrize(
+    "ticket, rule",
+    [
+        (state(priority=TicketPriority.URGENT), "Priority urgent always requires a human"),
+        (state(review=True), "Response agent flagged for human review"),
+        (
+            state(
+                policy=PolicyCheckOutput(
+                    is_eligible=True, reason="ok", refund_amount=450.0, confidence=0.9
+                )
+            ),
+            "Refund amount 450.00 exceeds auto-approval limit 200.00",
+        ),
+    ],
+)
+def test_hard_rules_escalate_regardless_of_confidence(engine, ticket, rule):
+    outcome = engine.evaluate(ticket, avg_confidence=0.99)
+
+    assert outcome.decision.should_escalate
+    assert rule in outcome.matched_rules
+    assert outcome.decision.recommended_specialist == "logistics"
+
+
+def test_confidence_decides_outside_the_ambiguity_margin(engine):
+    assert not engine.evaluate(state(), avg_confidence=0.9).decision.should_escalate
+    assert engine.evaluate(state(), avg_confidence=0.5).decision.should_escalate
+    assert engine.evaluate(state(), avg_confidence=0.72).decision is None  # Ask the LLM
+
+    assert engine.stats() == {
+        "evaluations": 3,
+        "rule_decisions": 2,
+        "llm_fallbacks": 1,
+        "rule_escalations": 1,
+        "fallback_rate_percent": 33.33,
+    }
+
+
+def test_unrecorded_evaluations_are_not_counted(engine):
+    outcome = engine.evaluate(state(), avg_confidence=0.72, record=False)
+    assert engine.stats()["evaluations"] == 0
+
+    engine.record(outcome)
+    assert engine.stats()["llm_fallbacks"] == 1
+
+
+def fast_path_output(confidence: float) -> FastPathOutput:
+    ticket = state()
+    ticket["triage"].confidence = confidence
+    return FastPathOutput(
+        triage=ticket["triage"],
+        research_summary="Shipping takes 3-5 days",
+        research_confidence=confidence,
+        response=ticket["response"],
+        escalation=EscalationDecision(should_escalate=False, reasons=[], overall_confidence=0.9),
+    )
+
+
+@pytest.mark.parametrize("confidence, counted", [(0.95, 1), (0.5, 0)])
+def test_fast_path_counts_only_accepted_answers(confidence, counted):
+    before = escalation_engine.stats()["evaluations"]
+    _fast_path_result(
+        {"subject": "Shipping times", "message": "How long does shipping take?"},
+        fast_path_output(confidence),
+        ["Shipping times"],
+        [],
+        no_llm_call(),
+        {},
+        {},
+        time.time(),
+    )
+
+    # A fallback re-runs the escalation agent, which records its own evaluation
+    assert escalation_engine.stats()["evaluations"] == before + counted
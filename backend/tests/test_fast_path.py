@@ -0,0 +1,136 @@
+import time
+
+import pytest
+
+from app.agents import agent_nodes
+from app.agents.agent_nodes import _fast_path_result, no_llm_call
+from app.agents.fast_path import FastPathStats, classify_ticket, fast_path_stats
+from app.agents.workflow import async_support_workflow
+from app.models import Ticket, TicketPriority
+from app.schemas.agent_output import (
+    EscalationDecision,
+    FastPathOutput,
+    ResponseOutput,
+    TriageOutput,
+)
+from app.services.ticket_processor import build_initial_state
+
+SHIPPING_QUESTION = {"subject": "Shipping times", "message": "How long does shipping take?"}
+
+
+def ticket_state(ticket_id: int) -> dict:
+    ticket = Ticket(
+        id=ticket_id,
+        customer_email="ann@example.com",
+        customer_name="Ann Lee",
+        order_id=None,
+        **SHIPPING_QUESTION,
+    )
+    return build_initial_state(ticket)
+
+
+def agent_names(state: dict) -> list:
+    return [trace["agent_name"] for trace in state["_traces"]]
+
+
+def fast_path_output(confidence=0.95, order_lookup=False) -> FastPathOutput:
+    return FastPathOutput(
+        triage=TriageOutput(
+            intent="shipping_inquiry",
+            priority=TicketPriority.LOW,
+            confidence=confidence,
+            reasoning="test",
+            requires_order_lookup=order_lookup,
+        ),
+        research_summary="Shipping takes 3-5 days",
+        research_confidence=0.95,
+        response=ResponseOutput(response_text="3-5 business days.", confidence=0.95),
+        escalation=EscalationDecision(should_escalate=False, reasons=[], overall_confidence=0.9),
+    )
+
+
+def run_fast_path(output: FastPathOutput) -> dict:
+    return _fast_path_result(
+        SHIPPING_QUESTION, output, ["Shipping times"], [], no_llm_call(), {}, {}, time.time()
+    )
+
+
+@pytest.mark.parametrize(
+    "ticket, reason",
+    [
+        ({**SHIPPING_QUESTION, "order_id": "ORD-1"}, "order_id provided"),
+        ({"subject": "Broken", "message": "My mug is broken"}, "complex wording: 'broken'"),
+        ({"subject": "Hi", "message": "Where is it!!!"}, "agitated tone"),
+    ],
+)
+def test_complex_tickets_take_the_full_graph(ticket, reason):
+    assert classify_ticket(SHIPPING_QUESTION) == (True, [])
+    simple, reasons = classify_ticket(ticket)
+    assert not simple and reasons == [reason]
+
+
+def test_accepted_answers_fill_every_output():
+    update = run_fast_path(fast_path_output())
+
+    assert update["final_response"] == "3-5 business days."
+    assert update["escalation"].should_escalate is False
+    assert "superseded" not in update["_traces"][0]["output_data"]
+
+
+@pytest.mark.parametrize(
+    "output, reason",
+    [
+        (fast_path_output(confidence=0.5), "low confidence"),
+        (fast_path_output(order_lookup=True), "order lookup needed"),
+    ],
+)
+def test_fallbacks_keep_only_a_superseded_trace(output, reason):
+    before = fast_path_stats.stats()["fallback_reasons"].get(reason, 0)
+
+    update = run_fast_path(output)
+
+    assert list(update) == ["_traces"]
+    [trace] = update["_traces"]
+    assert trace["output_data"]["superseded"] is True
+    assert trace["output_data"]["fallback_reason"] == reason
+    assert fast_path_stats.stats()["fallback_reasons"][reason] == before + 1
+
+
+def test_stats_report_hit_and_fallback_rates():
+    stats = FastPathStats()
+    stats.record_route(simple=True)
+    stats.record_route(simple=False)
+    for reason in (None, None, None, "low confidence"):
+        stats.record_answer(reason)
+
+    assert stats.stats() == {
+        "routed_fast_path": 1,
+        "routed_full_graph": 1,
+        "accepted": 3,
+        "fallbacks": 1,
+        "fallback_reasons": {"low confidence": 1},
+        "hit_rate_percent": 75.0,
+        "fallback_rate_percent": 25.0,
+    }
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("stub_openai", "knowledge_base")
+async def test_simple_questions_take_the_fast_path():
+    final_state = await async_support_workflow.ainvoke(ticket_state(105))
+
+    assert agent_names(final_state) == ["fast_path"]
+    assert final_state["final_response"]
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("stub_openai", "knowledge_base")
+async def test_fallback_reruns_the_full_graph_once(monkeypatch):
+    monkeypatch.setattr(agent_nodes.settings, "FAST_PATH_MIN_CONFIDENCE", 1.0)
+
+    final_state = await async_support_workflow.ainvoke(ticket_state(107))
+
+    names = agent_names(final_state)
+    assert names[0] == "fast_path" and names.count("triage") == 1
+    assert final_state["_traces"][0]["output_data"]["superseded"] is True
+    assert "superseded" not in final_state["_traces"][-1]["output_data"]
@@ -0,0 +1,98 @@
+import pytest
+
+from app.agents import agent_nodes
+from app.services import intent_classifier as intent_classifier_module
+from app.services.intent_classifier import ClassifierPrediction, IntentClassifier
+
+pytestmark = pytest.mark.usefixtures("knowledge_base")
+
+EXAMPLES = [
+    ("Where is my package, tracking shows nothing", "shipping_inquiry", "medium"),
+    ("Package tracking has not updated in days", "shipping_inquiry", "medium"),
+    ("When will my package arrive, tracking please", "shipping_inquiry", "medium"),
+    ("Reset my password, cannot log in to account", "account_issue", "high"),
+    ("Account locked after password reset", "account_issue", "high"),
+    ("Cannot log in, password reset email missing", "account_issue", "high"),
+]
+
+
+@pytest.fixture
+def classifier(tmp_path):
+    classifier = IntentClassifier(str(tmp_path / "classifier.npz"))
+    texts, intents, priorities = (list(column) for column in zip(*EXAMPLES))
+    assert classifier.train(texts, intents, priorities, min_examples=3)
+    return classifier
+
+
+def prediction(confidence: float) -> ClassifierPrediction:
+    return ClassifierPrediction(
+        intent="shipping_inquiry",
+        intent_confidence=confidence,
+        priority="medium",
+        priority_confidence=0.99,
+    )
+
+
+def test_predicts_the_nearest_intent_and_priority(classifier):
+    shipping = classifier.predict("Tracking", "Where is my package?")
+    account = classifier.predict("Login", "I need a password reset for my account")
+
+    assert (shipping.intent, shipping.priority) == ("shipping_inquiry", "medium")
+    assert (account.intent, account.priority) == ("account_issue", "high")
+    assert 0.5 < shipping.intent_confidence <= 1.0
+
+
+def test_labels_without_enough_examples_are_not_learned(tmp_path):
+    classifier = IntentClassifier(str(tmp_path / "classifier.npz"))
+
+    assert not classifier.train(["a", "b"], ["x", "y"], ["low", "low"], min_examples=2)
+    assert not classifier.is_trained
+    assert classifier.predict("subject", "message") is None
+
+
+def test_centroids_survive_save_and_load(classifier, monkeypatch):
+    classifier.save()
+    loaded = IntentClassifier(str(classifier.path))
+
+    assert loaded.load() and loaded.trained_on == len(EXAMPLES)
+    assert loaded.predict("Tracking", "Where is my package?").intent == "shipping_inquiry"
+
+    monkeypatch.setattr(intent_classifier_module.settings, "EMBEDDING_MODEL", "other-model")
+    assert not IntentClassifier(str(classifier.path)).load()
+
+
+def test_only_confident_unsampled_predictions_are_answered_locally(classifier, monkeypatch):
+    monkeypatch.setattr(intent_classifier_module.settings, "INTENT_CLASSIFIER_SHADOW_RATE", 0.0)
+    assert classifier.should_answer(prediction(0.99))
+    assert not classifier.should_answer(prediction(0.5))
+    assert not classifier.should_answer(None)
+
+    monkeypatch.setattr(intent_classifier_module.settings, "INTENT_CLASSIFIER_SHADOW_RATE", 1.0)
+    assert not classifier.should_answer(prediction(0.99))  # Shadowed: the LLM still answers
+
+
+def test_stats_track_agreement_with_the_llm(classifier):
+    classifier.record_local()
+    classifier.record_llm(prediction(0.5), "shipping_inquiry", "medium")
+    classifier.record_llm(prediction(0.5), "refund_request", "medium")
+
+    stats = classifier.stats()
+    assert (stats["local"], stats["llm"], stats["compared"]) == (1, 2, 2)
+    assert stats["intent_agreement_percent"] == 50.0
+    assert stats["priority_agreement_percent"] == 100.0
+    assert stats["agreement_by_intent"]["refund_request"] == {"compared": 1, "agreed": 0}
+
+
+def test_confident_classifier_answers_triage_without_the_llm(classifier, monkeypatch):
+    monkeypatch.setattr(agent_nodes, "intent_classifier", classifier)
+    monkeypatch.setattr(agent_nodes.settings, "INTENT_CLASSIFIER_ENABLED", True)
+    monkeypatch.setattr(agent_nodes.settings, "INTENT_CLASSIFIER_MIN_CONFIDENCE", 0.0)
+    monkeypatch.setattr(agent_nodes.settings, "INTENT_CLASSIFIER_SHADOW_RATE", 0.0)
+    state = {"subject": "Tracking", "message": "Where is my package?", "order_id": None}
+
+    update = agent_nodes.triage_agent(state)
+
+    [trace] = update["_traces"]
+    assert update["triage"].intent == "shipping_inquiry"
+    assert trace["input_data"]["decided_by"] == "classifier"
+    assert trace["tokens_used"] == 0
@@ -0,0 +1,192 @@
+import pytest
+
+from app.services.knowledge_base import KnowledgeBase
+from app.services.vector_store import NumpyVectorStore
+from tests.conftest import HashEmbeddings
+
+DOCUMENTS = {
+    "shipping.md": "# Shipping\n\nStandard shipping takes 3-5 business days.",
+    "returns.md": "# Returns\n\nItems can be returned within 30 days for a full refund.",
+}
+
+
+class CountingEmbeddings(HashEmbeddings):
+    """Hash embeddings that record every batch they are asked to embed."""
+
+    def __init__(self):
+        self.batches = []
+
+    def embed_documents(self, texts):
+        self.batches.append(list(texts))
+        return super().embed_documents(texts)
+
+
+def write_documents(directory, documents):
+    directory.mkdir(exist_ok=True)
+    for name, content in documents.items():
+        (directory / name).write_text(content, encoding="utf-8")
+
+
+@pytest.fixture
+def docs(tmp_path):
+    directory = tmp_path / "docs"
+    write_documents(directory, DOCUMENTS)
+    return directory
+
+
+@pytest.fixture
+def make_kb(tmp_path):
+    """Fresh knowledge bases over one NumPy index directory, as after a restart."""
+
+    def make():
+        kb = KnowledgeBase()
+        kb._embeddings = CountingEmbeddings()
+        kb._store = NumpyVectorStore(str(tmp_path / "index"))
+        return kb
+
+    return make
+
+
+def test_queries_are_embedded_in_one_batch_and_cached(make_kb, docs):
+    kb = make_kb()
+    kb.load_documents(str(docs))
+    kb._embeddings.batches.clear()
+
+    kb.embed_queries(["shipping", "refund", "shipping"])
+    kb.embed_queries(["refund", "warranty"])
+
+    assert kb._embeddings.batches == [["shipping", "refund"], ["warranty"]]
+
+
+def test_query_cache_evicts_least_recently_used(make_kb):
+    kb = make_kb()
+    kb._query_cache_size = 2
+    kb.embed_queries(["a", "b"])
+    kb.embed_queries(["a", "c"])  # "b" is now the least recently used
+
+    assert list(kb._query_cache) == ["a", "c"]
+
+
+def test_search_many_answers_each_query(make_kb, docs):
+    kb = make_kb()
+    kb.load_documents(str(docs))
+
+    shipping, returns = kb.search_many(["shipping business days", "returned refund"], 1)
+
+    assert shipping[0]["source"] == "shipping.md"
+    assert returns[0]["source"] == "returns.md"
+    assert kb.search("shipping business days", 1) == shipping
+
+
+def test_unchanged_documents_are_not_embedded_again(make_kb, docs):
+    first = make_kb().load_documents(str(docs))
+    restarted = make_kb()
+    second = restarted.load_documents(str(docs))
+
+    assert first["added"] > 0
+    assert second == {"added": 0, "kept": first["added"], "removed": 0}
+    assert restarted._embeddings.batches == []
+
+
+def test_edited_and_deleted_files_are_synced(make_kb, docs):
+    kb = make_kb()
+    kb.load_documents(str(docs))
+    version = kb.version
+
+    (docs / "shipping.md").write_text("# Shipping\n\nExpress shipping takes 1 day.")
+    (docs / "returns.md").unlink()
+    stats = kb.load_documents(str(docs))
+
+    assert stats == {"added": 1, "kept": 0, "removed": 2}
+    assert kb.store.count() == 1
+    assert kb.version > version
+    assert "Express" in kb.search("express shipping", 1)[0]["content"]
+
+
+def test_a_stale_manifest_rebuilds_the_index(make_kb, docs):
+    kb = make_kb()
+    kb.load_documents(str(docs))
+    kb.store.delete(kb.store.get_all()[0][:1])  # Changed behind the manifest's back
+
+    stats = make_kb().load_documents(str(docs))
+
+    assert stats["kept"] == 0 and stats["added"] == 2
+
+
+def test_nothing_is_loaded_until_warm_up():
+    kb = KnowledgeBase()
+
+    assert kb._embeddings is None and kb._store is None
+    assert not kb.is_ready
+
+
+def test_warm_up_reports_phases_and_sync_stats(make_kb, docs):
+    kb = make_kb()
+    kb.warm_up(str(docs))
+
+    status = kb.warmup_status()
+    assert kb.is_ready
+    assert status["stats"]["added"] == 2
+    assert {"loading_model", "opening_index", "indexing", "total"} <= set(status["timings_ms"])
+
+
+def test_failed_warm_up_is_reported(make_kb, docs, monkeypatch):
+    kb = make_kb()
+
+    def broken(directory):
+        raise OSError("disk full")
+
+    monkeypatch.setattr(kb, "load_documents", broken)
+    with pytest.raises(OSError):
+        kb.warm_up(str(docs))
+
+    assert not kb.is_ready
+    assert kb.warmup_status()["state"] == "failed"
+    assert kb.warmup_status()["error"] == "disk full"
+
+
+@pytest.mark.asyncio
+async def test_readiness_probe_waits_for_warm_up(make_kb, docs, monkeypatch):
+    from app import main
+
+    kb = make_kb()
+    monkeypatch.setattr(main, "kb", kb)
+    assert (await main.readiness_check()).status_code == 503
+
+    kb.warm_up(str(docs))
+    assert (await main.readiness_check())["status"] == "ready"
+
+
+def test_hybrid_search_finds_exact_tokens(make_kb, docs):
+    write_documents(docs, {"rma.md": "# RMA\n\nAsk support for an RMA number first."})
+    kb = make_kb()
+    kb.load_documents(str(docs))
+
+    assert kb.search("RMA", 1)[0]["source"] == "rma.md"
+
+
+class ReverseReranker:
+    """Scores later candidates higher, so reranking visibly reorders the fused list."""
+
+    def __init__(self):
+        self.pairs = []
+
+    def predict(self, pairs):
+        self.pairs.extend(pairs)
+        return list(range(len(pairs)))
+
+
+def test_rerank_scores_at_least_n_results_candidates(make_kb, docs, monkeypatch):
+    from app.services import knowledge_base as knowledge_base_module
+
+    monkeypatch.setattr(knowledge_base_module.settings, "KB_RERANK", True)
+    monkeypatch.setattr(knowledge_base_module.settings, "KB_RERANK_CANDIDATES", 1)
+    kb = make_kb()
+    kb._reranker = ReverseReranker()
+    kb.load_documents(str(docs))
+
+    results = kb.search("shipping returned refund", 2)
+
+    assert len(kb._reranker.pairs) == 2
+    assert len(results) == 2
+    assert results[0]["relevance_score"] > results[1]["relevance_score"]
@@ -0,0 +1,79 @@
+import pytest
+
+from app.agents import agent_nodes, llm_cache as llm_cache_module
+from app.agents.llm_cache import LLMCallCache, MemoryLLMCacheBackend, SQLiteLLMCacheBackend
+from app.schemas.agent_output import ResponseOutput, TriageOutput
+
+OUTPUT = ResponseOutput(response_text="Hi", confidence=0.9)
+
+
+def test_key_covers_model_prompt_schema_and_max_tokens():
+    cache = LLMCallCache(MemoryLLMCacheBackend(max_entries=10, ttl_seconds=0))
+    key = cache.key("gpt", "prompt", ResponseOutput, 500)
+
+    assert key == cache.key("gpt", "prompt", ResponseOutput, 500)
+    assert key != cache.key("gpt-mini", "prompt", ResponseOutput, 500)
+    assert key != cache.key("gpt", "prompt 2", ResponseOutput, 500)
+    assert key != cache.key("gpt", "prompt", TriageOutput, 500)
+    assert key != cache.key("gpt", "prompt", ResponseOutput, 800)
+
+
+def test_hits_misses_and_bypassed_agents():
+    cache = LLMCallCache(MemoryLLMCacheBackend(max_entries=10, ttl_seconds=0), ["response"])
+    key = cache.key("gpt", "prompt", ResponseOutput, 500)
+
+    assert cache.get("triage", key, ResponseOutput) is None
+    cache.set(key, OUTPUT, latency_ms=800)
+    assert cache.get("triage", key, ResponseOutput) == OUTPUT
+    assert not cache.enabled_for("response")
+
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["saved_latency_ms"]) == (1, 1, 800)
+
+
+def test_memory_backend_evicts_least_recently_used():
+    backend = MemoryLLMCacheBackend(max_entries=2, ttl_seconds=0)
+    backend.set("a", {"n": 1})
+    backend.set("b", {"n": 2})
+    backend.get("a")
+    backend.set("c", {"n": 3})
+
+    assert backend.get("b") is None
+    assert backend.get("a") == {"n": 1}
+    assert backend.size() == 2
+
+
+@pytest.mark.parametrize("backend_type", ["memory", "sqlite"])
+def test_entries_expire_after_the_ttl(backend_type, tmp_path, monkeypatch):
+    if backend_type == "memory":
+        backend = MemoryLLMCacheBackend(max_entries=10, ttl_seconds=60)
+    else:
+        backend = SQLiteLLMCacheBackend(str(tmp_path / "cache.db"), ttl_seconds=60)
+    now = 1_000_000.0
+    monkeypatch.setattr(llm_cache_module.time, "time", lambda: now)
+    backend.set("key", {"n": 1})
+
+    now += 59
+    assert backend.get("key") == {"n": 1}
+    now += 2
+    assert backend.get("key") is None
+    assert backend.size() == 0
+
+
+def test_sqlite_backend_survives_restarts(tmp_path):
+    path = str(tmp_path / "cache.db")
+    SQLiteLLMCacheBackend(path, ttl_seconds=0).set("key", {"n": 1})
+
+    assert SQLiteLLMCacheBackend(path, ttl_seconds=0).get("key") == {"n": 1}
+
+
+def test_identical_calls_are_answered_from_the_cache(stub_openai, monkeypatch):
+    cache = LLMCallCache(MemoryLLMCacheBackend(max_entries=10, ttl_seconds=60))
+    monkeypatch.setattr(agent_nodes, "llm_cache", cache)
+
+    first, first_call = agent_nodes.complete("triage", TriageOutput, "Classify: hi", 500)
+    second, second_call = agent_nodes.complete("triage", TriageOutput, "Classify: hi", 500)
+
+    assert second.model_dump() == first.model_dump()
+    assert first_call["llm_called"] and not first_call["cached"]
+    assert second_call["cached"] and not second_call["llm_called"]
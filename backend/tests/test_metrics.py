@@ -0,0 +1,90 @@
+import pytest
+
+from app.agents.agent_nodes import _call_stats, instrument, triage_agent
+from app.core import metrics
+from app.core.metrics import Counter, Histogram, MetricsRegistry
+
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("latency_seconds", "Latency", ["agent"], buckets=(0.1, 1))
+    histogram.observe(0.05, agent="triage")
+    histogram.observe(0.5, agent="triage")
+    histogram.observe(3, agent="triage")
+
+    assert histogram.render()[2:] == [
+        'latency_seconds_bucket{agent="triage",le="0.1"} 1',
+        'latency_seconds_bucket{agent="triage",le="1"} 2',
+        'latency_seconds_bucket{agent="triage",le="+Inf"} 3',
+        'latency_seconds_sum{agent="triage"} 3.55',
+        'latency_seconds_count{agent="triage"} 3',
+    ]
+
+
+def test_counter_escapes_label_values():
+    counter = Counter("runs_total", "Runs", ["agent"])
+    counter.inc(agent='say "hi"\n')
+    counter.inc(2, agent='say "hi"\n')
+
+    assert counter.render()[-1] == 'runs_total{agent="say \\"hi\\"\\n"} 3'
+
+
+def test_registry_renders_help_and_type_lines():
+    registry = MetricsRegistry()
+    registry.counter("a_total", "A").inc()
+
+    assert registry.render() == "# HELP a_total A\n# TYPE a_total counter\na_total 1\n"
+
+
+def llm_runs(agent, llm):
+    return metrics.agent_runs._values[(agent, llm)]
+
+
+def test_instrument_records_llm_calls_and_tools():
+    before = llm_runs("metrics_test", "called")
+    call = _call_stats(None, 0.25, 1)
+    call.update({"prompt_tokens": 100, "completion_tokens": 20, "llm_called": True})
+    trace = {"agent_name": "metrics_test", "execution_time_ms": 400}
+
+    instrument(trace, call, {"search_knowledge_base": {"duration_ms": 12.5}})
+
+    assert trace["tokens_used"] == 120 and trace["retry_count"] == 1
+    assert llm_runs("metrics_test", "called") == before + 1
+    assert metrics.llm_retries._values[("metrics_test",)] >= 1
+    rendered = metrics.registry.render()
+    assert 'supportflow_agent_llm_duration_seconds_count{agent="metrics_test"}' in rendered
+    assert 'supportflow_tool_duration_seconds_count{tool="search_knowledge_base"}' in rendered
+
+
+def test_instrument_labels_cached_calls():
+    before = llm_runs("metrics_test", "cached")
+    call = _call_stats(None, 0, 0, cached=True)
+
+    instrument({"agent_name": "metrics_test", "execution_time_ms": 1}, call)
+
+    assert llm_runs("metrics_test", "cached") == before + 1
+
+
+def test_agent_nodes_are_instrumented(stub_openai):
+    before = llm_runs("triage", "called")
+    state = {
+        "customer_name": "Jane",
+        "customer_email": "jane@example.com",
+        "subject": "Where is my order?",
+        "message": "It has not arrived yet.",
+        "order_id": None,
+    }
+
+    [trace] = triage_agent(state)["_traces"]
+
+    assert llm_runs("triage", "called") == before + 1
+    assert trace["prompt_tokens"] > 0 and trace["llm_time_ms"] >= 0
+
+
+@pytest.mark.asyncio
+async def test_metrics_endpoint_serves_the_text_format():
+    from app.main import metrics as metrics_endpoint
+
+    response = await metrics_endpoint()
+
+    assert response.media_type == "text/plain; version=0.0.4"
+    assert b"# TYPE supportflow_agent_runs_total counter" in response.body
@@ -0,0 +1,57 @@
+import random
+
+from app.services.quantile_sketch import ZERO, QuantileSketch
+
+
+def exact_quantile(values, q):
+    values = sorted(values)
+    return values[int(q * (len(values) - 1))]
+
+
+def test_quantiles_within_relative_accuracy():
+    rng = random.Random(0)
+    values = [rng.lognormvariate(6, 1) for _ in range(10000)]
+    sketch = QuantileSketch(relative_accuracy=0.02)
+    for value in values:
+        sketch.add(value)
+
+    for q in (0.5, 0.9, 0.99):
+        exact = exact_quantile(values, q)
+        assert abs(sketch.quantile(q) - exact) <= 0.02 * exact + 1e-9
+
+
+def test_merge_equals_adding_everything():
+    merged, combined = QuantileSketch(), QuantileSketch()
+    for part in ([1, 5, 20], [300, 4000]):
+        sketch = QuantileSketch()
+        for value in part:
+            sketch.add(value)
+            combined.add(value)
+        merged.merge(sketch)
+
+    assert merged.bins == combined.bins
+    assert merged.summary() == combined.summary()
+
+
+def test_zero_values_and_empty_sketch():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    assert sketch.summary() == {"p50": None, "p90": None, "p99": None}
+
+    sketch.add(0)
+    sketch.add(0)
+    sketch.add(100)
+    assert sketch.key(0) == ZERO
+    assert sketch.quantile(0.5) == 0.0
+    assert abs(sketch.quantile(1.0) - 100) <= 2
+
+
+def test_removed_values_are_not_counted():
+    # Deleted traces subtract from the bins; emptied bins must not skew quantiles
+    sketch = QuantileSketch()
+    for value in (10, 1000):
+        sketch.add(value)
+    sketch.add(1000, count=-1)
+
+    assert sketch.count == 1
+    assert abs(sketch.quantile(0.99) - 10) <= 0.2
@@ -0,0 +1,83 @@
+import pytest
+
+from app.services.response_cache import (
+    FIRST_NAME_PLACEHOLDER,
+    NAME_PLACEHOLDER,
+    SemanticResponseCache,
+    render_customer_name,
+    template_customer_name,
+)
+
+
+def test_full_name_before_first_name():
+    text = template_customer_name("Dear Ann Lee, thanks Ann.", "Ann Lee")
+    assert text == f"Dear {NAME_PLACEHOLDER}, thanks {FIRST_NAME_PLACEHOLDER}."
+
+
+def test_whole_words_only():
+    text = template_customer_name("Hi Al, we also shipped it. Al Smith", "Al Smith")
+    assert text == f"Hi {FIRST_NAME_PLACEHOLDER}, we also shipped it. {NAME_PLACEHOLDER}"
+    assert "Also" in template_customer_name("Also, Al", "Al")
+
+
+def test_initials_are_not_templated():
+    text = template_customer_name("I am sorry, A Jones. A refund is on its way.", "A Jones")
+    assert text == f"I am sorry, {NAME_PLACEHOLDER}. A refund is on its way."
+
+
+def test_names_with_regex_characters():
+    text = template_customer_name("Hello J.R. (Bob) Smith!", "J.R. (Bob) Smith")
+    assert text == f"Hello {NAME_PLACEHOLDER}!"
+
+
+def test_round_trip_to_another_customer():
+    cached = template_customer_name("Hi Ann, your refund for Ann Lee is approved.", "Ann Lee")
+    rendered = render_customer_name(cached, "Bob Stone")
+    assert rendered == "Hi Bob, your refund for Bob Stone is approved."
+
+
+def test_blank_names():
+    assert template_customer_name("Hi there", "") == "Hi there"
+    assert template_customer_name("Hi there", "   ") == "Hi there"
+    assert render_customer_name(f"Hi {FIRST_NAME_PLACEHOLDER}", "  ") == "Hi "
+
+
+OUTPUTS = {
+    "triage": {"intent": "shipping_inquiry"},
+    "research": {"summary": "Ships in 3-5 days"},
+    "response": {"response_text": "Hi Ann, it ships in 3-5 days.", "confidence": 0.9},
+}
+
+
+@pytest.fixture
+def cache(knowledge_base):
+    return SemanticResponseCache(max_entries=2, ttl_seconds=60, similarity_threshold=0.9)
+
+
+def test_near_duplicates_hit_with_the_name_templated(cache):
+    cache.store("Shipping time", "How long does shipping take?", "Ann Lee", OUTPUTS)
+
+    entry, similarity = cache.lookup("Shipping time", "How long does shipping take")
+    assert similarity >= 0.9
+    assert (
+        entry["response"]["response_text"] == f"Hi {FIRST_NAME_PLACEHOLDER}, it ships in 3-5 days."
+    )
+    assert cache.lookup("Password reset", "I cannot log in to my account") is None
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 1
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    for subject in ("Shipping time", "Password reset", "Gift cards"):
+        cache.store(subject, subject, "Ann", OUTPUTS)
+
+    assert cache.lookup("Shipping time", "Shipping time") is None
+    assert cache.lookup("Gift cards", "Gift cards") is not None
+    assert cache.stats()["evictions"] == 1
+
+
+def test_knowledge_base_reload_invalidates_entries(cache, knowledge_base, monkeypatch):
+    cache.store("Shipping time", "Shipping time", "Ann", OUTPUTS)
+    monkeypatch.setattr(knowledge_base, "version", knowledge_base.version + 1)
+
+    assert cache.lookup("Shipping time", "Shipping time") is None
+    assert cache.stats()["invalidations"] == 1
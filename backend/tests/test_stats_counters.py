@@ -0,0 +1,208 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, SessionLocal
+from app.models import StatsCounter, Ticket, TicketStatus
+from app.services.stats_counters import (
+    _upsert_statement,
+    agent_analytics,
+    apply_deltas,
+    hour_bucket,
+    rebuild,
+    summarize,
+    ticket_deltas,
+    ticket_snapshot,
+    trace_deltas,
+)
+from app.services.ticket_processor import insert_ticket_counted, update_ticket_counted
+from app.services.trace_writer import insert_traces, trace_rows
+
+NEW = {"status": "new", "priority": "medium", "intent": None, "confidence": None}
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(bind=engine)
+    with Session(engine) as session:
+        yield session
+    engine.dispose()
+
+
+def counters(db: Session) -> dict:
+    rows = db.execute(select(StatsCounter.bucket, StatsCounter.metric, StatsCounter.value))
+    return {(bucket, metric): value for bucket, metric, value in rows if value}
+
+
+def upsert_rows(statement) -> list:
+    """Multi-row VALUES parameters (bucket_m0, metric_m0, ...) as (bucket, metric, value)."""
+    rows = {}
+    for key, value in statement.compile().params.items():
+        name, _, index = key.rpartition("_m")
+        rows.setdefault(int(index), {})[name] = value
+    return [(row["bucket"], row["metric"], row["value"]) for _, row in sorted(rows.items())]
+
+
+def test_new_and_deleted_tickets():
+    new = ticket_deltas(None, ticket_snapshot(NEW))
+
+    assert new == {"tickets": 1, "status:new": 1, "priority:medium": 1}
+    assert ticket_deltas(ticket_snapshot(NEW), None) == {key: -1 for key in new}
+    assert ticket_deltas(ticket_snapshot(NEW), ticket_snapshot(NEW)) == {}
+    assert ticket_deltas(None, ticket_snapshot(NEW), count=250)["tickets"] == 250
+
+
+def test_update_moves_counts_between_buckets():
+    resolved = {**NEW, "status": "resolved", "intent": "refund_request", "confidence": 0.8}
+
+    assert ticket_deltas(ticket_snapshot(NEW), ticket_snapshot(resolved)) == {
+        "status:new": -1,
+        "status:resolved": 1,
+        "intent:refund_request": 1,
+        "confidence_sum": 0.8,
+        "confidence_count": 1,
+    }
+
+
+def test_upsert_rows_are_merged_and_sorted():
+    at = datetime(2024, 1, 15, 10, 30)
+    statement = _upsert_statement(
+        "sqlite", [(at, {"status:new": 1, "tickets": 1}), (at, {"status:new": 1})]
+    )
+
+    rows = upsert_rows(statement)
+    assert rows == sorted(rows)
+    assert ("total", "status:new", 2) in rows
+    assert ("2024-01-15T10", "status:new", 2) in rows
+    assert _upsert_statement("sqlite", [(at, {})]) is None
+
+
+def test_rebuild_matches_the_incremental_counters(db):
+    created_at = datetime.utcnow() - timedelta(hours=3)
+    ticket = Ticket(
+        ticket_number="TKT-COUNTERS-1",
+        customer_email="ann@example.com",
+        customer_name="Ann Lee",
+        subject="Shipping times",
+        message="How long does shipping take?",
+        status=TicketStatus.NEW,
+        created_at=created_at,
+    )
+    ticket_id = insert_ticket_counted(db, ticket, {})
+    db.commit()
+
+    # Processed hours after it was created
+    rows = trace_rows(ticket_id, [{"agent_name": "triage", "step_number": 1}])
+    values = {"status": TicketStatus.RESOLVED, "intent": "shipping_inquiry", "confidence": 0.8}
+    assert update_ticket_counted(db, ticket_id, values, rows)
+    insert_traces(db, rows)
+    db.commit()
+
+    incremental = counters(db)
+    created_hour, trace_hour = hour_bucket(created_at), hour_bucket(rows[0]["created_at"])
+    assert incremental[(created_hour, "status:resolved")] == 1
+    assert (created_hour, "status:new") not in incremental
+    assert incremental[(trace_hour, "agent_runs:triage")] == 1
+    assert (trace_hour, "status:resolved") not in incremental
+
+    rebuild(db)
+    assert counters(db) == incremental
+
+
+def test_upserts_need_a_supported_dialect():
+    hourly = [(datetime.utcnow(), {"tickets": 1})]
+
+    assert _upsert_statement("sqlite", hourly) is not None
+    with pytest.raises(ValueError, match="not supported on mysql"):
+        _upsert_statement("mysql", hourly)
+
+
+def test_summary_of_the_total_counters():
+    summary = summarize(
+        {
+            "tickets": 4,
+            "status:resolved": 3,
+            "status:waiting_human": 1,
+            "confidence_sum": 3.0,
+            "confidence_count": 4,
+            "intent:refund_request": 1,
+            "intent:shipping_inquiry": 3,
+        }
+    )
+
+    assert summary["total_tickets"] == 4
+    assert summary["average_confidence"] == 0.75
+    assert summary["escalation_rate_percent"] == 25.0
+    assert list(summary["top_intents"]) == ["shipping_inquiry", "refund_request"]
+
+
+def test_failed_agent_is_counted_from_ticket_metadata():
+    failed = {
+        **NEW,
+        "status": "waiting_human",
+        "ticket_metadata": {"error": "timeout", "failed_agent": "research"},
+    }
+
+    deltas = ticket_deltas(ticket_snapshot(NEW), ticket_snapshot(failed))
+    assert deltas["agent_failures:research"] == 1
+
+
+def test_trace_deltas_skip_and_retry():
+    traces = [
+        {"agent_name": "triage", "execution_time_ms": 800, "tokens_used": 150, "retry_count": 1},
+        {"agent_name": "policy", "execution_time_ms": 0, "output_data": {"skipped": True}},
+    ]
+
+    deltas = trace_deltas(traces)
+    assert deltas["agent_runs:triage"] == 1
+    assert deltas["agent_executed_time_ms:triage"] == 800
+    assert deltas["agent_retried:triage"] == 1
+    assert deltas["agent_tokens:triage"] == 150
+    assert deltas["agent_skipped:policy"] == 1
+    assert "agent_executed_time_ms:policy" not in deltas
+    assert trace_deltas(traces, sign=-1) == {key: -value for key, value in deltas.items()}
+
+
+def test_agent_analytics_rates_and_mean():
+    bucket = hour_bucket(datetime(2024, 1, 15, 10))
+    counters = {
+        **trace_deltas(
+            [
+                {"agent_name": "research", "execution_time_ms": 100, "tokens_used": 10},
+                {"agent_name": "research", "execution_time_ms": 300, "retry_count": 2},
+                {"agent_name": "research", "execution_time_ms": 0, "output_data": {"skipped": 1}},
+            ]
+        ),
+        "agent_failures:research": 2,
+    }
+
+    report = agent_analytics([(bucket, metric, value) for metric, value in counters.items()])
+    research = report["agents"]["research"]
+    assert research["runs"] == 3
+    assert research["skipped"] == 1
+    assert research["failures"] == 2
+    assert research["error_rate"] == 0.5  # 2 of 4 executed runs raised
+    assert research["retry_rate"] == 0.5  # 1 of 2 traced runs was retried
+    assert research["latency_ms"]["mean"] == 200.0  # Skipped runs don't dilute the mean
+
+
+@pytest.mark.asyncio
+async def test_agent_analytics_endpoint_reads_the_window(api):
+    traces = [{"agent_name": "analytics_probe", "execution_time_ms": ms} for ms in (100, 200)]
+    db = SessionLocal()
+    try:
+        apply_deltas(db, trace_deltas(traces))
+        apply_deltas(db, trace_deltas(traces[:1]), at=datetime.utcnow() - timedelta(days=2))
+        db.commit()
+    finally:
+        db.close()
+
+    hour = (await api.get("/api/stats/agents", params={"window": "hour"})).json()
+    week = (await api.get("/api/stats/agents", params={"window": "week"})).json()
+
+    assert hour["agents"]["analytics_probe"]["runs"] == 2
+    assert week["agents"]["analytics_probe"]["runs"] == 3
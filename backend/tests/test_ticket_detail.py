@@ -0,0 +1,92 @@
+import itertools
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models import Ticket, TicketStatus
+from app.services.trace_writer import insert_traces, trace_rows
+
+TICKET_NUMBERS = itertools.count(1)
+
+
+def create_ticket() -> tuple:
+    """A resolved ticket with two traces carrying input and output data: (id, number)."""
+    db = SessionLocal()
+    try:
+        ticket = Ticket(
+            ticket_number=f"TKT-DETAIL-{next(TICKET_NUMBERS)}",
+            customer_email="ann@example.com",
+            customer_name="Ann Lee",
+            subject="Shipping times",
+            message="How long does shipping take?",
+            status=TicketStatus.RESOLVED,
+        )
+        db.add(ticket)
+        db.flush()
+        traces = [
+            {
+                "agent_name": agent,
+                "step_number": step,
+                "input_data": {"message": "How long does shipping take?"},
+                "output_data": {"intent": "shipping_inquiry"},
+            }
+            for step, agent in enumerate(("triage", "response"), 1)
+        ]
+        insert_traces(db, trace_rows(ticket.id, traces))
+        db.commit()
+        return ticket.id, ticket.ticket_number
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_includes_select_the_parts_returned(api):
+    ticket_id, _ = create_ticket()
+    url = f"/api/tickets/{ticket_id}"
+
+    full = (await api.get(url)).json()
+    assert [trace["agent_name"] for trace in full["agent_traces"]] == ["triage", "response"]
+    assert full["agent_traces"][0]["input_data"] == {"message": "How long does shipping take?"}
+    assert full["messages"] == []
+
+    light = (await api.get(url, params={"include": "traces"})).json()
+    assert light["agent_traces"][0]["agent_name"] == "triage"
+    assert light["agent_traces"][0]["input_data"] is None  # No trace_data
+    assert light["messages"] is None
+
+    bare = (await api.get(url, params={"include": ""})).json()
+    assert bare["agent_traces"] is None and bare["subject"] == "Shipping times"
+
+    response = await api.get(url, params={"include": "traces,everything"})
+    assert response.status_code == 400
+
+
+@pytest.mark.asyncio
+async def test_unchanged_tickets_revalidate_with_a_304(api):
+    ticket_id, ticket_number = create_ticket()
+    url = f"/api/tickets/{ticket_id}"
+
+    first = await api.get(url)
+    etag = first.headers["etag"]
+    assert first.headers["cache-control"] == "no-cache"
+
+    unchanged = await api.get(url, headers={"If-None-Match": f"W/{etag}"})
+    assert unchanged.status_code == 304 and unchanged.headers["etag"] == etag
+    by_number = await api.get(
+        f"/api/tickets/number/{ticket_number}", headers={"If-None-Match": etag}
+    )
+    assert by_number.status_code == 304
+
+    other_parts = await api.get(url, params={"include": "traces"}, headers={"If-None-Match": etag})
+    assert other_parts.status_code == 200 and other_parts.headers["etag"] != etag
+
+    await api.patch(url, json={"status": TicketStatus.CLOSED.value})
+    changed = await api.get(url, headers={"If-None-Match": etag})
+    assert changed.status_code == 200
+    assert changed.json()["status"] == TicketStatus.CLOSED.value
+
+
+@pytest.mark.asyncio
+async def test_unknown_tickets_are_404(api):
+    assert (await api.get("/api/tickets/999999")).status_code == 404
+    assert (await api.get("/api/tickets/number/TKT-NOPE")).status_code == 404
@@ -0,0 +1,176 @@
+import asyncio
+import itertools
+from types import SimpleNamespace
+
+import pytest
+
+from app.agents import agent_nodes
+from app.api import tickets
+from app.core.database import SessionLocal
+from app.models import Ticket, TicketStatus
+from app.schemas.agent_output import ResponseOutput
+from app.services.ticket_events import (
+    TextStreamPublisher,
+    TicketEventBroker,
+    format_sse,
+    ticket_events,
+)
+from app.services.ticket_processor import build_initial_state
+
+TICKET_NUMBERS = itertools.count(1)
+
+
+async def collect(events) -> list:
+    return [message async for message in events]
+
+
+def create_ticket(status: TicketStatus, **fields) -> int:
+    db = SessionLocal()
+    try:
+        ticket = Ticket(
+            ticket_number=f"TKT-EVENTS-{next(TICKET_NUMBERS)}",
+            customer_email="ann@example.com",
+            customer_name="Ann Lee",
+            subject="Where is my order?",
+            message="It has not arrived yet.",
+            status=status,
+            **fields,
+        )
+        db.add(ticket)
+        db.commit()
+        return ticket.id
+    finally:
+        db.close()
+
+
+def sse_events(body: str) -> list:
+    return [line.split(": ", 1)[1] for line in body.splitlines() if line.startswith("event: ")]
+
+
+@pytest.mark.asyncio
+async def test_subscribers_get_the_replay_then_live_events_until_done():
+    broker = TicketEventBroker(retention_seconds=60, max_events=100)
+    broker.publish(1, "status", {"status": "in_progress"})
+    broker.publish(1, "agent", {"agent": "triage"})
+
+    subscription = asyncio.create_task(collect(broker.subscribe(1, after_id=1)))
+    await asyncio.sleep(0.01)
+    broker.publish(1, "done", {"status": "resolved"})
+    messages = await asyncio.wait_for(subscription, timeout=1)
+
+    assert [(m["id"], m["event"]) for m in messages] == [(2, "agent"), (3, "done")]
+    late = await collect(broker.subscribe(1))  # Finished: replay only
+    assert [m["event"] for m in late] == ["status", "agent", "done"]
+
+
+@pytest.mark.asyncio
+async def test_idle_subscriptions_yield_heartbeats():
+    broker = TicketEventBroker(retention_seconds=60, max_events=100)
+    events = broker.subscribe(2, heartbeat_seconds=0.01)
+
+    assert await events.__anext__() is None
+    await events.aclose()
+    assert 2 not in broker._channels
+
+
+def test_text_stream_publisher_sends_deltas_and_resets():
+    publisher = TextStreamPublisher(9003, "response_text")
+    for text in ("Hello", "Hello there", "Hello there", "Hi"):
+        publisher(SimpleNamespace(response_text=text))
+
+    messages = list(ticket_events._channels[9003].events)
+    assert [(m["event"], m["data"]) for m in messages] == [
+        ("response_delta", {"delta": "Hello"}),
+        ("response_delta", {"delta": " there"}),
+        ("response_reset", {"text": "Hi"}),
+    ]
+    assert format_sse(messages[0]) == 'id: 1\nevent: response_delta\ndata: {"delta": "Hello"}\n\n'
+    assert format_sse(None) == ": keep-alive\n\n"
+
+
+@pytest.mark.asyncio
+async def test_stream_of_a_processed_ticket_is_a_single_done_event(api):
+    ticket_id = create_ticket(TicketStatus.RESOLVED, ai_response="Shipped today.")
+
+    response = await api.get(f"/api/tickets/{ticket_id}/stream")
+
+    assert sse_events(response.text) == ["done"]
+    assert '"ai_response": "Shipped today."' in response.text
+
+
+@pytest.mark.asyncio
+async def test_heartbeat_notices_a_ticket_finished_elsewhere(api, monkeypatch):
+    monkeypatch.setattr(tickets.settings, "SSE_HEARTBEAT_SECONDS", 0.01)
+    ticket_id = create_ticket(TicketStatus.IN_PROGRESS)
+
+    async def finish_in_the_database():
+        await asyncio.sleep(0.05)
+        db = SessionLocal()
+        try:
+            ticket = db.get(Ticket, ticket_id)
+            ticket.status = TicketStatus.WAITING_HUMAN
+            ticket.ticket_metadata = {"error": "worker crashed"}
+            db.commit()
+        finally:
+            db.close()
+
+    finisher = asyncio.create_task(finish_in_the_database())
+    response = await api.get(f"/api/tickets/{ticket_id}/stream")
+    await finisher
+
+    assert sse_events(response.text) == ["failed"]
+    assert '"error": "worker crashed"' in response.text
+
+
+@pytest.mark.asyncio
+async def test_stuck_tickets_end_with_a_timeout_event(api, monkeypatch):
+    monkeypatch.setattr(tickets.settings, "SSE_HEARTBEAT_SECONDS", 0.01)
+    monkeypatch.setattr(tickets.settings, "SSE_MAX_STREAM_SECONDS", 0.05)
+    ticket_id = create_ticket(TicketStatus.IN_PROGRESS)
+
+    response = await api.get(f"/api/tickets/{ticket_id}/stream")
+
+    assert sse_events(response.text) == ["timeout"]
+    assert ticket_id not in ticket_events._channels  # Unsubscribed
+
+
+@pytest.mark.asyncio
+@pytest.mark.usefixtures("stub_openai")
+async def test_async_response_node_streams_the_draft():
+    ticket = Ticket(
+        id=9102,
+        customer_email="ann@example.com",
+        customer_name="Ann Lee",
+        subject="Shipping times",
+        message="How long does shipping take?",
+        order_id=None,
+    )
+    state = build_initial_state(ticket)
+    state.update(await agent_nodes.atriage_agent(state))
+
+    update = await agent_nodes.aresponse_agent(state)
+
+    assert isinstance(update["response"], ResponseOutput)
+    assert update["_traces"][0]["time_to_first_token_ms"] is not None
+    events = [event["event"] for event in ticket_events._channels[9102].events]
+    assert "response_delta" in events
+
+
+@pytest.mark.asyncio
+async def test_empty_stream_is_retried_then_raised(monkeypatch):
+    calls = []
+
+    async def empty_stream():
+        return
+        yield
+
+    async def create(**kwargs):
+        calls.append(kwargs)
+        return empty_stream()
+
+    fake = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=create)))
+    monkeypatch.setattr(agent_nodes, "aclient", fake)
+
+    with pytest.raises(agent_nodes.EmptyStreamError):
+        await agent_nodes.astream_complete("response", ResponseOutput, "prompt", 10, print)
+    assert len(calls) == 2  # OPENAI_MAX_RETRIES=1 in conftest
@@ -0,0 +1,108 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app.core.database import SessionLocal
+from app.models import Ticket, TicketStatus
+from app.services.ticket_queries import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    ticket_list_query,
+)
+
+CUSTOMER = "pages@example.com"
+
+
+@pytest.fixture(scope="module")
+def ticket_ids(database) -> list:
+    """Five tickets of one customer, the last two created in the same instant. Newest first."""
+    start = datetime(2024, 1, 15, 10)
+    created = [start, start + timedelta(minutes=1), start + timedelta(minutes=2)]
+    created += [start + timedelta(minutes=3)] * 2
+    db = SessionLocal()
+    try:
+        tickets = [
+            Ticket(
+                ticket_number=f"TKT-PAGES-{index}",
+                customer_email=CUSTOMER,
+                customer_name="Ann Lee",
+                subject=f"Question {index}",
+                message="How long does shipping take?",
+                status=TicketStatus.RESOLVED,
+                created_at=created_at,
+            )
+            for index, created_at in enumerate(created)
+        ]
+        db.add_all(tickets)
+        db.commit()
+        return [ticket.id for ticket in sorted(tickets, key=lambda t: (t.created_at, t.id))][::-1]
+    finally:
+        db.close()
+
+
+def test_cursor_round_trip():
+    created_at = datetime(2024, 1, 15, 10, 30, 0, 123456)
+    cursor = encode_cursor(Ticket(id=42, created_at=created_at))
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == (created_at, 42)
+
+
+@pytest.mark.parametrize("cursor", ["", "not a cursor", "bm9waXBl", "MjAyNC0wMS0xNXw="])
+def test_invalid_cursor(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor)
+
+
+@pytest.mark.asyncio
+async def test_cursor_pages_walk_every_ticket_once(api, ticket_ids):
+    seen, cursor = [], None
+    for _ in range(len(ticket_ids)):
+        params = {"customer_email": CUSTOMER, "limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = await api.get("/api/tickets", params=params)
+        seen += [ticket["id"] for ticket in response.json()]
+        cursor = response.headers.get("x-next-cursor")
+        if cursor is None:
+            break
+
+    assert seen == ticket_ids  # Ties on created_at are broken by id
+
+
+@pytest.mark.asyncio
+async def test_summary_view_leaves_out_the_text(api, ticket_ids):
+    response = await api.get(
+        "/api/tickets", params={"customer_email": CUSTOMER, "view": "summary", "limit": 10}
+    )
+
+    [first, *_] = response.json()
+    assert first["id"] == ticket_ids[0]
+    assert first["subject"] == "Question 4"
+    assert "message" not in first and "ai_response" not in first
+    assert "x-next-cursor" not in response.headers  # Fewer than limit: the last page
+
+
+@pytest.mark.asyncio
+async def test_a_bad_cursor_is_a_400(api):
+    response = await api.get("/api/tickets", params={"cursor": "not a cursor"})
+
+    assert response.status_code == 400
+
+
+@pytest.mark.parametrize(
+    "filters, index",
+    [
+        ({}, "ix_tickets_created_at_id"),
+        ({"status": TicketStatus.RESOLVED}, "ix_tickets_status_created_at_id"),
+        ({"customer_email": CUSTOMER}, "ix_tickets_customer_email_created_at_id"),
+    ],
+)
+def test_cursor_pages_are_index_range_scans(database, filters, index):
+    cursor = encode_cursor(Ticket(id=3, created_at=datetime(2024, 1, 15, 10)))
+    query = ticket_list_query(cursor=cursor, limit=10, **filters)
+    sql = str(query.compile(dialect=database.dialect, compile_kwargs={"literal_binds": True}))
+
+    with database.connect() as connection:
+        plan = " ".join(row[-1] for row in connection.exec_driver_sql(f"EXPLAIN QUERY PLAN {sql}"))
+    assert f"USING INDEX {index}" in plan
+    assert "TEMP B-TREE" not in plan  # No sort: the index gives newest-first order
@@ -0,0 +1,131 @@
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine, insert, update
+from sqlalchemy.pool import StaticPool
+
+from app.core.database import Base, SessionLocal
+from app.models import Ticket, TicketPriority, TicketStatus
+from app.services.ticket_search import (
+    fts5_query,
+    highlight_snippet,
+    install_search_index,
+    ticket_search_query,
+)
+
+
+@pytest.mark.parametrize(
+    "query, expected",
+    [
+        ("refund keyboard", '"refund" "keyboard"'),
+        ("ship*", '"ship"*'),
+        ('say "hi" OR NOT', '"say" "hi" "OR" "NOT"'),
+        ("col:value (x) -y", '"col:value" "(x)" "-y"'),
+        ("  *  ", ""),
+    ],
+)
+def test_fts5_query_quotes_terms(query, expected):
+    assert fts5_query(query) == expected
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    now = datetime.utcnow()
+    tickets = [
+        ("Refund for keyboard", "My keyboard arrived broken, I want a refund"),
+        ("Shipping delay", "Where is my keyboard? Shipping is taking forever"),
+        ("Password reset", "I cannot log in to my account"),
+    ]
+    with engine.begin() as connection:
+        connection.execute(
+            insert(Ticket),
+            [
+                {
+                    "ticket_number": f"TKT-{i}",
+                    "customer_email": "a@example.com",
+                    "customer_name": "A",
+                    "subject": subject,
+                    "message": message,
+                    "status": TicketStatus.NEW,
+                    "priority": TicketPriority.MEDIUM,
+                    "response_approved": 0,
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                for i, (subject, message) in enumerate(tickets)
+            ],
+        )
+    install_search_index(engine)
+    yield engine
+    engine.dispose()
+
+
+def search(engine, query, **filters):
+    with engine.connect() as connection:
+        return connection.execute(ticket_search_query("sqlite", query, **filters)).all()
+
+
+def test_ranked_matches_with_snippets(engine):
+    hits = search(engine, "keyboard")
+
+    assert [hit.subject for hit in hits] == ["Refund for keyboard", "Shipping delay"]
+    assert hits[0].score >= hits[1].score
+    assert "<mark>keyboard</mark>" in highlight_snippet(hits[0].snippet).lower()
+
+
+def test_all_terms_prefixes_and_stemming(engine):
+    assert [hit.id for hit in search(engine, "keyboard refund")] == [1]
+    assert [hit.id for hit in search(engine, "ship*")] == [2]
+    assert [hit.id for hit in search(engine, "refunds")] == [1]  # Porter stemming
+    assert search(engine, 'keyboard" OR "password') == []
+
+
+def test_filters_and_index_follows_updates(engine):
+    assert search(engine, "keyboard", status=TicketStatus.RESOLVED) == []
+
+    with engine.begin() as connection:
+        connection.execute(
+            update(Ticket)
+            .where(Ticket.id == 3)
+            .values(status=TicketStatus.RESOLVED, ai_response="Your keyboard login is fixed")
+        )
+    assert [hit.id for hit in search(engine, "keyboard", status=TicketStatus.RESOLVED)] == [3]
+
+
+def test_snippets_escape_the_ticket_text():
+    snippet = "\x02Keyboard\x03 <b>broken</b> & \x02keyboard\x03's <script>"
+
+    assert highlight_snippet(snippet) == (
+        "<mark>Keyboard</mark> &lt;b&gt;broken&lt;/b&gt; &amp; "
+        "<mark>keyboard</mark>&#x27;s &lt;script&gt;"
+    )
+    assert highlight_snippet(None) is None
+
+
+@pytest.mark.asyncio
+async def test_search_api_never_returns_customer_markup(api):
+    db = SessionLocal()
+    try:
+        db.add(
+            Ticket(
+                ticket_number="TKT-SEARCH-XSS",
+                customer_email="mallory@example.com",
+                customer_name="Mallory",
+                subject="Please help",
+                message='<script>alert("xss")</script> my xsskeyboard <img src=x onerror=1>',
+            )
+        )
+        db.commit()
+    finally:
+        db.close()
+
+    response = await api.get("/api/tickets/search", params={"q": "xsskeyboard"})
+
+    [hit] = response.json()
+    assert "<script>" not in hit["snippet"] and "<img" not in hit["snippet"]
+    assert "&lt;script&gt;" in hit["snippet"]
+    assert "<mark>xsskeyboard</mark>" in hit["snippet"]
@@ -0,0 +1,116 @@
+import pytest
+from sqlalchemy import func, select
+
+from app.api import tickets
+from app.core.database import SessionLocal
+from app.models import AgentTrace, Ticket, TicketStatus
+from app.services import trace_writer as trace_writer_module
+from app.services.trace_writer import TraceWriteBuffer, trace_rows
+
+TICKET = {
+    "customer_email": "ann@example.com",
+    "customer_name": "Ann Lee",
+    "subject": "Shipping times",
+    "message": "How long does shipping take?",
+}
+
+
+def traces_of(ticket_id: int) -> list:
+    db = SessionLocal()
+    try:
+        query = select(AgentTrace.agent_name).where(AgentTrace.ticket_id == ticket_id)
+        return sorted(db.scalars(query))
+    finally:
+        db.close()
+
+
+def rows(ticket_id: int, *agents: str) -> list:
+    return trace_rows(
+        ticket_id,
+        [{"agent_name": agent, "step_number": step} for step, agent in enumerate(agents, 1)],
+    )
+
+
+def test_buffered_rows_wait_for_the_commit(database):
+    buffer = TraceWriteBuffer(enabled=True, max_rows=100, flush_interval=60)
+    db = SessionLocal()
+    try:
+        buffer.write(db, rows(9001, "triage", "research"))
+        assert buffer.stats()["pending_rows"] == 0  # Not committed yet
+        db.commit()
+    finally:
+        db.close()
+
+    assert buffer.stats()["pending_rows"] == 2
+    assert buffer.flush() == 2
+    assert traces_of(9001) == ["research", "triage"]
+    assert buffer.stats()["flushes"] == 1
+
+
+def test_a_failing_batch_is_retried_row_by_row(database, monkeypatch, caplog):
+    insert_traces = trace_writer_module.insert_traces
+
+    def reject_bad_rows(db, rows):
+        if any(row["agent_name"] == "bad" for row in rows):
+            raise ValueError("bad row")
+        insert_traces(db, rows)
+
+    monkeypatch.setattr(trace_writer_module, "insert_traces", reject_bad_rows)
+    buffer = TraceWriteBuffer(enabled=True, max_rows=100, flush_interval=60)
+    buffer.add(rows(9002, "triage", "bad", "response"))
+
+    assert buffer.flush() == 2
+    assert traces_of(9002) == ["response", "triage"]
+    stats = buffer.stats()
+    assert (stats["flushed_rows"], stats["dropped_rows"]) == (2, 1)
+    assert "Dropped buffered bad trace of ticket 9002" in caplog.text
+
+
+def ticket_count(subject: str) -> int:
+    db = SessionLocal()
+    try:
+        return db.scalar(select(func.count()).where(Ticket.subject == subject))
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_sync_create_writes_the_ticket_once_after_the_workflow(api, monkeypatch):
+    seen_during_workflow = []
+
+    def run_workflow(initial_state):
+        seen_during_workflow.append(ticket_count("Single transaction"))
+        return {
+            **initial_state,
+            "final_response": "3-5 business days.",
+            "overall_confidence": 0.9,
+            "_traces": [{"agent_name": "fast_path", "step_number": 1}],
+        }
+
+    monkeypatch.setattr(tickets, "run_workflow", run_workflow)
+    response = await api.post("/api/tickets", json={**TICKET, "subject": "Single transaction"})
+
+    assert response.status_code == 201
+    body = response.json()
+    assert seen_during_workflow == [0]
+    assert body["status"] == TicketStatus.RESOLVED.value
+    assert body["ai_response"] == "3-5 business days."
+    assert traces_of(body["id"]) == ["fast_path"]
+
+
+@pytest.mark.asyncio
+async def test_sync_create_saves_failed_tickets_for_review(api, monkeypatch):
+    def run_workflow(initial_state):
+        raise RuntimeError("LLM down")
+
+    monkeypatch.setattr(tickets, "run_workflow", run_workflow)
+    response = await api.post("/api/tickets", json={**TICKET, "subject": "Failed workflow"})
+
+    assert response.status_code == 500
+    db = SessionLocal()
+    try:
+        ticket = db.scalars(select(Ticket).where(Ticket.subject == "Failed workflow")).one()
+        assert ticket.status == TicketStatus.WAITING_HUMAN
+        assert ticket.ticket_metadata == {"error": "LLM down"}
+    finally:
+        db.close()
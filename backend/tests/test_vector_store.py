@@ -0,0 +1,62 @@
+import pytest
+
+from app.services.vector_store import NumpyVectorStore, create_vector_store
+
+
+def add(store, *rows):
+    store.upsert(
+        [id_ for id_, _ in rows],
+        [vector for _, vector in rows],
+        [f"doc {id_}" for id_, _ in rows],
+        [{"source": id_} for id_, _ in rows],
+    )
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = NumpyVectorStore(str(tmp_path))
+    add(store, ("x", [1.0, 0.0, 0.0]), ("y", [0.0, 1.0, 0.0]), ("xy", [1.0, 1.0, 0.0]))
+    return store
+
+
+def test_query_returns_nearest_first_with_cosine_distance(store):
+    [hits] = store.query([[2.0, 0.1, 0.0]], n_results=2)
+
+    assert [hit["id"] for hit in hits] == ["x", "xy"]
+    assert hits[0]["distance"] == pytest.approx(0.0012, abs=1e-3)
+    assert hits[0]["document"] == "doc x" and hits[0]["metadata"] == {"source": "x"}
+
+
+def test_each_query_gets_its_own_ranking(store):
+    x_hits, y_hits = store.query([[1.0, 0.0, 0.0], [0.0, 1.0, 0.0]], n_results=1)
+
+    assert x_hits[0]["id"] == "x" and y_hits[0]["id"] == "y"
+    assert len(store.query([[1.0, 0.0, 0.0]], n_results=10)[0]) == 3
+
+
+def test_upsert_replaces_and_delete_removes(store):
+    add(store, ("x", [0.0, 0.0, 1.0]))
+    store.delete(["y", "missing"])
+
+    assert store.count() == 2
+    assert store.query([[0.0, 0.0, 1.0]], n_results=1)[0][0]["id"] == "x"
+    assert store.get_all()[0] == ["x", "xy"]
+
+
+def test_index_persists_across_instances(store, tmp_path):
+    reopened = NumpyVectorStore(str(tmp_path))
+
+    assert reopened.count() == 3
+    assert reopened.query([[0.0, 1.0, 0.0]], n_results=1)[0][0]["id"] == "y"
+
+
+def test_reset_leaves_an_empty_index(store, tmp_path):
+    store.reset()
+
+    assert store.query([[1.0, 0.0, 0.0]], n_results=3) == [[]]
+    assert NumpyVectorStore(str(tmp_path)).count() == 0
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_vector_store("faiss")
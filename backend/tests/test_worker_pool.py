@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+from sqlalchemy import select
+
+from app.api import tickets
+from app.core.database import SessionLocal
+from app.models import Ticket, TicketStatus
+from app.services.worker_pool import QueueFullError, TicketWorkerPool
+
+TICKET = {
+    "customer_email": "ann@example.com",
+    "customer_name": "Ann Lee",
+    "subject": "Shipping times",
+    "message": "How long does shipping take?",
+}
+
+
+@pytest.mark.asyncio
+async def test_queued_tickets_are_processed():
+    processed = []
+
+    async def handler(ticket_id):
+        processed.append(ticket_id)
+
+    pool = TicketWorkerPool(num_workers=2, max_queue_size=10)
+    pool.start(handler)
+    try:
+        for ticket_id in (1, 2, 3):
+            pool.enqueue(ticket_id)
+        for ticket_id in (1, 2, 3):
+            assert await pool.wait_for(ticket_id, timeout=1)
+    finally:
+        await pool.stop()
+
+    assert sorted(processed) == [1, 2, 3]
+    assert not pool.is_pending(1)
+    assert pool.metrics()["processed"] == 3
+
+
+@pytest.mark.asyncio
+async def test_full_queue_rejects_tickets():
+    release = asyncio.Event()
+
+    async def handler(ticket_id):
+        await release.wait()
+
+    pool = TicketWorkerPool(num_workers=1, max_queue_size=1)
+    pool.start(handler)
+    try:
+        pool.enqueue(1)
+        await asyncio.sleep(0)  # The worker takes ticket 1 off the queue
+        pool.enqueue(2)
+        assert pool.is_full()
+        with pytest.raises(QueueFullError):
+            pool.enqueue(3)
+        assert pool.metrics()["rejected"] == 1
+    finally:
+        release.set()
+        await pool.stop()
+
+
+@pytest.mark.asyncio
+async def test_enqueue_wait_skips_pending_tickets_and_waits_for_room():
+    release = asyncio.Event()
+    processed = []
+
+    async def handler(ticket_id):
+        await release.wait()
+        processed.append(ticket_id)
+
+    pool = TicketWorkerPool(num_workers=1, max_queue_size=1)
+    pool.start(handler)
+    try:
+        await pool.enqueue_wait(1)
+        await asyncio.sleep(0)
+        await pool.enqueue_wait(2)
+        await pool.enqueue_wait(2)  # Already queued: not queued twice
+        waiting = asyncio.create_task(pool.enqueue_wait(3))
+        await asyncio.sleep(0.01)
+        assert not waiting.done()
+
+        release.set()
+        await asyncio.wait_for(waiting, timeout=1)
+        assert await pool.wait_for(3, timeout=1)
+    finally:
+        await pool.stop()
+
+    assert processed == [1, 2, 3]
+
+
+@pytest.mark.asyncio
+async def test_failures_are_counted_and_sync_handlers_run_in_threads():
+    def handler(ticket_id):
+        raise RuntimeError("boom")
+
+    pool = TicketWorkerPool(num_workers=1, max_queue_size=5)
+    pool.start(handler)
+    try:
+        pool.enqueue(7)
+        assert await pool.wait_for(7, timeout=1)
+    finally:
+        await pool.stop()
+
+    assert pool.metrics()["failed"] == 1
+
+
+def test_enqueue_without_workers():
+    with pytest.raises(QueueFullError):
+        TicketWorkerPool(num_workers=1, max_queue_size=1).enqueue(1)
+
+
+def tickets_with_subject(subject: str) -> list:
+    db = SessionLocal()
+    try:
+        return db.scalars(select(Ticket).where(Ticket.subject == subject)).all()
+    finally:
+        db.close()
+
+
+@pytest.mark.asyncio
+async def test_async_create_queues_the_saved_ticket(api, monkeypatch):
+    processed = []
+    pool = TicketWorkerPool(num_workers=1, max_queue_size=10)
+    pool.start(processed.append)
+    monkeypatch.setattr(tickets, "ticket_worker_pool", pool)
+    monkeypatch.setattr(tickets.settings, "ASYNC_TICKET_PROCESSING", True)
+    try:
+        response = await api.post("/api/tickets", json={**TICKET, "subject": "Queued ticket"})
+        ticket_id = response.json()["id"]
+        assert await pool.wait_for(ticket_id, timeout=1)
+    finally:
+        await pool.stop()
+
+    assert response.status_code == 202
+    assert response.json()["status"] == TicketStatus.NEW.value
+    assert processed == [ticket_id]
+    [ticket] = tickets_with_subject("Queued ticket")
+    assert ticket.id == ticket_id
+
+
+@pytest.mark.asyncio
+async def test_async_create_removes_tickets_the_queue_rejects(api, monkeypatch):
+    pool = TicketWorkerPool(num_workers=1, max_queue_size=10)  # Not started: rejects all
+    monkeypatch.setattr(tickets, "ticket_worker_pool", pool)
+    monkeypatch.setattr(tickets.settings, "ASYNC_TICKET_PROCESSING", True)
+
+    response = await api.post("/api/tickets", json={**TICKET, "subject": "Rejected ticket"})
+
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
+    assert tickets_with_subject("Rejected ticket") == []
@@ -0,0 +1,113 @@
+import asyncio
+import time
+
+import pytest
+
+from app.agents import workflow
+from app.agents.agent_nodes import escalation_skip, policy_skip
+from app.agents.workflow import (
+    create_support_workflow,
+    merge_traces,
+    route_escalation,
+    route_policy,
+)
+from app.core import metrics
+from app.models import TicketPriority
+from app.schemas.agent_output import ResponseOutput, TriageOutput
+
+
+def trace(agent_name: str) -> dict:
+    return {"agent_name": agent_name, "execution_time_ms": 0}
+
+
+def triage(priority=TicketPriority.LOW, order_lookup=False, confidence=0.95) -> TriageOutput:
+    return TriageOutput(
+        intent="shipping_inquiry",
+        priority=priority,
+        confidence=confidence,
+        reasoning="test",
+        requires_order_lookup=order_lookup,
+    )
+
+
+def response(review=False) -> ResponseOutput:
+    return ResponseOutput(response_text="Hi", confidence=0.95, requires_human_review=review)
+
+
+def test_merge_traces_orders_by_pipeline_stage():
+    merged = merge_traces([trace("triage")], [trace("policy"), trace("custom"), trace("research")])
+
+    assert [t["agent_name"] for t in merged] == ["triage", "research", "policy", "custom"]
+    assert [t["step_number"] for t in merged] == [1, 2, 3, 4]
+
+
+@pytest.mark.asyncio
+async def test_research_and_policy_run_concurrently(monkeypatch):
+    spans = {}
+
+    def fake_agent(name: str, delay: float = 0.0):
+        async def node(state):
+            start = time.monotonic()
+            await asyncio.sleep(delay)
+            spans[name] = (start, time.monotonic())
+            return {"_traces": [trace(name)]}
+
+        return node
+
+    monkeypatch.setattr(workflow, "atriage_agent", fake_agent("triage"))
+    monkeypatch.setattr(workflow, "aresearch_agent", fake_agent("research", 0.2))
+    monkeypatch.setattr(workflow, "apolicy_agent", fake_agent("policy", 0.2))
+    monkeypatch.setattr(workflow, "aresponse_agent", fake_agent("response"))
+    monkeypatch.setattr(workflow, "aescalation_agent", fake_agent("escalation"))
+    graph = create_support_workflow(
+        parallel=True, conditional=False, fast_path=False, use_async=True
+    )
+
+    state = await graph.ainvoke({"ticket_id": None, "_traces": []})
+
+    research, policy = spans["research"], spans["policy"]
+    assert research[0] < policy[1] and policy[0] < research[1]  # The branches overlap
+    assert spans["response"][0] >= max(research[1], policy[1])  # Joined before drafting
+    assert [t["agent_name"] for t in state["_traces"]] == [
+        "triage",
+        "research",
+        "policy",
+        "response",
+        "escalation",
+    ]
+
+
+def test_policy_runs_only_for_order_lookups():
+    assert route_policy({"triage": triage(), "order_id": "ORD-1"}) == "policy_skip_node"
+    assert route_policy({"triage": triage(order_lookup=True)}) == "policy_skip_node"
+    state = {"triage": triage(order_lookup=True), "order_id": "ORD-1"}
+    assert route_policy(state) == "policy_node"
+
+
+@pytest.mark.parametrize(
+    "state, node",
+    [
+        ({"triage": triage(), "response": response()}, "escalation_skip_node"),
+        ({"triage": triage(TicketPriority.HIGH), "response": response()}, "escalation_node"),
+        ({"triage": triage(), "response": response(review=True)}, "escalation_node"),
+        ({"triage": triage(confidence=0.6), "response": response()}, "escalation_node"),
+    ],
+)
+def test_escalation_is_skipped_only_for_confident_low_priority_tickets(state, node):
+    assert route_escalation(state) == node
+
+
+def test_skips_are_traced_and_counted_in_metrics():
+    def skipped(agent):
+        return metrics.agent_skipped._values[(agent,)]
+
+    before = skipped("policy"), skipped("escalation")
+    policy_update = policy_skip({"triage": triage(), "order_id": None})
+    escalation_update = escalation_skip({"triage": triage(), "response": response()})
+
+    [policy_trace] = policy_update["_traces"]
+    assert policy_trace["output_data"] == {"skipped": True, "reason": "No order provided"}
+    assert policy_trace["tokens_used"] == 0
+    assert escalation_update["requires_human"] is False
+    assert (skipped("policy"), skipped("escalation")) == (before[0] + 1, before[1] + 1)
+    assert 'supportflow_agent_skipped_total{agent="policy"}' in metrics.registry.render()